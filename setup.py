@@ -41,6 +41,7 @@ PROJECT_PACKAGES = [
     'wpull.protocol.ftp',
     'wpull.protocol.ftp.ls',
     'wpull.protocol.http',
+    'wpull.protocol.http2',
     'wpull.proxy',
     'wpull.scraper',
     'wpull.testing',
@@ -111,6 +112,10 @@ setup_kwargs['install_requires'] = [
 if sys.version_info < (3, 5):
     setup_kwargs['install_requires'].append('typing')
 
+setup_kwargs['extras_require'] = {
+    'http2': ['h2'],
+}
+
 
 if __name__ == '__main__':
     if sys.version_info[0] < 3:
@@ -0,0 +1,107 @@
+'''URL table check out benchmark.
+
+Fills a SQLite URL table where 90% of the URLs are done and measures the
+time to check out the remaining ones. Only one in a hundred URLs is a
+root URL. Checked out URLs are released after each measurement so every
+measurement sees the same table. The check out latency should stay flat
+as the table grows.
+'''
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(
+    os.path.abspath(os.path.dirname(__file__)), '..', '..'
+))
+
+from wpull.database.sqltable import SQLiteURLTable
+from wpull.pipeline.item import Status
+
+
+def fill_table(path, row_count, todo_count, batch_size=100000):
+    # Rows are inserted directly since adding millions of URLs through
+    # the table would take longer than the benchmark itself
+    connection = sqlite3.connect(path)
+
+    try:
+        cursor = connection.cursor()
+
+        for start in range(0, row_count, batch_size):
+            stop = min(row_count, start + batch_size)
+            cursor.executemany(
+                'INSERT INTO url_strings (id, url) VALUES (?, ?)',
+                ((index + 1, 'http://example.com/{}'.format(index))
+                 for index in range(start, stop))
+            )
+            cursor.executemany(
+                'INSERT INTO queued_urls '
+                '(id, url_string_id, status, try_count, level, priority) '
+                'VALUES (?, ?, ?, 0, ?, 0)',
+                ((index + 1, index + 1,
+                  'todo' if index >= row_count - todo_count else 'done',
+                  0 if index % 100 == 0 else 5)
+                 for index in range(start, stop))
+            )
+            connection.commit()
+
+        cursor.execute('ANALYZE')
+    finally:
+        connection.close()
+
+
+def measure(url_table, function, repeat):
+    durations = []
+
+    for dummy in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start_time)
+        url_table.release()
+
+    return statistics.median(durations) * 1e6
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument(
+        'sizes', nargs='*', type=int,
+        default=[10000, 100000, 1000000, 10000000])
+    arg_parser.add_argument('--repeat', type=int, default=100)
+    args = arg_parser.parse_args()
+
+    print('{:>10} {:>14} {:>14} {:>14} {:>18}'.format(
+        'rows', 'root todo us', 'level < 1 us', 'check_out us',
+        'check_out_many us'))
+
+    for row_count in args.sizes:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'wpull.db')
+            SQLiteURLTable(path).close()
+            fill_table(path, row_count, row_count // 10)
+            url_table = SQLiteURLTable(path)
+
+            results = (
+                measure(url_table, url_table.get_root_url_todo_count,
+                        args.repeat),
+                measure(url_table,
+                        lambda: url_table.check_out(Status.todo, level=1),
+                        args.repeat),
+                measure(url_table, lambda: url_table.check_out(Status.todo),
+                        args.repeat),
+                measure(url_table,
+                        lambda: url_table.check_out_many(Status.todo, 100),
+                        args.repeat),
+            )
+
+            print('{:>10} {:>14.0f} {:>14.0f} {:>14.0f} {:>18.0f}'.format(
+                row_count, *results))
+
+            url_table.close()
+
+
+if __name__ == '__main__':
+    main()
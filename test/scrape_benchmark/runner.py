@@ -0,0 +1,94 @@
+'''HTML scraper benchmark.
+
+Scrapes each document of a corpus repeatedly and prints the median time
+per document and the number of links found. The corpus defaults to the
+HTML samples used by the unit tests.
+'''
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(
+    os.path.abspath(os.path.dirname(__file__)), '..', '..'
+))
+
+from wpull.body import Body
+from wpull.protocol.http.request import Request, Response
+from wpull.scraper.css import CSSScraper
+from wpull.scraper.html import ElementWalker, HTMLScraper
+from wpull.scraper.javascript import JavaScriptScraper
+
+SAMPLES_DIR = os.path.join(
+    os.path.abspath(os.path.dirname(__file__)),
+    '..', '..', 'wpull', 'testing', 'samples'
+)
+
+
+def new_html_parser(name):
+    if name == 'html5lib':
+        from wpull.document.htmlparse.html5lib_ import HTMLParser
+    else:
+        from wpull.document.htmlparse.lxml_ import HTMLParser
+
+    return HTMLParser()
+
+
+def new_scraper(parser_name):
+    element_walker = ElementWalker(
+        css_scraper=CSSScraper(), javascript_scraper=JavaScriptScraper())
+
+    return HTMLScraper(new_html_parser(parser_name), element_walker)
+
+
+def measure(scraper, path, repeat):
+    request = Request('http://example.com/')
+    response = Response(200, 'OK', request=request)
+    response.fields['Content-Type'] = 'text/html'
+    durations = []
+    link_count = 0
+
+    with open(path, 'rb') as file:
+        response.body = Body(file)
+
+        for dummy in range(repeat):
+            file.seek(0)
+            start_time = time.perf_counter()
+            scrape_result = scraper.scrape(request, response)
+            durations.append(time.perf_counter() - start_time)
+            link_count = len(scrape_result.link_contexts)
+
+    return statistics.median(durations) * 1e3, link_count
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('paths', nargs='*')
+    arg_parser.add_argument(
+        '--parser', choices=['lxml', 'html5lib'], default='lxml')
+    arg_parser.add_argument('--repeat', type=int, default=20)
+    args = arg_parser.parse_args()
+
+    paths = args.paths or sorted(
+        glob.glob(os.path.join(SAMPLES_DIR, '*.html')) +
+        glob.glob(os.path.join(SAMPLES_DIR, '*.htm'))
+    )
+    scraper = new_scraper(args.parser)
+    total_duration = 0
+
+    print('{:<50} {:>10} {:>8}'.format('document', 'median ms', 'links'))
+
+    for path in paths:
+        duration, link_count = measure(scraper, path, args.repeat)
+        total_duration += duration
+
+        print('{:<50} {:>10.2f} {:>8}'.format(
+            os.path.basename(path)[:50], duration, link_count))
+
+    print('{:<50} {:>10.2f}'.format('total', total_duration))
+
+
+if __name__ == '__main__':
+    main()
@@ -7,13 +7,15 @@ from http.cookiejar import CookieJar
 
 from wpull.application.tasks.conversion import LinkConversionSetupTask, \
     LinkConversionTask, QueuedFileSource
-from wpull.application.tasks.database import DatabaseSetupTask
+from wpull.application.tasks.database import DatabaseSetupTask, \
+    DatabaseTeardownTask
 from wpull.application.tasks.database import InputURLTask
 from wpull.application.tasks.download import ProcessTask, ParserSetupTask, ClientSetupTask, ProcessorSetupTask, \
     BackgroundAsyncTask, ProxyServerSetupTask, CoprocessorSetupTask, \
-    CheckQuotaTask
+    CheckQuotaTask, ParserTeardownTask
 from wpull.application.tasks.log import LoggingSetupTask, LoggingShutdownTask
-from wpull.application.tasks.network import NetworkSetupTask
+from wpull.application.tasks.network import NetworkSetupTask, \
+    DNSPrefetchTask, NetworkTeardownTask
 from wpull.application.tasks.plugin import PluginSetupTask
 from wpull.application.tasks.resmon import ResmonSetupTask, ResmonSleepTask
 from wpull.application.tasks.rule import URLFiltersSetupTask, \
@@ -21,24 +23,27 @@ from wpull.application.tasks.rule import URLFiltersSetupTask, \
 from wpull.application.tasks.sslcontext import SSLContextTask
 from wpull.application.tasks.stats import StatsStartTask, StatsStopTask
 from wpull.application.tasks.warc import WARCRecorderSetupTask, \
-    WARCRecorderTeardownTask, WARCVisitsTask
+    WARCRecorderTeardownTask, WARCVisitsTask, WARCRecorderQueueTask
 from wpull.application.tasks.writer import FileWriterSetupTask
 
 from wpull.application.app import Application
 from wpull.application.factory import Factory
 from wpull.application.tasks.shutdown import BackgroundAsyncCleanupTask, \
     AppStopTask, CookieJarTeardownTask
+from wpull.collections import BloomFilter
 from wpull.converter import BatchDocumentConverter
 from wpull.cookie import DeFactoCookiePolicy
 from wpull.database.sqltable import URLTable as SQLURLTable
+from wpull.database.threaded import ThreadedURLTable, AsyncURLTable
 from wpull.database.wrap import URLTableHookWrapper
 from wpull.driver.phantomjs import PhantomJSDriver
 from wpull.network.bandwidth import BandwidthLimiter
 from wpull.network.dns import Resolver
-from wpull.network.pool import ConnectionPool
+from wpull.network.pool import ConnectionPool, ConnectionPrewarmer
 from wpull.path import PathNamer
 from wpull.pipeline.app import AppSource, AppSession
 from wpull.pipeline.pipeline import Pipeline, PipelineSeries
+from wpull.pipeline.scheduler import HostScheduler
 from wpull.pipeline.session import URLItemSource
 from wpull.processor.coprocessor.phantomjs import PhantomJSCoprocessor
 from wpull.processor.coprocessor.proxy import ProxyCoprocessor
@@ -59,6 +64,7 @@ from wpull.resmon import ResourceMonitor
 from wpull.robotstxt import RobotsTxtPool
 from wpull.scraper.base import DemuxDocumentScraper
 from wpull.scraper.css import CSSScraper
+from wpull.scraper.executor import ScrapeExecutor
 from wpull.scraper.html import HTMLScraper, ElementWalker
 from wpull.scraper.javascript import JavaScriptScraper
 from wpull.scraper.sitemap import SitemapScraper
@@ -85,8 +91,10 @@ class Builder(object):
         self._args = args
         self._factory = Factory({
             'Application': Application,
+            'AsyncURLTable': AsyncURLTable,
             'BatchDocumentConverter': BatchDocumentConverter,
             'BandwidthLimiter': BandwidthLimiter,
+            'ConnectionPrewarmer': ConnectionPrewarmer,
             'HTTPClient': HTTPClient,
             'CookieJar': CookieJar,
             'CookieJarWrapper': CookieJarWrapper,
@@ -100,6 +108,7 @@ class Builder(object):
             'FetchRule': FetchRule,
             'FileWriter': NullWriter,
             'FTPClient': FTPClient,
+            'HostScheduler': HostScheduler,
             'FTPProcessorFetchParams': FTPProcessorFetchParams,
             'HTTPProxyServer': HTTPProxyServer,
             'HTMLParser': NotImplemented,
@@ -120,10 +129,13 @@ class Builder(object):
             'ResultRule': ResultRule,
             'RobotsTxtChecker': RobotsTxtChecker,
             'RobotsTxtPool': RobotsTxtPool,
+            'SeenURLFilter': BloomFilter,
+            'ScrapeExecutor': ScrapeExecutor,
             'SitemapScraper': SitemapScraper,
             'Statistics': Statistics,
             'URLInfo': URLInfo,
-            'URLTable': URLTableHookWrapper,
+            'URLTable': ThreadedURLTable,
+            'URLTableHookWrapper': URLTableHookWrapper,
             'URLTableImplementation': SQLURLTable,
             'URLRewriter': URLRewriter,
             'Waiter': LinearWaiter,
@@ -178,6 +190,7 @@ class Builder(object):
                 PluginSetupTask(),
                 InputURLTask(),
                 URLFiltersPostURLImportSetupTask(),
+                DNSPrefetchTask(),
             ])
 
         url_item_source = URLItemSource(app_session)
@@ -186,6 +199,7 @@ class Builder(object):
             url_item_source,
             [
                 ProcessTask(),
+                WARCRecorderQueueTask(),
                 ResmonSleepTask(),
                 BackgroundAsyncTask(),
                 CheckQuotaTask(),
@@ -213,6 +227,9 @@ class Builder(object):
             AppSource(app_session),
             [
                 BackgroundAsyncCleanupTask(),
+                ParserTeardownTask(),
+                DatabaseTeardownTask(),
+                NetworkTeardownTask(),
                 AppStopTask(),
                 WARCRecorderTeardownTask(),
                 CookieJarTeardownTask(),
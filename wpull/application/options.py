@@ -9,6 +9,7 @@ import sys
 
 from wpull.backport.logging import BraceMessage as __
 from wpull.util import IS_PYPY
+import wpull.protocol.http2.connection
 import wpull.resmon
 import wpull.string
 import wpull.version
@@ -119,6 +120,19 @@ class AppArgumentParser(argparse.ArgumentParser):
         else:
             return value
 
+    @classmethod
+    def int_positive(cls, string):
+        '''Convert string to a positive int.'''
+        try:
+            value = int(string)
+        except ValueError as error:
+            raise argparse.ArgumentTypeError(error)
+
+        if value < 1:
+            raise argparse.ArgumentTypeError(_('Value must be positive.'))
+        else:
+            return value
+
     @classmethod
     def int_bytes(cls, string):
         '''Convert string describing size to int.'''
@@ -250,6 +264,21 @@ class AppArgumentParser(argparse.ArgumentParser):
             metavar='URI',
             help=_('save database tables at SQLAlchemy URI instead of memory'),
         )
+        group.add_argument(
+            '--database-commit-interval',
+            metavar='SECS',
+            default=1.0,
+            type=float,
+            help=_('group database changes for up to SECS seconds '
+                   'before committing them'),
+        )
+        group.add_argument(
+            '--seen-url-filter',
+            metavar='N',
+            type=self.int_0_inf,
+            help=_('skip links already added using a probabilistic filter '
+                   'sized for N URLs'),
+        )
         group.add_argument(
             '--concurrent',
             metavar='N',
@@ -576,6 +605,26 @@ class AppArgumentParser(argparse.ArgumentParser):
             type=self.int_bytes,
             help=_('limit download bandwidth to RATE'),
         )
+        group.add_argument(
+            '--limit-rate-per-host',
+            metavar='RATE',
+            type=self.int_bytes,
+            help=_('limit download bandwidth of each hostname to RATE'),
+        )
+        group.add_argument(
+            '--limit-rate-per-domain',
+            metavar='RATE',
+            type=self.int_bytes,
+            help=_('limit download bandwidth of each domain to RATE'),
+        )
+        group.add_argument(
+            '--prewarm-connections',
+            metavar='N',
+            type=self.int_0_inf,
+            default=0,
+            help=_('open connections to up to N upcoming hosts in the '
+                   'background before they are requested'),
+        )
         group.add_argument(
             '--no-dns-cache',
             action='store_false',
@@ -796,6 +845,20 @@ class AppArgumentParser(argparse.ArgumentParser):
             default=True,
             help=_('disable persistent HTTP connections')
         )
+        group.add_argument(
+            '--http2',
+            action='store_true',
+            help=_('use HTTP/2 when offered by HTTPS servers and send '
+                   'concurrent requests to a host over one connection'),
+        )
+        group.add_argument(
+            '--http-pipeline',
+            metavar='N',
+            type=self.int_positive,
+            default=1,
+            help=_('send up to N GET requests to a host on a persistent '
+                   'connection without waiting for the responses'),
+        )
         group.add_argument(
             '--no-cookies',
             dest='cookies',
@@ -873,6 +936,14 @@ class AppArgumentParser(argparse.ArgumentParser):
             default=['html', 'css', 'javascript'],
             help=_('specify which link extractors to use')
         )
+        group.add_argument(
+            '--scrape-processes',
+            metavar='N',
+            type=self.int_0_inf,
+            default=0,
+            help=_('scrape documents for links using N worker processes '
+                   '(0 scrapes on the main process)')
+        )
         group.add_argument(
             '--escaped-fragment',
             action='store_true',
@@ -1393,6 +1464,9 @@ class AppArgumentParser(argparse.ArgumentParser):
                 (args.proxy_user and args.proxy_password):
             self.error(_('both username and password must be supplied'))
 
+        if args.http2 and not wpull.protocol.http2.connection.h2:
+            self.error(_('HTTP/2 support requires the h2 library'))
+
         assert args.retr_symlinks in BOOLEAN_VALUES
         args.retr_symlinks = args.retr_symlinks in BOOLEAN_TRUE_VALUES
 
@@ -8,6 +8,15 @@ class TestOptions(unittest.TestCase):
         arg_parser = AppArgumentParser(real_exit=False)
         self.assertRaises(ValueError, arg_parser.parse_args, [])
 
+    def test_positive_int(self):
+        arg_parser = AppArgumentParser(real_exit=False)
+
+        self.assertEqual(3, arg_parser.parse_args(
+            ['http://example.invalid', '--http-pipeline=3']).http_pipeline)
+        self.assertRaises(
+            ValueError, arg_parser.parse_args,
+            ['http://example.invalid', '--http-pipeline=0'])
+
     def test_app_sanity(self):
         arg_items = [
             ('--verbose', '--quiet'),
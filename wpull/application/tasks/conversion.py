@@ -19,11 +19,13 @@ class LinkConversionSetupTask(ItemTask[AppSession]):
         if not session.args.convert_links:
             return
 
+        # The converter looks up every link so it runs on the database
+        # thread with direct access to the table
         converter = session.factory.new(
             'BatchDocumentConverter',
             session.factory['HTMLParser'],
             session.factory['ElementWalker'],
-            session.factory['URLTable'],
+            session.factory['AsyncURLTable'].url_table,
             backup=session.args.backup_converted
         )
 
@@ -48,7 +50,8 @@ class QueuedFileSource(ItemSource[QueuedFileSession]):
             return
 
         try:
-            db_item = self._app_session.factory['URLTable'].convert_check_out()
+            db_item = yield from \
+                self._app_session.factory['AsyncURLTable'].convert_check_out()
         except NotFound:
             return
 
@@ -66,4 +69,5 @@ class LinkConversionTask(ItemTask[QueuedFileSession]):
         if not converter:
             return
 
-        converter.convert_by_record(session.url_record)
+        yield from session.app_session.factory['AsyncURLTable'].run(
+            converter.convert_by_record, session.url_record)
@@ -3,10 +3,14 @@ import gettext
 import itertools
 import asyncio
 import logging
+import os
 import sys
 
+from typing import Optional
+
 from wpull.backport.logging import BraceMessage as __
 from wpull.database.base import AddURLInfo
+from wpull.database.memtable import MemoryURLTable
 from wpull.database.sqltable import GenericSQLURLTable
 from wpull.pipeline.app import AppSession
 from wpull.pipeline.pipeline import ItemTask
@@ -20,30 +24,148 @@ _logger = logging.getLogger(__name__)
 class DatabaseSetupTask(ItemTask[AppSession]):
     @asyncio.coroutine
     def process(self, session: AppSession):
+        database_exists = session.args.database != ':memory:' and \
+            os.path.exists(session.args.database)
+
         if session.args.database_uri:
             session.factory.class_map[
                 'URLTableImplementation'] = GenericSQLURLTable
             url_table_impl = session.factory.new(
-                'URLTableImplementation', session.args.database_uri)
+                'URLTableImplementation', session.args.database_uri,
+                commit_interval=session.args.database_commit_interval)
+        elif session.args.database == ':memory:':
+            session.factory.class_map[
+                'URLTableImplementation'] = MemoryURLTable
+            url_table_impl = session.factory.new('URLTableImplementation')
         else:
             url_table_impl = session.factory.new(
-                'URLTableImplementation', path=session.args.database)
+                'URLTableImplementation', path=session.args.database,
+                commit_interval=session.args.database_commit_interval)
+
+        if isinstance(url_table_impl, MemoryURLTable):
+            # Operations are fast enough to run on the event loop
+            session.factory.class_map['URLTable'] = \
+                session.factory.class_map['URLTableHookWrapper']
+            url_table_hook_wrapper = url_table = session.factory.new(
+                'URLTable', url_table_impl)
+            executor = None
+        else:
+            url_table_hook_wrapper = session.factory.new(
+                'URLTableHookWrapper', url_table_impl)
+            url_table = session.factory.new('URLTable', url_table_hook_wrapper)
+            executor = url_table.executor
 
-        url_table = session.factory.new('URLTable', url_table_impl)
+        async_url_table = session.factory.new(
+            'AsyncURLTable', url_table_hook_wrapper, executor=executor)
+
+        if session.args.database_commit_interval and \
+                not isinstance(url_table_impl, MemoryURLTable):
+            async_url_table.start_periodic_flush(
+                session.args.database_commit_interval)
 
         # TODO: add a test for this
         _logger.debug(_('Releasing any in-progress items in database.'))
-        url_table.release()
+        yield from async_url_table.release()
+
+        session.factory.new(
+            'HostScheduler', async_url_table,
+            max_ready=max(100, session.args.concurrent * 10),
+            max_host_active=1 if session.args.wait else None,
+        )
+
+        if session.args.seen_url_filter:
+            self._build_seen_url_filter(session, database_exists)
+
+    @classmethod
+    def _build_seen_url_filter(cls, session: AppSession,
+                               database_exists: bool):
+        '''Create the seen URL filter and restore it from a previous run.'''
+        seen_url_filter = session.factory.new(
+            'SeenURLFilter', session.args.seen_url_filter)
+        path = get_database_sidecar_path(session, '.seen')
+
+        # The filter is only valid for the database it was saved with
+        if not path or not database_exists or not os.path.exists(path):
+            return
+
+        _logger.debug(__('Loading seen URL filter {0}.', path))
+
+        try:
+            with open(path, 'rb') as file:
+                seen_url_filter.load(file)
+        except (OSError, ValueError) as error:
+            _logger.warning(__(
+                _('Could not load seen URL filter {path}: {error}'),
+                path=path, error=error
+            ))
+        else:
+            if seen_url_filter.saturated:
+                _logger.warning(__(
+                    _('Seen URL filter is full after {count} URLs. '
+                      'Links are no longer skipped by the filter.'),
+                    count=seen_url_filter.capacity
+                ))
+
+
+class DatabaseTeardownTask(ItemTask[AppSession]):
+    @asyncio.coroutine
+    def process(self, session: AppSession):
+        if 'HostScheduler' in session.factory:
+            yield from session.factory['HostScheduler'].release()
+
+        if 'AsyncURLTable' in session.factory:
+            session.factory['AsyncURLTable'].stop_periodic_flush()
+            yield from session.factory['AsyncURLTable'].flush()
+        elif 'URLTable' in session.factory:
+            session.factory['URLTable'].flush()
+
+        path = get_database_sidecar_path(session, '.seen')
+
+        if 'SeenURLFilter' in session.factory and path:
+            # Saved only after the table is flushed so the filter never
+            # contains URLs missing from the database
+            _logger.debug(__('Saving seen URL filter {0}.', path))
+
+            try:
+                with open(path + '.tmp', 'wb') as file:
+                    session.factory['SeenURLFilter'].save(file)
+
+                os.replace(path + '.tmp', path)
+            except OSError as error:
+                # The remaining teardown tasks still need to run
+                _logger.warning(__(
+                    _('Could not save seen URL filter {path}: {error}'),
+                    path=path, error=error
+                ))
+
+                try:
+                    os.remove(path + '.tmp')
+                except OSError:
+                    pass
+
+
+def get_database_sidecar_path(session: AppSession, suffix: str) \
+        -> Optional[str]:
+    '''Return the path of a file kept next to the database.
+
+    Returns:
+        The database path with the suffix appended, or None if the
+        database is not a file.
+    '''
+    if session.args.database_uri or session.args.database == ':memory:':
+        return None
+
+    return session.args.database + suffix
 
 
 class InputURLTask(ItemTask[AppSession]):
     @asyncio.coroutine
     def process(self, session: AppSession):
-        url_table = session.factory['URLTable']
+        url_table = session.factory['AsyncURLTable']
         url_count = 0
 
         for batch in wpull.util.grouper(self._read_input_urls(session), 1000):
-            urls = url_table.add_many(AddURLInfo(url_info.url, None, None) for url_info in batch if url_info)
+            urls = yield from url_table.add_many(AddURLInfo(url_info.url, None, None) for url_info in batch if url_info)
             # TODO: attach hook for notifying progress
             url_count += len(urls)
 
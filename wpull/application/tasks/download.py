@@ -30,6 +30,7 @@ class ParserSetupTask(ItemTask[AppSession]):
     def process(self, session: AppSession):
         self._build_html_parser(session)
         self._build_demux_document_scraper(session)
+        self._build_scrape_executor(session)
 
     @classmethod
     def _build_html_parser(cls, session: AppSession):
@@ -94,6 +95,22 @@ class ParserSetupTask(ItemTask[AppSession]):
 
         return scrapers
 
+    @classmethod
+    def _build_scrape_executor(cls, session: AppSession):
+        '''Create the scrape executor.'''
+        session.factory.new(
+            'ScrapeExecutor',
+            session.factory['DemuxDocumentScraper'],
+            max_workers=session.args.scrape_processes,
+        )
+
+
+class ParserTeardownTask(ItemTask[AppSession]):
+    @asyncio.coroutine
+    def process(self, session: AppSession):
+        if 'ScrapeExecutor' in session.factory:
+            session.factory['ScrapeExecutor'].close()
+
 
 class ClientSetupTask(ItemTask[AppSession]):
     @asyncio.coroutine
@@ -151,10 +168,17 @@ class ClientSetupTask(ItemTask[AppSession]):
             ignore_length=session.args.ignore_length,
             keep_alive=session.args.http_keep_alive)
 
+        if session.args.http_keep_alive and not session.args.ignore_length:
+            pipeline_depth = session.args.http_pipeline
+        else:
+            pipeline_depth = 1
+
         return session.factory.new(
             'HTTPClient',
             connection_pool=session.factory['ConnectionPool'],
-            stream_factory=stream_factory
+            stream_factory=stream_factory,
+            pipeline_depth=pipeline_depth,
+            http2=session.args.http2
          )
 
     @classmethod
@@ -316,6 +340,8 @@ class ProcessorSetupTask(ItemTask[AppSession]):
             document_scraper=document_scraper,
             sitemaps=session.args.sitemaps,
             url_rewriter=session.factory.get('URLRewriter'),
+            seen_url_filter=session.factory.get('SeenURLFilter'),
+            scrape_executor=session.factory.get('ScrapeExecutor'),
         )
 
         web_processor_fetch_params = session.factory.new(
@@ -493,7 +519,12 @@ class ProcessTask(ItemTask[ItemSession]):
 
         assert session.is_processed
 
-        session.finish()
+        yield from session.finish()
+
+        if session.wait_time and \
+                'HostScheduler' not in session.app_session.factory:
+            _logger.debug(__('Sleeping {0}.', session.wait_time))
+            yield from asyncio.sleep(session.wait_time)
 
 
 class BackgroundAsyncTask(ItemTask[ItemSession]):
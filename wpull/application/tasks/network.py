@@ -1,11 +1,16 @@
 import functools
 import gettext
+import itertools
+import json
 import logging
+import os
 import asyncio
 
+from wpull.application.tasks.database import get_database_sidecar_path
 from wpull.backport.logging import BraceMessage as __
 from wpull.network.connection import Connection, SSLConnection
 from wpull.network.dns import IPFamilyPreference
+from wpull.network.pool import ConnectionPrewarmer
 from wpull.pipeline.pipeline import ItemTask
 from wpull.pipeline.app import AppSession
 from wpull.proxy.client import HTTPProxyConnectionPool
@@ -19,6 +24,64 @@ class NetworkSetupTask(ItemTask[AppSession]):
     def process(self, session: AppSession):
         self._build_resolver(session)
         self._build_connection_pool(session)
+        self._load_network_cache(session)
+
+        if session.args.prewarm_connections > 0:
+            self._build_connection_prewarmer(session)
+
+    @classmethod
+    def _build_connection_prewarmer(cls, session: AppSession):
+        '''Open connections to hosts as they enter the frontier.'''
+        connection_pool = session.factory['ConnectionPool']
+        host_scheduler = session.factory.get('HostScheduler')
+
+        if not host_scheduler or \
+                isinstance(connection_pool, HTTPProxyConnectionPool):
+            return
+
+        prewarmer = session.factory.new(
+            'ConnectionPrewarmer', connection_pool,
+            max_pending=session.args.prewarm_connections
+        )
+
+        def new_host_callback(url_record):
+            url_info = url_record.url_info
+
+            if url_info.scheme in ('http', 'https'):
+                prewarmer.prewarm(
+                    url_info.hostname, url_info.port,
+                    use_ssl=url_info.scheme == 'https'
+                )
+
+        host_scheduler.new_host_observer.add(new_host_callback)
+
+    @classmethod
+    def _load_network_cache(cls, session: AppSession):
+        '''Restore the DNS and happy eyeballs caches from a previous run.'''
+        path = get_database_sidecar_path(session, '.dns')
+
+        if not path or not os.path.exists(path):
+            return
+
+        _logger.debug(__('Loading network cache {0}.', path))
+
+        resolver_cache = session.factory['Resolver'].cache
+        happy_eyeballs_table = \
+            session.factory['ConnectionPool'].happy_eyeballs_table
+
+        try:
+            with open(path, 'rb') as file:
+                doc = json.loads(file.read().decode('utf-8'))
+
+            if resolver_cache is not None:
+                resolver_cache.load(doc['resolver'])
+
+            happy_eyeballs_table.load(doc['happy_eyeballs'])
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            _logger.warning(__(
+                _('Could not load network cache {path}: {error}'),
+                path=path, error=error
+            ))
 
     @classmethod
     def _build_resolver(cls, session: AppSession):
@@ -58,9 +121,13 @@ class NetworkSetupTask(ItemTask[AppSession]):
         if args.timeout:
             connect_timeout = read_timeout = args.timeout
 
-        if args.limit_rate:
-            bandwidth_limiter = session.factory.new('BandwidthLimiter',
-                                                    args.limit_rate)
+        if args.limit_rate or args.limit_rate_per_host or \
+                args.limit_rate_per_domain:
+            bandwidth_limiter = session.factory.new(
+                'BandwidthLimiter', args.limit_rate,
+                host_rate_limit=args.limit_rate_per_host,
+                domain_rate_limit=args.limit_rate_per_domain
+            )
         else:
             bandwidth_limiter = None
 
@@ -77,6 +144,7 @@ class NetworkSetupTask(ItemTask[AppSession]):
             timeout=read_timeout,
             connect_timeout=connect_timeout,
             bind_host=session.args.bind_address,
+            bandwidth_limiter=bandwidth_limiter,
             ssl_context=session.ssl_context,
         )
 
@@ -119,6 +187,7 @@ class NetworkSetupTask(ItemTask[AppSession]):
                     resolver=session.factory['Resolver'],
                     connection_factory=connection_factory,
                     ssl_connection_factory=ssl_connection_factory,
+                    tls_session_cache=session.tls_session_cache,
                     host_filter=host_filter,
                 )
 
@@ -126,5 +195,69 @@ class NetworkSetupTask(ItemTask[AppSession]):
             'ConnectionPool',
             resolver=session.factory['Resolver'],
             connection_factory=connection_factory,
-            ssl_connection_factory=ssl_connection_factory
+            ssl_connection_factory=ssl_connection_factory,
+            tls_session_cache=session.tls_session_cache
+        )
+
+
+class DNSPrefetchTask(ItemTask[AppSession]):
+    '''Resolve hostnames already in the URL table in the background.'''
+    PREFETCH_LIMIT = 1000
+
+    @asyncio.coroutine
+    def process(self, session: AppSession):
+        if not session.args.dns_cache:
+            return
+
+        resolver = session.factory['Resolver']
+        hostnames = yield from session.factory['AsyncURLTable'].get_hostnames()
+
+        _logger.debug(__('Prefetching DNS for {} hostnames.', len(hostnames)))
+
+        # Not a background task since it is cancelled instead of awaited
+        # at shutdown
+        session.dns_prefetch_task = asyncio.async(
+            resolver.prefetch(itertools.islice(
+                filter(None, hostnames), self.PREFETCH_LIMIT))
         )
+
+
+class NetworkTeardownTask(ItemTask[AppSession]):
+    @asyncio.coroutine
+    def process(self, session: AppSession):
+        if session.dns_prefetch_task:
+            session.dns_prefetch_task.cancel()
+
+        if 'ConnectionPrewarmer' in session.factory:
+            session.factory['ConnectionPrewarmer'].close()
+
+        path = get_database_sidecar_path(session, '.dns')
+
+        if not path or 'ConnectionPool' not in session.factory:
+            return
+
+        _logger.debug(__('Saving network cache {0}.', path))
+
+        resolver_cache = session.factory['Resolver'].cache
+        doc = {
+            'resolver': resolver_cache.dump() if resolver_cache else [],
+            'happy_eyeballs':
+                session.factory['ConnectionPool'].happy_eyeballs_table.dump(),
+        }
+
+        try:
+            with open(path + '.tmp', 'wb') as file:
+                file.write(json.dumps(doc).encode('utf-8'))
+
+            os.replace(path + '.tmp', path)
+        except OSError as error:
+            # The remaining teardown tasks still need to run
+            _logger.warning(__(
+                _('Could not save network cache {path}: {error}'),
+                path=path, error=error
+            ))
+
+            try:
+                os.remove(path + '.tmp')
+            except OSError:
+                pass
@@ -8,8 +8,10 @@ import tempfile
 import atexit
 
 from wpull.backport.logging import BraceMessage as __
+from wpull.network.connection import TLSSessionCache
 from wpull.pipeline.pipeline import ItemTask
 from wpull.pipeline.app import AppSession
+import wpull.protocol.http2.connection
 import wpull.util
 
 _logger = logging.getLogger(__name__)
@@ -20,6 +22,7 @@ class SSLContextTask(ItemTask[AppSession]):
     @asyncio.coroutine
     def process(self, session: AppSession):
         session.ssl_context = self._build_ssl_context(session)
+        session.tls_session_cache = TLSSessionCache()
 
     @classmethod
     def _build_ssl_context(cls, session: AppSession) -> ssl.SSLContext:
@@ -48,6 +51,10 @@ class SSLContextTask(ItemTask[AppSession]):
             else:
                 _logger.warning(_('Unable to disable TLS compression.'))
 
+        if args.http2:
+            ssl_context.set_alpn_protocols(
+                [wpull.protocol.http2.connection.ALPN_PROTOCOL, 'http/1.1'])
+
         if args.certificate:
             ssl_context.load_cert_chain(args.certificate, args.private_key)
 
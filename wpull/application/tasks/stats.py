@@ -6,6 +6,8 @@ import asyncio
 
 from wpull.application.plugin import PluginFunctions, event_interface
 from wpull.backport.logging import BraceMessage as __
+from wpull.network.connection import get_timer_wheel
+from wpull.network.pool import PoolStatistics
 from wpull.pipeline.pipeline import ItemTask
 from wpull.pipeline.app import AppSession
 from wpull.stats import Statistics
@@ -39,6 +41,23 @@ class StatsStopTask(ItemTask[AppSession], HookableMixin):
         # TODO: human_format_speed arg
         self._print_stats(statistics)
 
+        if 'ConnectionPool' in session.factory:
+            self._print_pool_stats(
+                session.factory['ConnectionPool'].statistics)
+
+        if session.tls_session_cache:
+            _logger.debug(__(
+                'TLS handshakes: {resumed} resumed, {full} full.',
+                resumed=session.tls_session_cache.resumed,
+                full=session.tls_session_cache.full_handshakes
+            ))
+
+        timer_wheel = get_timer_wheel()
+        _logger.debug(__(
+            'Timeout deadlines: {active} active, {peak} at most.',
+            active=timer_wheel.active_count, peak=timer_wheel.peak_count
+        ))
+
         self.event_dispatcher.notify(PluginFunctions.finishing_statistics, session, statistics)
 
     @classmethod
@@ -81,6 +100,16 @@ class StatsStopTask(ItemTask[AppSession], HookableMixin):
         if stats.is_quota_exceeded:
             _logger.info(_('Download quota exceeded.'))
 
+    @classmethod
+    def _print_pool_stats(cls, stats: PoolStatistics):
+        '''Log the connection reuse counters.'''
+        _logger.debug(__(
+            'Connections: {hits} reused, {misses} opened, {shared} shared, '
+            '{evictions} evicted. Reuse rate: {reuse_rate:.1%}.',
+            hits=stats.hits, misses=stats.misses, shared=stats.shared,
+            evictions=stats.evictions, reuse_rate=stats.reuse_rate
+        ))
+
     @staticmethod
     @event_interface(PluginFunctions.finishing_statistics)
     def plugin_finishing_statistics(app_session: AppSession, statistics: Statistics):
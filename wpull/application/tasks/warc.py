@@ -8,6 +8,7 @@ import sys
 from wpull.backport.logging import BraceMessage as __
 from wpull.pipeline.app import AppSession
 from wpull.pipeline.pipeline import ItemTask
+from wpull.pipeline.session import ItemSession
 from wpull.warc.recorder import WARCRecorder, WARCRecorderParams
 import wpull.driver.phantomjs
 import wpull.processor.coprocessor.youtubedl
@@ -17,6 +18,9 @@ import wpull.warc.format
 _logger = logging.getLogger(__name__)
 _ = gettext.gettext
 
+WARC_WRITER_QUEUE_SIZE = 100
+'''Maximum number of WARC writes waiting for the writer thread.'''
+
 
 class WARCRecorderSetupTask(ItemTask[AppSession]):
     @asyncio.coroutine
@@ -70,12 +74,23 @@ class WARCRecorderSetupTask(ItemTask[AppSession]):
                 move_to=args.warc_move,
                 url_table=url_table,
                 software_string=software_string,
+                writer_queue_size=WARC_WRITER_QUEUE_SIZE,
             ),
         )
         warc_recorder.listen_to_http_client(session.factory['HTTPClient'])
         warc_recorder.listen_to_ftp_client(session.factory['FTPClient'])
 
 
+class WARCRecorderQueueTask(ItemTask[ItemSession]):
+    @asyncio.coroutine
+    def process(self, session: ItemSession):
+        '''Hold back the next download while the WARC writer is behind.'''
+        warc_recorder = session.app_session.factory.get('WARCRecorder')
+
+        if warc_recorder:
+            yield from warc_recorder.wait_for_queue()
+
+
 class WARCRecorderTeardownTask(ItemTask[AppSession]):
     @asyncio.coroutine
     def process(self, session: AppSession):
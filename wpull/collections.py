@@ -3,8 +3,11 @@
 from collections import OrderedDict
 import collections
 import copy
+import hashlib
 import itertools
 import functools
+import math
+import struct
 
 
 class OrderedDefaultDict(OrderedDict):
@@ -259,3 +262,111 @@ class FrozenDict(collections.Mapping, collections.Hashable):
 
 
 EmptyFrozenDict = functools.partial(FrozenDict, {})
+
+
+class BloomFilter(object):
+    '''Probabilistic set of strings.
+
+    Membership tests may return false positives but never false negatives.
+
+    Args:
+        capacity: The expected number of items.
+        error_rate: The probability of a false positive once `capacity`
+            items are added. Beyond `capacity`, the probability keeps
+            growing; see :attr:`saturated`.
+    '''
+    HEADER = struct.Struct('>QQQQ')
+
+    def __init__(self, capacity: int, error_rate: float=0.000001):
+        assert capacity > 0, capacity
+        assert 0 < error_rate < 1, error_rate
+
+        self._bit_count = max(
+            8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._hash_count = max(
+            1, round(self._bit_count / capacity * math.log(2)))
+        self._bits = bytearray((self._bit_count + 7) // 8)
+        self._count = 0
+        self._capacity = capacity
+
+    def _get_indexes(self, item: str):
+        '''Return the bit positions of the item using double hashing.'''
+        digest = hashlib.md5(item.encode('utf-8', 'surrogatepass')).digest()
+        hash_1 = int.from_bytes(digest[:8], 'big')
+        hash_2 = int.from_bytes(digest[8:], 'big') | 1
+
+        return [
+            (hash_1 + index * hash_2) % self._bit_count
+            for index in range(self._hash_count)
+        ]
+
+    def add(self, item: str):
+        '''Add the item.'''
+        bits = self._bits
+        new = False
+
+        for index in self._get_indexes(item):
+            mask = 1 << (index & 7)
+
+            if not bits[index >> 3] & mask:
+                bits[index >> 3] |= mask
+                new = True
+
+        if new:
+            self._count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+
+        for index in self._get_indexes(item):
+            if not bits[index >> 3] & (1 << (index & 7)):
+                return False
+
+        return True
+
+    def __len__(self) -> int:
+        '''Return the number of distinct items added, approximately.'''
+        return self._count
+
+    @property
+    def capacity(self) -> int:
+        '''The number of items the filter was sized for.'''
+        return self._capacity
+
+    @property
+    def saturated(self) -> bool:
+        '''Whether more items than :attr:`capacity` were added.
+
+        The false positive rate is no longer bounded by the error rate.
+        '''
+        return self._count > self._capacity
+
+    def save(self, file):
+        '''Write the filter to a binary file object.'''
+        file.write(self.HEADER.pack(
+            self._bit_count, self._hash_count, self._count, self._capacity))
+        file.write(self._bits)
+
+    def load(self, file):
+        '''Replace the contents with a filter written by :meth:`save`.
+
+        Raises:
+            ValueError: The file is not a valid filter.
+        '''
+        header = file.read(self.HEADER.size)
+
+        if len(header) != self.HEADER.size:
+            raise ValueError('Truncated filter header.')
+
+        bit_count, hash_count, count, capacity = self.HEADER.unpack(header)
+        bits = bytearray(file.read())
+
+        if not bit_count or not hash_count or not capacity or \
+                len(bits) != (bit_count + 7) // 8:
+            raise ValueError('Filter size mismatch.')
+
+        self._bit_count = bit_count
+        self._hash_count = hash_count
+        self._bits = bits
+        self._count = count
+        self._capacity = capacity
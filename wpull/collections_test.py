@@ -1,9 +1,10 @@
 # encoding=utf-8
 
 import copy
+import io
 import unittest
 
-from wpull.collections import LinkedList, OrderedDefaultDict
+from wpull.collections import LinkedList, OrderedDefaultDict, BloomFilter
 
 
 class TestCollections(unittest.TestCase):
@@ -165,3 +166,46 @@ class TestCollections(unittest.TestCase):
             self.assertEqual(('a', 'b'), tuple(linked_list))
 
             linked_list.clear()
+
+    def test_bloom_filter(self):
+        bloom_filter = BloomFilter(1000, error_rate=0.001)
+
+        for index in range(1000):
+            bloom_filter.add('http://example.com/{}'.format(index))
+
+        for index in range(1000):
+            self.assertIn('http://example.com/{}'.format(index), bloom_filter)
+
+        false_positives = sum(
+            1 for index in range(1000)
+            if 'http://example.net/{}'.format(index) in bloom_filter
+        )
+
+        self.assertLess(false_positives, 10)
+        self.assertNotIn('http://example.com/a\udcff', bloom_filter)
+
+        file = io.BytesIO()
+        bloom_filter.save(file)
+        file.seek(0)
+        loaded_bloom_filter = BloomFilter(10)
+        loaded_bloom_filter.load(file)
+
+        self.assertEqual(len(bloom_filter), len(loaded_bloom_filter))
+        self.assertEqual(1000, loaded_bloom_filter.capacity)
+        self.assertIn('http://example.com/1', loaded_bloom_filter)
+        self.assertNotIn('http://example.com/1000', loaded_bloom_filter)
+
+        self.assertRaises(
+            ValueError, loaded_bloom_filter.load, io.BytesIO(b'abc'))
+
+    def test_bloom_filter_saturated(self):
+        bloom_filter = BloomFilter(10)
+
+        for index in range(10):
+            bloom_filter.add('http://example.com/{}'.format(index))
+
+        self.assertFalse(bloom_filter.saturated)
+
+        bloom_filter.add('http://example.com/10')
+
+        self.assertTrue(bloom_filter.saturated)
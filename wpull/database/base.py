@@ -2,7 +2,7 @@
 import abc
 
 import typing
-from typing import Iterator, Optional
+from typing import Iterator, Optional, List
 
 from wpull.pipeline.item import URLRecord, URLProperties, URLData, Status, \
     URLResult
@@ -91,6 +91,32 @@ class BaseURLTable(object, metaclass=abc.ABCMeta):
             NotFound
         '''
 
+    def check_out_many(self, filter_status: Status, count: int,
+                       filter_level: Optional[int]=None) -> List[URLRecord]:
+        '''Find URLs, mark them in progress, and return them.
+
+        Subclasses should override this to claim the URLs in a single
+        transaction.
+
+        Args:
+            filter_status: Gets items with given status.
+            count: The maximum number of items to return.
+            filter_level: Gets items with `filter_level` or lower.
+
+        Returns:
+            The URL records. The list is empty if no items were found.
+        '''
+        url_records = []
+
+        for dummy in range(count):
+            try:
+                url_records.append(
+                    self.check_out(filter_status, filter_level))
+            except NotFound:
+                break
+
+        return url_records
+
     @abc.abstractmethod
     def check_in(self, url: str, new_status: Status,
                  increment_try_count: bool=True,
@@ -121,6 +147,12 @@ class BaseURLTable(object, metaclass=abc.ABCMeta):
         '''Remove a URL from the database.'''
         self.remove_many([url])
 
+    def flush(self):
+        '''Write any buffered changes to storage.
+
+        The default implementation does nothing.
+        '''
+
     @abc.abstractmethod
     def close(self):
         '''Run any clean-up actions and close the table.'''
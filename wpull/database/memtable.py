@@ -0,0 +1,239 @@
+'''In-memory table implementation.'''
+import collections
+import sys
+
+from wpull.database.base import BaseURLTable, NotFound
+from wpull.pipeline.item import Status, URLRecord, LinkType
+from wpull.url import URLInfo
+
+
+class MemoryURLEntry(object):
+    '''Compact storage of a URL record.'''
+    __slots__ = (
+        'url', 'parent_url', 'root_url', 'status', 'try_count', 'level',
+        'inline_level', 'link_type', 'priority', 'post_data', 'status_code',
+        'filename',
+    )
+
+    def __init__(self, url: str):
+        self.url = url
+        self.parent_url = None
+        self.root_url = None
+        self.status = Status.todo
+        self.try_count = 0
+        self.level = 0
+        self.inline_level = None
+        self.link_type = None
+        self.priority = 0
+        self.post_data = None
+        self.status_code = None
+        self.filename = None
+
+    def to_plain(self) -> URLRecord:
+        record = URLRecord()
+
+        for name in self.__slots__:
+            setattr(record, name, getattr(self, name))
+
+        return record
+
+
+class MemoryURLTable(BaseURLTable):
+    '''URL table with storage in memory only.
+
+    URL strings are interned and the entries for each status are indexed
+    so checking out a URL does not scan through the table. The table cannot
+    be resumed once the program exits.
+    '''
+    def __init__(self):
+        super().__init__()
+        self._entries = {}
+        self._status_index = dict(
+            (status, collections.OrderedDict()) for status in Status
+        )
+        self._hostnames = collections.OrderedDict()
+        self._visits = {}
+        self._queued_files = {}
+        self._queued_file_ids = {}
+        self._file_status_index = dict(
+            (status, collections.OrderedDict()) for status in Status
+        )
+        self._file_id_counter = 0
+
+    def _get_entry(self, url: str) -> MemoryURLEntry:
+        try:
+            return self._entries[url]
+        except KeyError:
+            raise NotFound() from None
+
+    def _set_status(self, entry: MemoryURLEntry, status: Status):
+        del self._status_index[entry.status][entry.url]
+        entry.status = status
+        self._status_index[status][entry.url] = entry
+
+    def _set_values(self, entry: MemoryURLEntry, values):
+        for name, value in values:
+            if name == 'status':
+                self._set_status(entry, Status(value))
+            elif name == 'link_type':
+                entry.link_type = LinkType(value)
+            elif name in ('parent_url', 'root_url'):
+                setattr(entry, name, sys.intern(value))
+            else:
+                setattr(entry, name, value)
+
+    def count(self):
+        return len(self._entries)
+
+    def get_one(self, url):
+        return self._get_entry(url).to_plain()
+
+    def get_all(self):
+        for entry in tuple(self._entries.values()):
+            yield entry.to_plain()
+
+    def add_many(self, new_urls):
+        assert not isinstance(new_urls, (str, bytes)), \
+            'Expected a list-like. Got {}'.format(new_urls)
+
+        added_urls = []
+
+        for url, url_properties, url_data in new_urls:
+            assert isinstance(url, str), type(url)
+
+            if url in self._entries:
+                continue
+
+            url = sys.intern(url)
+            entry = MemoryURLEntry(url)
+            self._entries[url] = entry
+            self._status_index[entry.status][url] = entry
+
+            if url_properties:
+                self._set_values(entry, url_properties.database_items())
+            else:
+                entry.root_url = entry.parent_url = url
+
+            if url_data:
+                self._set_values(entry, url_data.database_items())
+
+            self._hostnames[URLInfo.parse(url).hostname] = True
+            added_urls.append(url)
+
+        return added_urls
+
+    def check_out(self, filter_status, level=None):
+        index = self._status_index[filter_status]
+
+        if level is None:
+            entry = next(iter(index.values()), None)
+        else:
+            entry = next(
+                (entry for entry in index.values() if entry.level < level),
+                None
+            )
+
+        if not entry:
+            raise NotFound()
+
+        self._set_status(entry, Status.in_progress)
+
+        return entry.to_plain()
+
+    def check_in(self, url, new_status, increment_try_count=True,
+                 url_result=None):
+        try:
+            entry = self._get_entry(url)
+        except NotFound:
+            return
+
+        self._set_status(entry, new_status)
+
+        if url_result:
+            self._set_values(entry, url_result.database_items())
+
+        if increment_try_count:
+            entry.try_count += 1
+
+        if new_status == Status.done and url_result and url_result.filename \
+                and url not in self._queued_file_ids:
+            self._file_id_counter += 1
+            file_id = self._file_id_counter
+            self._queued_file_ids[entry.url] = file_id
+            self._queued_files[file_id] = [entry.url, Status.todo]
+            self._file_status_index[Status.todo][file_id] = True
+
+    def update_one(self, url, **kwargs):
+        try:
+            entry = self._get_entry(url)
+        except NotFound:
+            return
+
+        self._set_values(entry, kwargs.items())
+
+    def release(self):
+        for entry in tuple(self._status_index[Status.in_progress].values()):
+            self._set_status(entry, Status.todo)
+
+        for file_id in tuple(self._file_status_index[Status.in_progress]):
+            self._set_file_status(file_id, Status.todo)
+
+    def remove_many(self, urls):
+        assert not isinstance(urls, (str, bytes)), \
+            'Expected list-like. Got {}.'.format(urls)
+
+        for url in urls:
+            entry = self._entries.pop(url, None)
+
+            if entry:
+                del self._status_index[entry.status][url]
+
+    def close(self):
+        pass
+
+    def add_visits(self, visits):
+        for url, warc_id, payload_digest in visits:
+            if url not in self._visits:
+                self._visits[sys.intern(url)] = (warc_id, payload_digest)
+
+    def get_revisit_id(self, url, payload_digest):
+        visit = self._visits.get(url)
+
+        if visit and visit[1] == payload_digest:
+            return visit[0]
+
+    def get_hostnames(self):
+        return list(self._hostnames)
+
+    def get_root_url_todo_count(self):
+        return sum(
+            1 for entry in self._status_index[Status.todo].values()
+            if entry.level == 0
+        )
+
+    def _set_file_status(self, file_id: int, status: Status):
+        queued_file = self._queued_files[file_id]
+        del self._file_status_index[queued_file[1]][file_id]
+        queued_file[1] = status
+        self._file_status_index[status][file_id] = True
+
+    def convert_check_out(self):
+        for file_id in self._file_status_index[Status.todo]:
+            url = self._queued_files[file_id][0]
+            entry = self._entries.get(url)
+
+            if entry:
+                break
+        else:
+            raise NotFound()
+
+        self._set_file_status(file_id, Status.in_progress)
+
+        return file_id, entry.to_plain()
+
+    def convert_check_in(self, file_id, status):
+        if file_id in self._queued_files:
+            self._set_file_status(file_id, status)
+
+
+__all__ = ('MemoryURLTable',)
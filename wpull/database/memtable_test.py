@@ -0,0 +1,47 @@
+from wpull.database.base import AddURLInfo, NotFound
+from wpull.database.memtable import MemoryURLTable
+from wpull.database.sqltable_test import TestDatabase
+from wpull.pipeline.item import Status, URLResult
+
+
+class TestMemoryDatabase(TestDatabase):
+    def get_url_table(self):
+        return MemoryURLTable()
+
+    def test_queued_files(self):
+        url_table = self.get_url_table()
+
+        url_table.add_many([
+            AddURLInfo('http://example.com/1', None, None),
+            AddURLInfo('http://example.com/2', None, None),
+        ])
+        url_result = URLResult()
+        url_result.filename = 'example.com/1'
+
+        url_record = url_table.check_out(Status.todo)
+        url_table.check_in(url_record.url, Status.done, url_result=url_result)
+
+        file_id, url_record = url_table.convert_check_out()
+
+        self.assertEqual('example.com/1', url_record.filename)
+
+        with self.assertRaises(NotFound):
+            url_table.convert_check_out()
+
+        url_table.release()
+        self.assertEqual(file_id, url_table.convert_check_out()[0])
+        url_table.convert_check_in(file_id, Status.done)
+
+        with self.assertRaises(NotFound):
+            url_table.convert_check_out()
+
+    def test_remove(self):
+        url_table = self.get_url_table()
+
+        url_table.add_one('http://example.com/1')
+        url_table.remove_one('http://example.com/1')
+
+        self.assertEqual(0, url_table.count())
+
+        with self.assertRaises(NotFound):
+            url_table.check_out(Status.todo)
@@ -1,16 +1,19 @@
 '''Database SQLAlchemy model.'''
 import contextlib
+import logging
 
 import sqlalchemy.ext.declarative
-from sqlalchemy import insert, select, and_, func
+from sqlalchemy import insert, select, and_, func, inspect
 from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql.schema import Column, ForeignKey
+from sqlalchemy.sql.schema import Column, ForeignKey, Index
 from sqlalchemy.sql.sqltypes import Integer, Enum, String
 from typing import Iterable
 
 from wpull.pipeline.item import Status, URLRecord, LinkType
 
+_logger = logging.getLogger(__name__)
+
 DBBase = sqlalchemy.ext.declarative.declarative_base()
 
 
@@ -32,6 +35,12 @@ class URLString(DBBase):
 
 class QueuedURL(DBBase):
     __tablename__ = 'queued_urls'
+    __table_args__ = (
+        # Check out by status, optionally under a depth limit
+        Index('ix_queued_urls_status_level', 'status', 'level'),
+        # Check out by status in insertion order
+        Index('ix_queued_urls_status_id', 'status', 'id'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
 
@@ -65,7 +74,6 @@ class QueuedURL(DBBase):
     # -- Fetch parameters --
     status = Column(
         Enum(*list(member.value for member in Status)),
-        index=True,
         default=Status.todo.value,
         nullable=False,
         doc='Status of the completion of the item.'
@@ -175,6 +183,9 @@ class Hostname(DBBase):
 
 class QueuedFile(DBBase):
     __tablename__ = 'queued_files'
+    __table_args__ = (
+        Index('ix_queued_files_status_id', 'status', 'id'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     queued_url_id = Column(Integer, ForeignKey(QueuedURL.id),
@@ -184,11 +195,45 @@ class QueuedFile(DBBase):
     )
     status = Column(
         Enum(*list(member.value for member in Status)),
-        index=True,
         default=Status.todo.value,
         nullable=False,
     )
 
 
+_OBSOLETE_INDEXES = {
+    'queued_urls': ('ix_queued_urls_status',),
+    'queued_files': ('ix_queued_files_status',),
+}
+'''Indexes from older versions replaced by the composite indexes.'''
+
+
+def upgrade_schema(engine):
+    '''Create the tables and bring the indexes of existing tables up to date.
+
+    ``create_all`` does not add indexes to tables that already exist so
+    databases from older versions are upgraded here.
+    '''
+    DBBase.metadata.create_all(engine)
+    inspector = inspect(engine)
+
+    for table in DBBase.metadata.sorted_tables:
+        index_names = frozenset(
+            index_info['name']
+            for index_info in inspector.get_indexes(table.name)
+        )
+
+        for index in table.indexes:
+            if index.name not in index_names:
+                _logger.info('Creating index %s.', index.name)
+                index.create(engine)
+
+        for index_name in _OBSOLETE_INDEXES.get(table.name, ()):
+            if index_name in index_names:
+                _logger.info('Dropping index %s.', index_name)
+                # Use a copy of the table so the index isn't added to the model
+                old_table = table.tometadata(sqlalchemy.MetaData())
+                Index(index_name, old_table.c.status).drop(engine)
+
+
 __all__ = ('DBBase', 'QueuedURL', 'URLString', 'WARCVisit', 'Hostname',
-           'QueuedFile')
+           'QueuedFile', 'upgrade_schema')
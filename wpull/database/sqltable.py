@@ -3,18 +3,20 @@ import abc
 import contextlib
 import enum
 import logging
+import time
 
 import sqlalchemy.event
 from sqlalchemy import func
 from sqlalchemy.engine import create_engine
+from sqlalchemy.orm import joinedload
 from sqlalchemy.orm.session import sessionmaker
-from sqlalchemy.pool import SingletonThreadPool
+from sqlalchemy.pool import SingletonThreadPool, StaticPool
 from sqlalchemy.sql.expression import insert, update, select, delete, \
     bindparam
 
 from wpull.database.base import BaseURLTable, NotFound
-from wpull.database.sqlmodel import QueuedURL, URLString, DBBase, WARCVisit, \
-    Hostname, QueuedFile
+from wpull.database.sqlmodel import QueuedURL, URLString, WARCVisit, \
+    Hostname, QueuedFile, upgrade_schema
 from wpull.pipeline.item import Status
 from wpull.url import URLInfo
 
@@ -22,6 +24,25 @@ _logger = logging.getLogger(__name__)
 
 
 class BaseSQLURLTable(BaseURLTable):
+    '''Base SQLAlchemy URL table.
+
+    Args:
+        commit_interval: If given, operations are grouped into a single
+            transaction that is committed once it is `commit_interval`
+            seconds old. Each operation runs in a savepoint so an error
+            only undoes that operation. Call :meth:`flush` periodically to
+            commit a group when no further operations arrive.
+        commit_size: The maximum number of operations grouped into a
+            single transaction.
+    '''
+    def __init__(self, commit_interval: float=0.0, commit_size: int=1000):
+        super().__init__()
+        self._commit_interval = commit_interval
+        self._commit_size = commit_size
+        self._group_session = None
+        self._group_operation_count = 0
+        self._group_start_time = None
+
     @abc.abstractproperty
     def _session_maker(self):
         pass
@@ -29,10 +50,69 @@ class BaseSQLURLTable(BaseURLTable):
     @contextlib.contextmanager
     def _session(self):
         """Provide a transactional scope around a series of operations."""
-        # Taken from the session docs.
-        session = self._session_maker()
+        if self._commit_interval:
+            with self._group_session_scope() as session:
+                yield session
+        else:
+            # Taken from the session docs.
+            session = self._session_maker()
+            try:
+                yield session
+                session.commit()
+            except:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+
+    @contextlib.contextmanager
+    def _group_session_scope(self):
+        '''Provide a scope within a transaction shared with other operations.'''
+        if not self._group_session:
+            self._group_session = self._session_maker()
+            self._group_operation_count = 0
+            self._group_start_time = time.monotonic()
+
+        session = self._group_session
+        savepoint = session.begin_nested()
+
         try:
             yield session
+            savepoint.commit()
+        except Exception:
+            # Only undo this operation. Exceptions such as NotFound are
+            # normal results and must not discard the grouped writes.
+            try:
+                savepoint.rollback()
+            except Exception:
+                self._group_session = None
+                session.rollback()
+                session.close()
+                raise
+
+            raise
+
+        # Rows may be changed later by statements that bypass the ORM
+        session.expire_all()
+        self._group_operation_count += 1
+
+        if self._group_operation_count >= self._commit_size or \
+                time.monotonic() - self._group_start_time \
+                >= self._commit_interval:
+            self.flush()
+
+    def flush(self):
+        session = self._group_session
+
+        if not session:
+            return
+
+        _logger.debug('Committing %d grouped operations.',
+                      self._group_operation_count)
+
+        self._group_session = None
+
+        try:
             session.commit()
         except:
             session.rollback()
@@ -138,7 +218,8 @@ class BaseSQLURLTable(BaseURLTable):
         with self._session() as session:
             if level is None:
                 url_record = session.query(QueuedURL).filter_by(
-                    status=filter_status.value).first()
+                    status=filter_status.value)\
+                    .order_by(QueuedURL.id).first()
             else:
                 url_record = session.query(QueuedURL)\
                     .filter(
@@ -153,6 +234,44 @@ class BaseSQLURLTable(BaseURLTable):
 
             return url_record.to_plain()
 
+    def check_out_many(self, filter_status, count, level=None):
+        with self._session() as session:
+            query = session.query(QueuedURL).options(
+                joinedload(QueuedURL.url_string),
+                joinedload(QueuedURL.parent_url_string),
+                joinedload(QueuedURL.root_url_string),
+            )
+
+            if level is None:
+                query = query.filter_by(status=filter_status.value)\
+                    .order_by(QueuedURL.id)
+            else:
+                query = query.filter(
+                    QueuedURL.status == filter_status.value,
+                    QueuedURL.level < level,
+                )
+
+            url_records = query.limit(count).all()
+
+            if not url_records:
+                return []
+
+            session.execute(
+                update(QueuedURL)
+                .values({QueuedURL.status: Status.in_progress.value})
+                .where(QueuedURL.id.in_(
+                    [url_record.id for url_record in url_records]))
+            )
+
+            plain_records = []
+
+            for url_record in url_records:
+                plain_record = url_record.to_plain()
+                plain_record.status = Status.in_progress
+                plain_records.append(plain_record)
+
+            return plain_records
+
     def check_in(self, url, new_status, increment_try_count=True,
                  url_result=None):
         with self._session() as session:
@@ -240,7 +359,7 @@ class BaseSQLURLTable(BaseURLTable):
     def convert_check_out(self):
         with self._session() as session:
             queued_file = session.query(QueuedFile).filter_by(
-                status=Status.todo.value).first()
+                status=Status.todo.value).order_by(QueuedFile.id).first()
 
             if not queued_file:
                 raise NotFound()
@@ -266,19 +385,31 @@ class SQLiteURLTable(BaseSQLURLTable):
 
     Args:
         path: A SQLite filename
+        kwargs: Arguments to :class:`BaseSQLURLTable`.
     '''
-    def __init__(self, path=':memory:'):
-        super().__init__()
+    def __init__(self, path=':memory:', **kwargs):
+        super().__init__(**kwargs)
         # We use a SingletonThreadPool always because we are using WAL
         # and want SQLite to handle the checkpoints. Otherwise NullPool
         # will open and close the connection rapidly, defeating the purpose
         # of WAL.
         escaped_path = path.replace('?', '_')
-        self._engine = create_engine(
-            'sqlite:///{0}'.format(escaped_path), poolclass=SingletonThreadPool)
+
+        if path == ':memory:':
+            # The in-memory database only exists within its connection so
+            # it is shared with the database thread.
+            self._engine = create_engine(
+                'sqlite://', poolclass=StaticPool,
+                connect_args={'check_same_thread': False})
+        else:
+            self._engine = create_engine(
+                'sqlite:///{0}'.format(escaped_path),
+                poolclass=SingletonThreadPool)
         sqlalchemy.event.listen(
             self._engine, 'connect', self._apply_pragmas_callback)
-        DBBase.metadata.create_all(self._engine)
+        sqlalchemy.event.listen(
+            self._engine, 'begin', self._begin_callback)
+        upgrade_schema(self._engine)
         self._session_maker_instance = sessionmaker(bind=self._engine)
 
     @classmethod
@@ -291,11 +422,19 @@ class SQLiteURLTable(BaseSQLURLTable):
         connection.execute('PRAGMA journal_mode=WAL')
         connection.execute('PRAGMA synchronous=NORMAL')
 
+        # Let SQLAlchemy emit BEGIN so savepoints work with pysqlite
+        connection.isolation_level = None
+
+    @classmethod
+    def _begin_callback(cls, connection):
+        connection.execute('BEGIN')
+
     @property
     def _session_maker(self):
         return self._session_maker_instance
 
     def close(self):
+        self.flush()
         self._engine.dispose()
 
 
@@ -304,11 +443,12 @@ class GenericSQLURLTable(BaseSQLURLTable):
 
     Args:
         url: A SQLAlchemy database URL.
+        kwargs: Arguments to :class:`BaseSQLURLTable`.
     '''
-    def __init__(self, url):
-        super().__init__()
+    def __init__(self, url, **kwargs):
+        super().__init__(**kwargs)
         self._engine = create_engine(url)
-        DBBase.metadata.create_all(self._engine)
+        upgrade_schema(self._engine)
         self._session_maker_instance = sessionmaker(bind=self._engine)
 
     @property
@@ -316,6 +456,7 @@ class GenericSQLURLTable(BaseSQLURLTable):
         return self._session_maker_instance
 
     def close(self):
+        self.flush()
         self._engine.dispose()
 
 
@@ -1,9 +1,13 @@
 # encoding=utf-8
 
 
+import os.path
+import tempfile
 import time
 import unittest
 
+import sqlalchemy
+
 from wpull.database.base import NotFound, AddURLInfo
 from wpull.database.sqltable import SQLiteURLTable
 from wpull.pipeline.item import Status, URLProperties, URLResult
@@ -69,6 +73,41 @@ class TestDatabase(unittest.TestCase):
         self.assertEqual(1, len(hostnames))
         self.assertEqual('example.com', hostnames[0])
 
+    def test_check_out_many(self):
+        url_table = self.get_url_table()
+
+        urls = [
+            'http://example.com/{}'.format(index) for index in range(5)
+        ]
+        url_properties = URLProperties()
+        url_properties.parent_url = 'http://example.com'
+        url_properties.level = 1
+        url_properties.root_url = 'http://example.net'
+
+        url_table.add_many(
+            [AddURLInfo(url, url_properties, None) for url in urls]
+        )
+
+        url_records = url_table.check_out_many(Status.todo, 3)
+
+        self.assertEqual(3, len(url_records))
+
+        for url_record in url_records:
+            self.assertIn(url_record.url, urls)
+            self.assertEqual(Status.in_progress, url_record.status)
+            self.assertEqual('http://example.com', url_record.parent_url)
+            self.assertEqual('http://example.net', url_record.root_url)
+            self.assertEqual(
+                Status.in_progress, url_table.get_one(url_record.url).status)
+
+        self.assertEqual(2, len(url_table.check_out_many(Status.todo, 3)))
+        self.assertFalse(url_table.check_out_many(Status.todo, 3))
+        self.assertFalse(url_table.check_out_many(Status.todo, 3, 1))
+
+        url_table.release()
+
+        self.assertEqual(5, len(url_table.check_out_many(Status.todo, 10)))
+
     def test_warc_visits(self):
         url_table = self.get_url_table()
 
@@ -99,3 +138,85 @@ class TestDatabase(unittest.TestCase):
             url_table.get_revisit_id('http://example.com/asdf', 'digest123')
         )
 
+
+class TestDatabaseGroupCommit(TestDatabase):
+    def get_url_table(self):
+        return SQLiteURLTable(':memory:', commit_interval=60)
+
+    def test_flush(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'wpull.db')
+            url_table = SQLiteURLTable(path, commit_interval=60)
+            other_url_table = SQLiteURLTable(path)
+
+            url_table.add_one('http://example.com')
+            url_record = url_table.check_out(Status.todo)
+            url_table.check_in(url_record.url, Status.done)
+
+            self.assertEqual(Status.done,
+                             url_table.get_one('http://example.com').status)
+            self.assertEqual(0, other_url_table.count())
+
+            url_table.flush()
+
+            self.assertEqual(1, other_url_table.count())
+            url_record = other_url_table.get_one('http://example.com')
+            self.assertEqual(Status.done, url_record.status)
+            self.assertEqual(1, url_record.try_count)
+
+            other_url_table.close()
+            url_table.close()
+
+    def test_error_keeps_group(self):
+        url_table = self.get_url_table()
+
+        url_table.add_many([
+            AddURLInfo('http://example.com/{}'.format(index), None, None)
+            for index in range(5)
+        ])
+
+        with self.assertRaises(NotFound):
+            url_table.check_out(Status.error)
+
+        with self.assertRaises(NotFound):
+            url_table.get_one('http://example.com/nope')
+
+        self.assertEqual(5, url_table.count())
+
+        url_table.flush()
+
+        self.assertEqual(5, url_table.count())
+
+
+class TestSchemaUpgrade(unittest.TestCase):
+    def get_index_names(self, url_table, table_name):
+        return frozenset(
+            index_info['name'] for index_info in
+            sqlalchemy.inspect(url_table._engine).get_indexes(table_name)
+        )
+
+    def test_upgrade_indexes(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'wpull.db')
+            url_table = SQLiteURLTable(path)
+            url_table.add_one('http://example.com')
+
+            with url_table._engine.begin() as connection:
+                connection.execute('DROP INDEX ix_queued_urls_status_level')
+                connection.execute('DROP INDEX ix_queued_urls_status_id')
+                connection.execute(
+                    'CREATE INDEX ix_queued_urls_status '
+                    'ON queued_urls (status)')
+
+            url_table.close()
+
+            url_table = SQLiteURLTable(path)
+            index_names = self.get_index_names(url_table, 'queued_urls')
+
+            self.assertIn('ix_queued_urls_status_level', index_names)
+            self.assertIn('ix_queued_urls_status_id', index_names)
+            self.assertNotIn('ix_queued_urls_status', index_names)
+            self.assertEqual(
+                'http://example.com', url_table.check_out(Status.todo).url)
+
+            url_table.close()
@@ -0,0 +1,268 @@
+'''URL table access from a dedicated database thread.'''
+import asyncio
+import concurrent.futures
+import functools
+import logging
+
+from typing import Optional
+
+from wpull.database.base import BaseURLTable, AddURLInfo
+from wpull.pipeline.item import Status
+
+_logger = logging.getLogger(__name__)
+
+
+def new_database_executor() -> concurrent.futures.ThreadPoolExecutor:
+    '''Return an executor with a single thread for database operations.
+
+    A single thread is used because SQLite connections are bound to the
+    thread that uses them and operations must run in order.
+    '''
+    return concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+
+class ThreadedURLTable(BaseURLTable):
+    '''URL table wrapper that runs all operations on a database thread.
+
+    Operations that return results block the calling thread until the
+    database thread has run them, so they should only be used outside of
+    the event loop or during startup. Use :class:`AsyncURLTable` instead
+    from coroutines. Operations that only change the table, such as
+    :meth:`check_in`, are queued and return immediately. A queued operation
+    that fails is logged with the operation's name.
+
+    Args:
+        url_table: The URL table.
+        executor: An executor with a single thread. If not given, a new
+            one is created.
+
+    Attributes:
+        url_table: The URL table.
+    '''
+    def __init__(self, url_table: BaseURLTable,
+                 executor: Optional[concurrent.futures.Executor]=None):
+        super().__init__()
+        self.url_table = url_table
+        self._executor = executor or new_database_executor()
+
+    @property
+    def executor(self) -> concurrent.futures.Executor:
+        '''The executor running the database operations.'''
+        return self._executor
+
+    def _run(self, function, *args, **kwargs):
+        '''Run the function on the database thread and return the result.'''
+        return self._executor.submit(function, *args, **kwargs).result()
+
+    def _submit_write(self, function, *args, **kwargs):
+        '''Queue the function on the database thread.'''
+        future = self._executor.submit(function, *args, **kwargs)
+        future.add_done_callback(
+            functools.partial(self._write_done_callback, function, args))
+
+    @classmethod
+    def _write_done_callback(cls, function, args,
+                             future: concurrent.futures.Future):
+        error = future.exception()
+
+        if error:
+            _logger.error(
+                'Database operation %s%r failed.', function.__name__, args,
+                exc_info=error)
+
+    def count(self):
+        return self._run(self.url_table.count)
+
+    def get_one(self, url):
+        return self._run(self.url_table.get_one, url)
+
+    def get_all(self):
+        return iter(self._run(lambda: list(self.url_table.get_all())))
+
+    def add_many(self, new_urls):
+        return self._run(self.url_table.add_many, tuple(new_urls))
+
+    def check_out(self, filter_status, filter_level=None):
+        return self._run(self.url_table.check_out, filter_status, filter_level)
+
+    def check_out_many(self, filter_status, count, filter_level=None):
+        return self._run(self.url_table.check_out_many, filter_status, count,
+                         filter_level)
+
+    def check_in(self, url, new_status, increment_try_count=True,
+                 url_result=None):
+        self._submit_write(self.url_table.check_in, url, new_status,
+                           increment_try_count=increment_try_count,
+                           url_result=url_result)
+
+    def update_one(self, url, **kwargs):
+        self._submit_write(self.url_table.update_one, url, **kwargs)
+
+    def release(self):
+        return self._run(self.url_table.release)
+
+    def remove_many(self, urls):
+        self._submit_write(self.url_table.remove_many, tuple(urls))
+
+    def flush(self):
+        return self._run(self.url_table.flush)
+
+    def close(self):
+        self._run(self.url_table.close)
+        self._executor.shutdown()
+
+    def add_visits(self, visits):
+        return self._run(self.url_table.add_visits, tuple(visits))
+
+    def get_revisit_id(self, url, payload_digest):
+        return self._run(self.url_table.get_revisit_id, url, payload_digest)
+
+    def get_hostnames(self):
+        return self._run(self.url_table.get_hostnames)
+
+    def get_root_url_todo_count(self):
+        return self._run(self.url_table.get_root_url_todo_count)
+
+    def convert_check_out(self):
+        return self._run(self.url_table.convert_check_out)
+
+    def convert_check_in(self, file_id, status):
+        self._submit_write(self.url_table.convert_check_in, file_id, status)
+
+
+class AsyncURLTable(object):
+    '''Asynchronous interface to a URL table.
+
+    Args:
+        url_table: The URL table.
+        executor: If given, the executor used by the database thread of a
+            :class:`ThreadedURLTable`. Otherwise, the operations run
+            directly on the event loop.
+
+    Every operation starts when the method is called and returns a future
+    of the result. Operations therefore run in the order they are called,
+    whether or not the future is waited on.
+    '''
+    def __init__(self, url_table: BaseURLTable,
+                 executor: Optional[concurrent.futures.Executor]=None):
+        self._url_table = url_table
+        self._executor = executor
+        self._flush_handle = None
+        self._flush_task = None
+
+    @property
+    def url_table(self) -> BaseURLTable:
+        '''The URL table.
+
+        It must only be used from functions passed to :meth:`run`.
+        '''
+        return self._url_table
+
+    def run(self, function, *args, **kwargs) -> asyncio.Future:
+        '''Run a function on the database thread.'''
+        if self._executor:
+            return asyncio.get_event_loop().run_in_executor(
+                self._executor, functools.partial(function, *args, **kwargs)
+            )
+
+        future = asyncio.Future()
+
+        try:
+            future.set_result(function(*args, **kwargs))
+        except Exception as error:
+            future.set_exception(error)
+
+        return future
+
+    def count(self) -> asyncio.Future:
+        return self.run(self._url_table.count)
+
+    def get_one(self, url: str) -> asyncio.Future:
+        return self.run(self._url_table.get_one, url)
+
+    def add_many(self, new_urls) -> asyncio.Future:
+        return self.run(self._url_table.add_many, tuple(new_urls))
+
+    def add_one(self, url: str, url_properties=None,
+                url_data=None) -> asyncio.Future:
+        return self.add_many([AddURLInfo(url, url_properties, url_data)])
+
+    def check_out(self, filter_status: Status,
+                  filter_level: Optional[int]=None) -> asyncio.Future:
+        return self.run(self._url_table.check_out, filter_status,
+                        filter_level)
+
+    def check_out_many(self, filter_status: Status, count: int,
+                       filter_level: Optional[int]=None) -> asyncio.Future:
+        return self.run(self._url_table.check_out_many, filter_status, count,
+                        filter_level)
+
+    def check_in(self, url: str, new_status: Status,
+                 increment_try_count: bool=True,
+                 url_result=None) -> asyncio.Future:
+        return self.run(
+            self._url_table.check_in, url, new_status,
+            increment_try_count=increment_try_count, url_result=url_result
+        )
+
+    def update_one(self, url: str, **kwargs) -> asyncio.Future:
+        return self.run(self._url_table.update_one, url, **kwargs)
+
+    def release(self) -> asyncio.Future:
+        return self.run(self._url_table.release)
+
+    def remove_many(self, urls) -> asyncio.Future:
+        return self.run(self._url_table.remove_many, tuple(urls))
+
+    def add_visits(self, visits) -> asyncio.Future:
+        return self.run(self._url_table.add_visits, tuple(visits))
+
+    def get_revisit_id(self, url: str, payload_digest: str) \
+            -> asyncio.Future:
+        return self.run(self._url_table.get_revisit_id, url, payload_digest)
+
+    def get_hostnames(self) -> asyncio.Future:
+        return self.run(self._url_table.get_hostnames)
+
+    def get_root_url_todo_count(self) -> asyncio.Future:
+        return self.run(self._url_table.get_root_url_todo_count)
+
+    def convert_check_out(self) -> asyncio.Future:
+        return self.run(self._url_table.convert_check_out)
+
+    def convert_check_in(self, file_id: int, status: Status) \
+            -> asyncio.Future:
+        return self.run(self._url_table.convert_check_in, file_id, status)
+
+    def flush(self) -> asyncio.Future:
+        return self.run(self._url_table.flush)
+
+    def start_periodic_flush(self, interval: float):
+        '''Flush the table every `interval` seconds.
+
+        Grouped writes are committed even while no other operations
+        arrive.
+        '''
+        self.stop_periodic_flush()
+        self._flush_handle = asyncio.get_event_loop().call_later(
+            interval, self._periodic_flush, interval)
+
+    def stop_periodic_flush(self):
+        '''Stop flushing the table periodically.'''
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    def _periodic_flush(self, interval: float):
+        if not self._flush_task or self._flush_task.done():
+            self._flush_task = self.flush()
+            self._flush_task.add_done_callback(self._flush_done_callback)
+
+        self._flush_handle = asyncio.get_event_loop().call_later(
+            interval, self._periodic_flush, interval)
+
+    @classmethod
+    def _flush_done_callback(cls, future: asyncio.Future):
+        if not future.cancelled() and future.exception():
+            _logger.error('Database commit failed.',
+                          exc_info=future.exception())
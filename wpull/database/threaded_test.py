@@ -0,0 +1,94 @@
+import asyncio
+import os.path
+import tempfile
+
+from wpull.database.sqltable import SQLiteURLTable
+from wpull.database.sqltable_test import TestDatabase
+from wpull.database.threaded import ThreadedURLTable, AsyncURLTable
+from wpull.pipeline.item import Status
+from wpull.testing.async import AsyncTestCase
+import wpull.testing.async
+
+
+class FailingURLTable(SQLiteURLTable):
+    def check_in(self, *args, **kwargs):
+        raise ValueError('Oops')
+
+
+class TestThreadedDatabase(TestDatabase):
+    def get_url_table(self):
+        return ThreadedURLTable(SQLiteURLTable(':memory:'))
+
+    def test_write_error(self):
+        url_table = ThreadedURLTable(FailingURLTable(':memory:'))
+        url_table.add_one('http://example.com')
+
+        with self.assertLogs('wpull.database.threaded', 'ERROR') as logs:
+            url_table.check_in('http://example.com', Status.done)
+            url_table.flush()
+
+        self.assertIn('check_in', logs.output[0])
+        self.assertEqual(1, url_table.count())
+
+
+class TestAsyncDatabase(AsyncTestCase):
+    @wpull.testing.async.async_test()
+    def test_async_url_table(self):
+        threaded_url_table = ThreadedURLTable(SQLiteURLTable(':memory:'))
+        url_table = AsyncURLTable(threaded_url_table.url_table,
+                                  executor=threaded_url_table.executor)
+
+        added_urls = yield from url_table.add_many(
+            [('http://example.com', None, None)])
+
+        self.assertEqual(['http://example.com'], list(added_urls))
+
+        url_record = yield from url_table.check_out(Status.todo)
+
+        self.assertEqual('http://example.com', url_record.url)
+
+        threaded_url_table.check_in(url_record.url, Status.done)
+        url_record = yield from url_table.get_one('http://example.com')
+
+        self.assertEqual(Status.done, url_record.status)
+
+        yield from url_table.add_one('http://example.com/1')
+
+        self.assertEqual(2, (yield from url_table.count()))
+
+    @wpull.testing.async.async_test()
+    def test_async_write_error(self):
+        threaded_url_table = ThreadedURLTable(FailingURLTable(':memory:'))
+        url_table = AsyncURLTable(threaded_url_table.url_table,
+                                  executor=threaded_url_table.executor)
+
+        yield from url_table.add_many([('http://example.com', None, None)])
+        check_in_future = url_table.check_in('http://example.com',
+                                             Status.done)
+        count_future = url_table.count()
+
+        with self.assertRaises(ValueError):
+            yield from check_in_future
+
+        self.assertEqual(1, (yield from count_future))
+
+    @wpull.testing.async.async_test()
+    def test_periodic_flush(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'wpull.db')
+            url_table = AsyncURLTable(
+                SQLiteURLTable(path, commit_interval=60))
+            other_url_table = SQLiteURLTable(path)
+
+            yield from url_table.add_many([('http://example.com', None, None)])
+
+            self.assertEqual(0, other_url_table.count())
+
+            url_table.start_periodic_flush(0.1)
+            yield from asyncio.sleep(0.3)
+            url_table.stop_periodic_flush()
+
+            self.assertEqual(1, other_url_table.count())
+
+            other_url_table.close()
+
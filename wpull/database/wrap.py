@@ -1,4 +1,8 @@
 '''URL table wrappers.'''
+import asyncio
+import functools
+import threading
+
 from wpull.application.plugin import event_interface, PluginFunctions
 from wpull.database.base import BaseURLTable
 from wpull.application.hook import HookableMixin, HookDisconnected
@@ -10,6 +14,10 @@ import wpull.application.hook
 class URLTableHookWrapper(BaseURLTable, HookableMixin):
     '''URL table wrapper with scripting hooks.
 
+    When the table is used from the database thread, the plugin events are
+    not called during the operation. They are scheduled on the event loop
+    and called shortly after the operation, in the order they occurred.
+
     Args:
         url_table: URL table.
 
@@ -21,6 +29,8 @@ class URLTableHookWrapper(BaseURLTable, HookableMixin):
         super().__init__()
         self.url_table = url_table
         self._queue_counter = 0
+        self._event_loop = asyncio.get_event_loop()
+        self._thread_id = threading.get_ident()
 
         self.event_dispatcher.register(PluginFunctions.queued_url)
         self.event_dispatcher.register(PluginFunctions.dequeued_url)
@@ -45,7 +55,7 @@ class URLTableHookWrapper(BaseURLTable, HookableMixin):
             url_info = parse_url_or_log(url)
             if url_info:
                 self._queue_counter += 1
-                self.event_dispatcher.notify(PluginFunctions.queued_url, url_info)
+                self._notify(PluginFunctions.queued_url, url_info)
 
         return added_urls
 
@@ -53,10 +63,21 @@ class URLTableHookWrapper(BaseURLTable, HookableMixin):
         url_record = self.url_table.check_out(filter_status, filter_level)
         self._queue_counter -= 1
 
-        self.event_dispatcher.notify(PluginFunctions.dequeued_url, url_record.url_info, url_record)
+        self._notify(PluginFunctions.dequeued_url, url_record.url_info, url_record)
 
         return url_record
 
+    def check_out_many(self, filter_status, count, filter_level=None):
+        url_records = self.url_table.check_out_many(
+            filter_status, count, filter_level)
+
+        for url_record in url_records:
+            self._queue_counter -= 1
+
+            self._notify(PluginFunctions.dequeued_url, url_record.url_info, url_record)
+
+        return url_records
+
     def check_in(self, url, new_status, increment_try_count=True,
                  url_result=None):
         if new_status == Status.error:
@@ -64,7 +85,7 @@ class URLTableHookWrapper(BaseURLTable, HookableMixin):
             url_info = parse_url_or_log(url)
 
             if url_info:
-                self.event_dispatcher.notify(PluginFunctions.queued_url, url_info)
+                self._notify(PluginFunctions.queued_url, url_info)
 
         return self.url_table.check_in(url, new_status, increment_try_count=increment_try_count, url_result=url_result)
 
@@ -77,6 +98,9 @@ class URLTableHookWrapper(BaseURLTable, HookableMixin):
     def remove_many(self, urls):
         return self.url_table.remove_many(urls)
 
+    def flush(self):
+        return self.url_table.flush()
+
     def close(self):
         return self.url_table.close()
 
@@ -89,16 +113,30 @@ class URLTableHookWrapper(BaseURLTable, HookableMixin):
     def get_hostnames(self):
         return self.url_table.get_hostnames()
 
+    def _notify(self, name, *args):
+        if threading.get_ident() == self._thread_id:
+            self.event_dispatcher.notify(name, *args)
+        else:
+            self._event_loop.call_soon_threadsafe(
+                functools.partial(self.event_dispatcher.notify, name, *args)
+            )
+
     @staticmethod
     @event_interface(PluginFunctions.queued_url)
     def queued_url(url_info: URLInfo):
         '''Callback fired after an URL was put into the queue.
+
+        The callback is called on the event loop thread, possibly after
+        the operation that queued the URL has returned.
         '''
 
     @staticmethod
     @event_interface(PluginFunctions.dequeued_url)
     def dequeued_url(url_info: URLInfo, record_info: URLRecord):
         '''Callback fired after an URL was retrieved from the queue.
+
+        The callback is called on the event loop thread, possibly after
+        the operation that retrieved the URL has returned.
         '''
 
     def get_root_url_todo_count(self):
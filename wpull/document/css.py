@@ -5,9 +5,8 @@ import re
 
 from wpull.document.base import BaseDocumentDetector, BaseTextStreamReader, \
     VeryFalse
+import wpull.document.sniff
 from wpull.regexstream import RegexStream
-import wpull.string
-import wpull.util
 
 
 class CSSReader(BaseDocumentDetector, BaseTextStreamReader):
@@ -43,8 +42,7 @@ class CSSReader(BaseDocumentDetector, BaseTextStreamReader):
     @classmethod
     def is_file(cls, file):
         '''Return whether the file is likely CSS.'''
-        peeked_data = wpull.string.printable_bytes(
-            wpull.util.peek_file(file)).lower()
+        peeked_data = wpull.document.sniff.printable_head(file)
 
         if b'<html' in peeked_data:
             return VeryFalse
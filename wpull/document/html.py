@@ -2,7 +2,7 @@
 import io
 
 from wpull.document.base import BaseHTMLReader, BaseDocumentDetector
-import wpull.string
+import wpull.document.sniff
 
 
 class HTMLLightParserTarget(object):
@@ -213,8 +213,7 @@ class HTMLReader(BaseDocumentDetector, BaseHTMLReader):
     @classmethod
     def is_file(cls, file):
         '''Return whether the file is likely to be HTML.'''
-        peeked_data = wpull.string.printable_bytes(
-            wpull.util.peek_file(file)).lower()
+        peeked_data = wpull.document.sniff.printable_head(file)
 
         if b'<!doctype html' in peeked_data \
            or b'<head' in peeked_data \
@@ -227,3 +226,11 @@ class HTMLReader(BaseDocumentDetector, BaseHTMLReader):
 
     def iter_elements(self, file, encoding=None):
         return self._html_parser.parse(file, encoding)
+
+    def iter_link_elements(self, file, encoding=None, text_tags=frozenset()):
+        '''Return an iterator of elements that may contain links.
+
+        See :meth:`.htmlparse.base.BaseParser.parse_links`.
+        '''
+        return self._html_parser.parse_links(
+            file, encoding, text_tags=text_tags)
@@ -253,6 +253,31 @@ class Mixin(object):
         self.assertTrue(
             all(isinstance(element, Element) for element in elements))
 
+    def test_html_link_elements(self):
+        test_string = b'''<html><head><title>hello</title>
+            <style>@import "a.css";</style>
+            <script src="b.js">var c = "c.js";</script>
+            </head><body><p>text <a href="d.html">e</a></p>
+            <!-- comment --><img src="f.png"><br></body></html>'''
+
+        reader = HTMLReader(self.get_html_parser())
+        elements = tuple(reader.iter_link_elements(
+            io.BytesIO(test_string), encoding='ascii',
+            text_tags=frozenset(['style', 'script'])
+        ))
+
+        self.assertTrue(
+            all(isinstance(element, Element) for element in elements))
+        self.assertFalse(any(element.end for element in elements))
+        self.assertEqual(
+            ('style', 'script', 'a', 'img'),
+            tuple(element.tag for element in elements)
+        )
+        self.assertEqual('@import "a.css";', elements[0].text)
+        self.assertEqual('var c = "c.js";', elements[1].text)
+        self.assertEqual({'src': 'b.js'}, dict(elements[1].attrib))
+        self.assertEqual({'href': 'd.html'}, dict(elements[2].attrib))
+
 
 @unittest.skipIf(IS_PYPY, 'Not supported under PyPy')
 class TestLxmlHTML(Mixin, unittest.TestCase):
@@ -1,5 +1,7 @@
 import abc
 
+from wpull.document.htmlparse.element import Element
+
 
 class BaseParser(object, metaclass=abc.ABCMeta):
     def parse(self, file, encoding=None):
@@ -10,6 +12,20 @@ class BaseParser(object, metaclass=abc.ABCMeta):
             :module:`.document.htmlparse.element`
         '''
 
+    def parse_links(self, file, encoding=None, text_tags=frozenset()):
+        '''Parse the document for elements that may contain links.
+
+        Only start elements with attributes or with a tag in `text_tags`
+        are returned. Parsers may leave out the text of other elements.
+
+        Returns:
+            iterator: Each item is an :class:`.element.Element`.
+        '''
+        for element in self.parse(file, encoding=encoding):
+            if isinstance(element, Element) and not element.end \
+                    and (element.attrib or element.tag in text_tags):
+                yield element
+
     @abc.abstractproperty
     def parser_error(self):
         '''Return the Exception class for parsing errors.'''
@@ -1,4 +1,5 @@
 '''Parsing using lxml and libxml2.'''
+import functools
 import io
 
 import lxml.html
@@ -6,7 +7,7 @@ import lxml.html
 from wpull.document.htmlparse.base import BaseParser
 from wpull.document.htmlparse.element import Element, Comment
 from wpull.document.xml import XMLDetector
-import wpull.util
+import wpull.document.sniff
 
 
 class HTMLParserTarget(object):
@@ -99,6 +100,56 @@ class HTMLParserTarget(object):
         return True
 
 
+class LinkParserTarget(object):
+    '''An HTML parser target for elements that may contain links.
+
+    Start elements without attributes, end elements and comments are
+    skipped. Text is only collected for tags in `text_tags`.
+
+    Args:
+        callback: A callback function. The function should accept one
+            :class:`.element.Element`.
+        text_tags: Tags where the text is needed.
+    '''
+    def __init__(self, callback, text_tags=frozenset()):
+        self.callback = callback
+        self.text_tags = text_tags
+        self.tag = None
+        self.attrib = None
+        self.buffer = None
+
+    def start(self, tag, attrib):
+        if self.buffer is not None:
+            self._flush()
+
+        if tag in self.text_tags:
+            self.tag = tag
+            self.attrib = attrib
+            self.buffer = []
+        elif attrib:
+            self.callback(Element(tag, attrib, None, None, False))
+
+    def data(self, data):
+        if self.buffer is not None:
+            self.buffer.append(data)
+
+    def end(self, tag):
+        if self.buffer is not None:
+            self._flush()
+
+    def close(self):
+        if self.buffer is not None:
+            self._flush()
+
+        return True
+
+    def _flush(self):
+        self.callback(Element(
+            self.tag, self.attrib, ''.join(self.buffer), None, False
+        ))
+        self.buffer = None
+
+
 class HTMLParser(BaseParser):
     '''HTML document parser.
 
@@ -121,6 +172,20 @@ class HTMLParser(BaseParser):
                                        parser_type=parser_type):
             yield element
 
+    def parse_links(self, file, encoding=None, text_tags=frozenset()):
+        parser_type = self.detect_parser_type(file, encoding=encoding)
+
+        if parser_type == 'xhtml':
+            parser_type = 'html'
+
+        target_class = functools.partial(
+            LinkParserTarget, text_tags=text_tags)
+
+        for element in self.parse_lxml(file, encoding=encoding,
+                                       target_class=target_class,
+                                       parser_type=parser_type):
+            yield element
+
     def parse_lxml(self, file, encoding=None, target_class=HTMLParserTarget,
                    parser_type='html'):
         '''Return an iterator of elements found in the document.
@@ -192,6 +257,13 @@ class HTMLParser(BaseParser):
         Returns:
             str, None
         '''
+        return wpull.document.sniff.memoize(
+            file, ('doctype', encoding),
+            lambda: cls._parse_doctype(file, encoding)
+        )
+
+    @classmethod
+    def _parse_doctype(cls, file, encoding=None):
         if encoding:
             lxml_encoding = to_lxml_encoding(encoding) or 'latin1'
         else:
@@ -200,7 +272,7 @@ class HTMLParser(BaseParser):
         try:
             parser = lxml.etree.XMLParser(encoding=lxml_encoding, recover=True)
             tree = lxml.etree.parse(
-                io.BytesIO(wpull.util.peek_file(file)), parser=parser
+                io.BytesIO(wpull.document.sniff.peek_file(file)), parser=parser
             )
             if tree.getroot() is not None:
                 return tree.docinfo.doctype
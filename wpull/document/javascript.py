@@ -4,9 +4,8 @@ import io
 
 from wpull.document.base import BaseTextStreamReader, \
     BaseDocumentDetector, VeryFalse
+import wpull.document.sniff
 from wpull.regexstream import RegexStream
-import wpull.string
-import wpull.util
 
 
 class JavaScriptReader(BaseDocumentDetector, BaseTextStreamReader):
@@ -45,8 +44,7 @@ class JavaScriptReader(BaseDocumentDetector, BaseTextStreamReader):
     @classmethod
     def is_file(cls, file):
         '''Return whether the file is likely JS.'''
-        peeked_data = wpull.string.printable_bytes(
-            wpull.util.peek_file(file)).lower()
+        peeked_data = wpull.document.sniff.printable_head(file)
 
         if b'<html' in peeked_data:
             return VeryFalse
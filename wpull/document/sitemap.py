@@ -1,13 +1,11 @@
 '''Sitemap.xml'''
 import gzip
-import zlib
 
 
 from wpull.document.base import BaseExtractiveReader, BaseDocumentDetector
-from wpull.document.util import is_gzip
 from wpull.thirdparty import robotexclusionrulesparser
-import wpull.decompression
-import wpull.util
+import wpull.document.sniff
+import wpull.string
 from wpull.document.htmlparse.element import Element
 
 
@@ -43,26 +41,15 @@ class SitemapReader(BaseDocumentDetector, BaseExtractiveReader):
     @classmethod
     def is_file(cls, file):
         '''Return whether the file is likely a Sitemap.'''
-        peeked_data = wpull.util.peek_file(file)
-
-        if is_gzip(peeked_data):
-            try:
-                peeked_data = wpull.decompression.gzip_uncompress(
-                    peeked_data, truncated=True
-                )
-            except zlib.error:
-                pass
-
-        peeked_data = wpull.string.printable_bytes(peeked_data)
+        peeked_data = wpull.string.printable_bytes(
+            wpull.document.sniff.uncompressed_head(file))
 
         if b'<?xml' in peeked_data \
            and (b'<sitemapindex' in peeked_data or b'<urlset' in peeked_data):
             return True
 
     def iter_links(self, file, encoding=None):
-        peeked_data = wpull.util.peek_file(file)
-
-        if is_gzip(peeked_data):
+        if wpull.document.sniff.is_gzip(file):
             file = gzip.GzipFile(mode='rb', fileobj=file)
 
         if self.is_file(file):
@@ -0,0 +1,137 @@
+'''Content sniffing shared by document detectors.
+
+The head of a document is read once and the hints derived from it, such as
+the printable bytes, gzip detection, encoding and doctype, are computed once
+and shared by all detectors and scrapers looking at the same file.
+
+Hints are cached per file object until the offset, size or modification time
+of the file changes. File objects without a file descriptor are not cached.
+'''
+import io
+import os
+import weakref
+import zlib
+
+import wpull.decompression
+import wpull.string
+import wpull.util
+
+
+class Sniff(object):
+    '''Head and hints of a file.
+
+    Args:
+        stat_key: The offset, size and modification time of the file when
+            the head was read.
+
+    Attributes:
+        data (bytes): The head of the file.
+        complete (bool): Whether the head is the entire file.
+        hints (dict): Computed values keyed by name.
+    '''
+    def __init__(self, stat_key):
+        self.stat_key = stat_key
+        self.data = b''
+        self.complete = False
+        self.hints = {}
+
+
+_sniffs = weakref.WeakKeyDictionary()
+
+
+def get_sniff(file):
+    '''Return the cached sniff of the file.
+
+    Returns:
+        Sniff, None: None if the file cannot be cached.
+    '''
+    try:
+        stat_key = _get_stat_key(file)
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        return None
+
+    try:
+        sniff = _sniffs.get(file)
+
+        if sniff is None or sniff.stat_key != stat_key:
+            sniff = _sniffs[file] = Sniff(stat_key)
+    except TypeError:
+        # Not weak referenceable
+        return None
+
+    return sniff
+
+
+def _get_stat_key(file):
+    if hasattr(file, 'flush'):
+        file.flush()
+
+    stat_result = os.fstat(file.fileno())
+
+    return file.tell(), stat_result.st_size, stat_result.st_mtime_ns
+
+
+def memoize(file, name, func):
+    '''Return the hint computed by the function once per file.'''
+    sniff = get_sniff(file)
+
+    if sniff is None:
+        return func()
+
+    if name not in sniff.hints:
+        sniff.hints[name] = func()
+
+    return sniff.hints[name]
+
+
+def peek_file(file, length=4096):
+    '''Peek the file like :func:`.util.peek_file` but read it only once.
+
+    The file is read again only if a longer head is requested.
+    '''
+    sniff = get_sniff(file)
+
+    if sniff is None:
+        return wpull.util.peek_file(file, length)
+
+    if len(sniff.data) < length and not sniff.complete:
+        sniff.data = wpull.util.peek_file(file, length)
+        sniff.complete = len(sniff.data) < length
+
+    if len(sniff.data) > length:
+        return sniff.data[:length]
+    else:
+        return sniff.data
+
+
+def printable_head(file):
+    '''Return the lowercase printable bytes of the head of the file.'''
+    return memoize(
+        file, 'printable_head',
+        lambda: wpull.string.printable_bytes(peek_file(file)).lower()
+    )
+
+
+def is_gzip(file):
+    '''Return whether the file is likely to be gzip.'''
+    return memoize(
+        file, 'is_gzip', lambda: peek_file(file).startswith(b'\x1f\x8b')
+    )
+
+
+def uncompressed_head(file):
+    '''Return the head of the file, decompressing it if it is gzip.'''
+    def func():
+        peeked_data = peek_file(file)
+
+        if is_gzip(file):
+            try:
+                peeked_data = wpull.decompression.gzip_uncompress(
+                    peeked_data, truncated=True
+                )
+            except zlib.error:
+                pass
+
+        return peeked_data
+
+    return memoize(file, 'uncompressed_head', func)
@@ -0,0 +1,97 @@
+import gzip
+import io
+import tempfile
+import unittest
+
+import wpull.document.sniff
+
+
+class CountingFile(object):
+    def __init__(self, file):
+        self.file = file
+        self.read_count = 0
+
+    def __getattr__(self, key):
+        return getattr(self.file, key)
+
+    def read(self, length=-1):
+        self.read_count += 1
+        return self.file.read(length)
+
+
+class TestSniff(unittest.TestCase):
+    def test_peek_once(self):
+        with tempfile.TemporaryFile() as temp_file:
+            temp_file.write(b'<html><head><title>hello</title>')
+            temp_file.seek(0)
+            file = CountingFile(temp_file)
+
+            self.assertEqual(
+                b'<html>', wpull.document.sniff.peek_file(file, 6))
+            self.assertEqual(
+                b'<html><head>', wpull.document.sniff.peek_file(file, 12))
+            self.assertEqual(2, file.read_count)
+
+            self.assertEqual(
+                b'<html>', wpull.document.sniff.peek_file(file, 6))
+            self.assertEqual(
+                b'<html><head><title>hello</title>',
+                wpull.document.sniff.peek_file(file, 4096)
+            )
+            self.assertEqual(
+                b'<html><head><title>hello</title>',
+                wpull.document.sniff.peek_file(file, 131072)
+            )
+            self.assertEqual(3, file.read_count)
+            self.assertEqual(0, file.tell())
+
+    def test_memoize(self):
+        with tempfile.TemporaryFile() as file:
+            file.write(b'\x01<HTML>')
+            file.seek(0)
+
+            values = []
+
+            def func():
+                values.append(None)
+                return len(values)
+
+            self.assertEqual(
+                1, wpull.document.sniff.memoize(file, 'test', func))
+            self.assertEqual(
+                1, wpull.document.sniff.memoize(file, 'test', func))
+            self.assertEqual(
+                b'<html>', wpull.document.sniff.printable_head(file))
+
+            file.seek(0, 2)
+            file.write(b'<body>')
+            file.seek(0)
+
+            self.assertEqual(
+                2, wpull.document.sniff.memoize(file, 'test', func))
+            self.assertEqual(
+                b'<html><body>', wpull.document.sniff.printable_head(file))
+
+    def test_uncompressed_head(self):
+        with tempfile.TemporaryFile() as file:
+            file.write(gzip.compress(b'<?xml version="1.0"?><urlset>'))
+            file.seek(0)
+
+            self.assertTrue(wpull.document.sniff.is_gzip(file))
+            self.assertEqual(
+                b'<?xml version="1.0"?><urlset>',
+                wpull.document.sniff.uncompressed_head(file)
+            )
+
+    def test_not_cached(self):
+        file = io.BytesIO(b'<html>')
+
+        self.assertIsNone(wpull.document.sniff.get_sniff(file))
+        self.assertEqual(b'<html>', wpull.document.sniff.printable_head(file))
+
+        file.seek(0, 2)
+        file.write(b'<body>')
+        file.seek(0)
+
+        self.assertEqual(
+            b'<html><body>', wpull.document.sniff.printable_head(file))
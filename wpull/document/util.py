@@ -3,13 +3,17 @@
 import logging
 
 from wpull.backport.logging import BraceMessage as __
+from wpull.cache import LRUCache
+import wpull.document.sniff
 import wpull.protocol.http.util
-import wpull.util
 import wpull.string
 
 
 _logger = logging.getLogger(__name__)
 
+_site_encodings = LRUCache(max_items=1000)
+'''Encodings detected keyed by hostname, declared encoding and HTML flag.'''
+
 
 def get_heading_encoding(response):
     '''Return the document encoding from a HTTP header.
@@ -32,6 +36,11 @@ def get_heading_encoding(response):
 def detect_response_encoding(response, is_html=False, peek=131072):
     '''Return the likely encoding of the response document.
 
+    The encoding detected for the same hostname and HTTP header encoding is
+    tried before statistical detection since documents on the same site
+    usually share an encoding. A byte order mark or a declaration within
+    the document takes precedence.
+
     Args:
         response (Response): An instance of :class:`.http.Response`.
         is_html (bool): See :func:`.util.detect_encoding`.
@@ -40,10 +49,23 @@ def detect_response_encoding(response, is_html=False, peek=131072):
     Returns:
         ``str``, ``None``: The codec name.
     '''
-    encoding = get_heading_encoding(response)
+    heading_encoding = get_heading_encoding(response)
+    site_key = _get_site_key(response, heading_encoding, is_html)
+
+    def detect():
+        encoding = wpull.string.detect_encoding(
+            wpull.document.sniff.peek_file(response.body, peek),
+            encoding=heading_encoding, is_html=is_html,
+            preferred=_site_encodings.get(site_key) if site_key else None
+        )
+
+        if site_key:
+            _site_encodings[site_key] = encoding
 
-    encoding = wpull.string.detect_encoding(
-        wpull.util.peek_file(response.body, peek), encoding=encoding, is_html=is_html
+        return encoding
+
+    encoding = wpull.document.sniff.memoize(
+        response.body, ('encoding', heading_encoding, is_html, peek), detect
     )
 
     _logger.debug(__('Got encoding: {0}', encoding))
@@ -51,6 +73,15 @@ def detect_response_encoding(response, is_html=False, peek=131072):
     return encoding
 
 
+def _get_site_key(response, heading_encoding, is_html):
+    request = getattr(response, 'request', None)
+    url_info = getattr(request, 'url_info', None)
+    hostname = getattr(url_info, 'hostname', None)
+
+    if hostname:
+        return hostname, heading_encoding, is_html
+
+
 def is_gzip(data):
     '''Return whether the data is likely to be gzip.'''
     return data.startswith(b'\x1f\x8b')
@@ -1,14 +1,12 @@
 '''XML document.'''
 from wpull.document.base import BaseDocumentDetector
-import wpull.string
-import wpull.util
+import wpull.document.sniff
 
 
 class XMLDetector(BaseDocumentDetector):
     @classmethod
     def is_file(cls, file):
-        peeked_data = wpull.string.printable_bytes(
-            wpull.util.peek_file(file)).lower()
+        peeked_data = wpull.document.sniff.printable_head(file)
 
         if b'<?xml' in peeked_data:
             return True
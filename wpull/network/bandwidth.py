@@ -94,30 +94,173 @@ class BandwidthMeter(object):
             return 0
 
 
-class BandwidthLimiter(BandwidthMeter):
-    '''Bandwidth rate limit calculator.'''
-    def __init__(self, rate_limit):
-        super().__init__(sample_min_time=0)
-        self._rate_limit = rate_limit
-
-    def sleep_time(self):
-        if not self._samples or not self._rate_limit:
-            return 0
+class TokenBucket(object):
+    '''Token bucket rate limiter.
 
-        elapsed_time = 0
-        byte_sum = 0
+    Tokens are added at `rate` per second up to `burst`. Taking more
+    tokens than available puts the bucket in debt, which is paid back
+    before the bucket allows traffic again.
 
-        for time_diff, data_len in self._samples:
-            elapsed_time += time_diff
-            byte_sum += data_len
+    Args:
+        rate: The number of tokens added per second.
+        burst: The maximum number of tokens. Defaults to `rate`.
+    '''
+    def __init__(self, rate, burst=None, clock=time.time):
+        assert rate > 0, rate
+        self._rate = rate
+        self._burst = burst or rate
+        self._clock = clock
+        self._tokens = self._burst
+        self._last_time = clock()
+
+    @property
+    def full(self):
+        '''Return whether the bucket has refilled completely.'''
+        return self._refill(self._clock()) >= self._burst
+
+    def consume(self, amount, time_now=None):
+        '''Take tokens and return the time in seconds until none are owed.'''
+        if time_now is None:
+            time_now = self._clock()
 
-        expected_elapsed_time = byte_sum / self._rate_limit
+        self._tokens = self._refill(time_now) - amount
+        self._last_time = max(self._last_time, time_now)
 
-        if expected_elapsed_time > elapsed_time:
-            sleep_time = expected_elapsed_time - elapsed_time
-            if sleep_time < 0.001:
-                return 0
-            else:
-                return sleep_time
+        return self.delay()
+
+    def delay(self, time_now=None):
+        '''Return the time in seconds until none are owed.'''
+        if time_now is None:
+            time_now = self._clock()
+
+        tokens = self._refill(time_now)
+
+        if tokens >= 0:
+            return 0
         else:
+            return -tokens / self._rate
+
+    def _refill(self, time_now):
+        elapsed_time = max(0, time_now - self._last_time)
+
+        return min(self._burst, self._tokens + elapsed_time * self._rate)
+
+
+class BandwidthLimiter(object):
+    '''Bandwidth rate limit shared by connections.
+
+    The overall limit and the optional per host and per domain limits are
+    each a :class:`TokenBucket`.
+
+    Args:
+        rate_limit (int): The overall limit in bytes per second. If 0 or
+            None, it is not limited.
+        host_rate_limit (int): The limit in bytes per second for each
+            hostname.
+        domain_rate_limit (int): The limit in bytes per second for each
+            domain. See :func:`get_domain`.
+        max_buckets (int): The number of hostname or domain limits to
+            track. The least recently used are discarded.
+        min_sleep_time (float): Shorter delays are not returned. They are
+            kept as debt until they add up.
+    '''
+    def __init__(self, rate_limit, host_rate_limit=None,
+                 domain_rate_limit=None, max_buckets=1000,
+                 min_sleep_time=0.01, clock=time.time):
+        self._clock = clock
+        self._bucket = TokenBucket(rate_limit, clock=clock) \
+            if rate_limit else None
+        self._host_rate_limit = host_rate_limit
+        self._domain_rate_limit = domain_rate_limit
+        self._host_buckets = collections.OrderedDict()
+        self._domain_buckets = collections.OrderedDict()
+        self._max_buckets = max_buckets
+        self._min_sleep_time = min_sleep_time
+
+        rates = [rate for rate in (rate_limit, host_rate_limit,
+                                   domain_rate_limit) if rate]
+        self._read_size = max(1024, int(min(rates) / 10)) if rates else None
+
+    @property
+    def read_size(self):
+        '''Return the largest read that keeps the traffic smooth.
+
+        It is the amount transferred in a tenth of a second at the lowest
+        rate limit, or None if nothing is limited.
+        '''
+        return self._read_size
+
+    def consume(self, data_len, hostname=None, time_now=None):
+        '''Account for transferred data and return the time to sleep.
+
+        Args:
+            data_len (int): The number of bytes transferred.
+            hostname (str): The hostname of the connection.
+            time_now (float): Current time.
+
+        Returns:
+            float: The time in seconds.
+        '''
+        if time_now is None:
+            time_now = self._clock()
+
+        sleep_time = 0
+
+        if self._bucket:
+            sleep_time = self._bucket.consume(data_len, time_now)
+
+        if hostname and self._host_rate_limit:
+            bucket = self._get_bucket(
+                self._host_buckets, hostname, self._host_rate_limit)
+            sleep_time = max(sleep_time, bucket.consume(data_len, time_now))
+
+        if hostname and self._domain_rate_limit:
+            bucket = self._get_bucket(
+                self._domain_buckets, get_domain(hostname),
+                self._domain_rate_limit)
+            sleep_time = max(sleep_time, bucket.consume(data_len, time_now))
+
+        if sleep_time < self._min_sleep_time:
             return 0
+        else:
+            return sleep_time
+
+    def _get_bucket(self, buckets, key, rate):
+        bucket = buckets.get(key)
+
+        if bucket:
+            buckets.move_to_end(key)
+        else:
+            bucket = buckets[key] = TokenBucket(rate, clock=self._clock)
+
+            if len(buckets) > self._max_buckets:
+                buckets.popitem(last=False)
+
+        return bucket
+
+
+SECOND_LEVEL_LABELS = frozenset([
+    'ac', 'co', 'com', 'edu', 'go', 'gob', 'gov', 'mil', 'ne', 'net', 'or',
+    'org',
+])
+'''Labels that are registered under country code top level domains.'''
+
+
+def get_domain(hostname):
+    '''Return an approximation of the registered domain of the hostname.
+
+    The last two labels are used, or three if the hostname is under a
+    country code top level domain and a label in
+    :data:`SECOND_LEVEL_LABELS` such as ``co.uk``. IP addresses are
+    returned unchanged.
+    '''
+    if ':' in hostname or hostname.replace('.', '').isdigit():
+        return hostname
+
+    labels = hostname.rstrip('.').lower().split('.')
+
+    if len(labels) > 2 and len(labels[-1]) == 2 \
+            and labels[-2] in SECOND_LEVEL_LABELS:
+        return '.'.join(labels[-3:])
+    else:
+        return '.'.join(labels[-2:])
@@ -2,7 +2,8 @@
 import time
 import unittest
 
-from wpull.network.bandwidth import BandwidthMeter, BandwidthLimiter
+from wpull.network.bandwidth import BandwidthMeter, BandwidthLimiter, \
+    TokenBucket, get_domain
 
 
 class TestNetwork(unittest.TestCase):
@@ -16,12 +17,44 @@ class TestNetwork(unittest.TestCase):
         self.assertTrue(meter.speed())
 
     def test_bandwidth_limit(self):
-        meter = BandwidthLimiter(rate_limit=100)
-
-        self.assertEqual(0, meter.sleep_time())
-
-        meter.feed(1000, feed_time=time.time() + 1.0)
-
-        self.assertAlmostEqual(9.0, meter.sleep_time(), delta=0.2)
-
-
+        limiter = BandwidthLimiter(rate_limit=100, clock=lambda: 0)
+
+        self.assertEqual(0, limiter.consume(100, time_now=0))
+        self.assertAlmostEqual(9.0, limiter.consume(900, time_now=0))
+        self.assertEqual(0, limiter.consume(0, time_now=9.0))
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(100, clock=lambda: 0)
+
+        self.assertEqual(0, bucket.consume(100, time_now=0))
+        self.assertAlmostEqual(1.0, bucket.consume(100, time_now=0))
+        self.assertAlmostEqual(0.5, bucket.delay(time_now=0.5))
+        self.assertEqual(0, bucket.delay(time_now=1.0))
+        self.assertFalse(bucket.full)
+
+    def test_bandwidth_limit_per_host(self):
+        limiter = BandwidthLimiter(
+            1000, host_rate_limit=100, domain_rate_limit=150,
+            clock=lambda: 0
+        )
+
+        self.assertEqual(0, limiter.consume(100, 'a.example.com'))
+        self.assertAlmostEqual(
+            1.0, limiter.consume(100, 'a.example.com'), delta=0.01)
+        self.assertAlmostEqual(
+            1.0, limiter.consume(100, 'b.example.com'), delta=0.01)
+        self.assertEqual(0, limiter.consume(100, 'example.net'))
+        self.assertAlmostEqual(0.4, limiter.consume(1000), delta=0.01)
+        self.assertEqual(1024, limiter.read_size)
+
+    def test_get_domain(self):
+        self.assertEqual('example.com', get_domain('www.example.com'))
+        self.assertEqual('example.com', get_domain('example.com'))
+        self.assertEqual('example.co.uk', get_domain('a.b.example.co.uk'))
+        self.assertEqual('127.0.0.1', get_domain('127.0.0.1'))
+        self.assertEqual('localhost', get_domain('localhost'))
+        self.assertEqual('example.com.au', get_domain('www.example.com.au'))
+        self.assertEqual('bbc.de', get_domain('a.bbc.de'))
+        self.assertEqual(get_domain('a.bbc.de'), get_domain('b.bbc.de'))
+        self.assertEqual('abc.io', get_domain('x.abc.io'))
+        self.assertEqual(get_domain('x.abc.io'), get_domain('y.abc.io'))
@@ -5,72 +5,200 @@ import contextlib
 import enum
 import errno
 import logging
+import math
 import os
 import socket
 import ssl
+import time
+import weakref
 
 import tornado.netutil
 from tornado.netutil import SSLCertificateError
 from typing import Optional, Union
 from wpull.backport.logging import BraceMessage as __
+from wpull.cache import FIFOCache
 from wpull.errors import NetworkError, ConnectionRefused, SSLVerificationError, \
     NetworkTimedOut
 
 _logger = logging.getLogger(__name__)
 
 
+class Deadline(object):
+    '''A deadline scheduled on a :class:`TimerWheel`.'''
+    def __init__(self, timer_wheel: 'TimerWheel', slot_index: int,
+                 rounds: int, callback):
+        self._timer_wheel = timer_wheel
+        self.slot_index = slot_index
+        self.rounds = rounds
+        self.callback = callback
+
+    def cancel(self):
+        '''Cancel the deadline if it has not expired.'''
+        self._timer_wheel.cancel(self)
+
+
+class TimerWheel(object):
+    '''Hashed timer wheel for coarse-grained deadlines.
+
+    Deadlines are hashed into slots by the tick on which they expire so
+    scheduling, cancelling and expiring a deadline does not depend on the
+    number of active deadlines. The wheel is ticked by a single
+    ``call_later`` handle and only while deadlines are active.
+
+    Deadlines never expire early but may expire up to one tick late.
+
+    Args:
+        resolution: Time in seconds between ticks.
+        slot_count: Number of slots in the wheel.
+    '''
+    def __init__(self, resolution: float=0.25, slot_count: int=512,
+                 event_loop: Optional[asyncio.AbstractEventLoop]=None):
+        assert resolution > 0
+        assert slot_count > 0
+        self._resolution = resolution
+        self._slots = [set() for dummy in range(slot_count)]
+        self._cursor = 0
+        self._active_count = 0
+        self._peak_count = 0
+        self._tick_handle = None
+        self._event_loop = event_loop or asyncio.get_event_loop()
+
+    @property
+    def active_count(self) -> int:
+        '''Return the number of deadlines that have not expired.'''
+        return self._active_count
+
+    @property
+    def peak_count(self) -> int:
+        '''Return the highest number of deadlines active at once.'''
+        return self._peak_count
+
+    def schedule(self, timeout: float, callback) -> Deadline:
+        '''Call the callback once the timeout has elapsed.'''
+        # One extra tick since the next tick may be less than a resolution
+        # away.
+        ticks = math.ceil(timeout / self._resolution) + 1
+        slot_index = (self._cursor + ticks) % len(self._slots)
+        rounds = (ticks - 1) // len(self._slots)
+
+        deadline = Deadline(self, slot_index, rounds, callback)
+        self._slots[slot_index].add(deadline)
+        self._active_count += 1
+        self._peak_count = max(self._peak_count, self._active_count)
+
+        if not self._tick_handle:
+            self._schedule_tick()
+
+        return deadline
+
+    def cancel(self, deadline: Deadline):
+        '''Remove the deadline from the wheel.'''
+        slot = self._slots[deadline.slot_index]
+
+        if deadline in slot:
+            slot.remove(deadline)
+            self._active_count -= 1
+
+            if not self._active_count and self._tick_handle:
+                self._tick_handle.cancel()
+                self._tick_handle = None
+
+    def _schedule_tick(self):
+        self._tick_handle = self._event_loop.call_later(
+            self._resolution, self._tick)
+
+    def _tick(self):
+        '''Advance the wheel and run the expired callbacks.'''
+        self._tick_handle = None
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        slot = self._slots[self._cursor]
+        expired = []
+
+        for deadline in slot:
+            if deadline.rounds:
+                deadline.rounds -= 1
+            else:
+                expired.append(deadline)
+
+        for deadline in expired:
+            slot.remove(deadline)
+
+        self._active_count -= len(expired)
+
+        if self._active_count:
+            self._schedule_tick()
+
+        for deadline in expired:
+            try:
+                deadline.callback()
+            except Exception:
+                _logger.exception('Deadline callback failed.')
+
+
+_timer_wheels = weakref.WeakKeyDictionary()
+
+
+def get_timer_wheel(event_loop: Optional[asyncio.AbstractEventLoop]=None) \
+        -> TimerWheel:
+    '''Return the timer wheel shared by connections of the event loop.'''
+    event_loop = event_loop or asyncio.get_event_loop()
+    timer_wheel = _timer_wheels.get(event_loop)
+
+    if not timer_wheel:
+        timer_wheel = _timer_wheels[event_loop] = \
+            TimerWheel(event_loop=event_loop)
+
+    return timer_wheel
+
+
 class CloseTimer(object):
-    '''Periodic timer to close connections if stalled.'''
-    def __init__(self, timeout, connection):
+    '''Timer to close connections if stalled.
+
+    A deadline is placed on the shared :class:`TimerWheel` only while an
+    operation is running.
+    '''
+    def __init__(self, timeout, connection,
+                 timer_wheel: Optional[TimerWheel]=None):
         self._timeout = timeout
-        self._touch_time = None
-        self._call_later_handle = None
         self._connection = connection
-        self._event_loop = asyncio.get_event_loop()
+        self._timer_wheel = timer_wheel or get_timer_wheel()
+        self._deadline = None
         self._timed_out = False
         self._running = True
 
         assert self._timeout > 0
-        self._schedule()
-
-    def _schedule(self):
-        '''Schedule check function.'''
-        if self._running:
-            _logger.debug('Schedule check function.')
-            self._call_later_handle = self._event_loop.call_later(
-                self._timeout, self._check)
-
-    def _check(self):
-        '''Check and close connection if needed.'''
-        _logger.debug('Check if timeout.')
-        self._call_later_handle = None
-
-        if self._touch_time is not None:
-            difference = self._event_loop.time() - self._touch_time
-            _logger.debug('Time difference %s', difference)
-
-            if difference > self._timeout:
-                self._connection.close()
-                self._timed_out = True
 
-        if not self._connection.closed():
-            self._schedule()
+    def _expire(self):
+        '''Close the connection.'''
+        _logger.debug('Connection timed out.')
+        self._deadline = None
+        self._connection.close()
+        self._timed_out = True
 
     def close(self):
         '''Stop running timers.'''
-        if self._call_later_handle:
-            self._call_later_handle.cancel()
+        if self._deadline:
+            self._deadline.cancel()
+            self._deadline = None
 
         self._running = False
 
     @contextlib.contextmanager
     def with_timeout(self):
         '''Context manager that applies timeout checks.'''
-        self._touch_time = self._event_loop.time()
+        if self._deadline or not self._running:
+            # Nested operations share the outer deadline.
+            yield
+            return
+
+        self._deadline = self._timer_wheel.schedule(
+            self._timeout, self._expire)
         try:
             yield
         finally:
-            self._touch_time = None
+            if self._deadline:
+                self._deadline.cancel()
+                self._deadline = None
 
     def is_timeout(self) -> bool:
         '''Return whether the timer has timed out.'''
@@ -273,6 +401,35 @@ class BaseConnection(object):
 
         return data
 
+    @classmethod
+    @asyncio.coroutine
+    def _wait_for(cls, task, timeout: float):
+        '''Wait for the task with a deadline on the shared timer wheel.
+
+        Like :func:`asyncio.wait_for` but without a ``call_later`` handle
+        per operation.
+
+        Coroutine.
+        '''
+        task = asyncio.async(task)
+        timed_out = False
+
+        def expire():
+            nonlocal timed_out
+            timed_out = True
+            task.cancel()
+
+        deadline = get_timer_wheel().schedule(timeout, expire)
+
+        try:
+            return (yield from task)
+        except asyncio.CancelledError as error:
+            if timed_out:
+                raise asyncio.TimeoutError() from error
+            raise
+        finally:
+            deadline.cancel()
+
     @asyncio.coroutine
     def run_network_operation(self, task, wait_timeout=None,
                               close_timeout=None,
@@ -296,7 +453,7 @@ class BaseConnection(object):
                 else:
                     return data
             elif wait_timeout is not None:
-                data = yield from asyncio.wait_for(task, wait_timeout)
+                data = yield from self._wait_for(task, wait_timeout)
                 return data
             else:
                 return (yield from task)
@@ -376,6 +533,11 @@ class Connection(BaseConnection):
     def is_ssl(self) -> bool:
         return False
 
+    @property
+    def alpn_protocol(self) -> Optional[str]:
+        '''Return the protocol negotiated with ALPN.'''
+        return None
+
     @property
     def tunneled(self) -> bool:
         if self.closed():
@@ -397,12 +559,17 @@ class Connection(BaseConnection):
 
     @asyncio.coroutine
     def read(self, amount: int=-1) -> bytes:
+        if amount > 0 and self._bandwidth_limiter and \
+                self._bandwidth_limiter.read_size:
+            # Small reads so the sleeps are short and evenly spread
+            amount = min(amount, self._bandwidth_limiter.read_size)
+
         data = yield from super().read(amount)
 
         if self._bandwidth_limiter:
-            self._bandwidth_limiter.feed(len(data))
+            sleep_time = self._bandwidth_limiter.consume(
+                len(data), self._hostname)
 
-            sleep_time = self._bandwidth_limiter.sleep_time()
             if sleep_time:
                 _logger.debug('Sleep %s', sleep_time)
                 yield from asyncio.sleep(sleep_time)
@@ -430,16 +597,89 @@ class Connection(BaseConnection):
         return ssl_conn
 
 
+class TLSSessionCache(object):
+    '''TLS sessions kept for resuming handshakes.
+
+    Sessions are stored per ``(hostname, port)``. Resuming requires
+    Python 3.6 or newer.
+
+    Args:
+        max_items: Maximum number of sessions.
+        time_to_live: Time in seconds a session is kept.
+
+    Attributes:
+        resumed (int): Number of handshakes that resumed a session.
+        full_handshakes (int): Number of full handshakes.
+    '''
+    def __init__(self, max_items: int=1000, time_to_live: float=3600):
+        self._cache = FIFOCache(max_items=max_items, time_to_live=time_to_live)
+        self.resumed = 0
+        self.full_handshakes = 0
+
+    @classmethod
+    def is_supported(cls) -> bool:
+        '''Return whether the ssl module can resume sessions.'''
+        return hasattr(ssl, 'SSLSession')
+
+    def get(self, key: tuple) -> Optional['ssl.SSLSession']:
+        '''Return a session that has not expired.'''
+        session = self._cache.get(key)
+
+        if session and session.time + session.timeout > time.time():
+            return session
+
+    def put(self, key: tuple, session: 'ssl.SSLSession'):
+        '''Store the session for the next handshake.'''
+        self._cache[key] = session
+
+    def count_handshake(self, resumed: bool):
+        '''Record whether a handshake resumed a session.'''
+        if resumed:
+            self.resumed += 1
+        else:
+            self.full_handshakes += 1
+
+
+class _ResumingSSLContext(object):
+    '''SSLContext wrapper that resumes a session when wrapping sockets.
+
+    The event loop does not accept a session argument so it is added to the
+    calls made by the SSL transport.
+    '''
+    def __init__(self, ssl_context: ssl.SSLContext, session: 'ssl.SSLSession'):
+        self._ssl_context = ssl_context
+        self._session = session
+
+    def __getattr__(self, name):
+        return getattr(self._ssl_context, name)
+
+    def wrap_bio(self, *args, **kwargs):
+        return self._ssl_context.wrap_bio(
+            *args, session=self._session, **kwargs)
+
+    def wrap_socket(self, *args, **kwargs):
+        return self._ssl_context.wrap_socket(
+            *args, session=self._session, **kwargs)
+
+
 class SSLConnection(Connection):
     '''SSL network stream.
 
     Args:
         ssl_context: SSLContext
+        tls_session_cache: If provided, TLS sessions are stored and resumed
+            for the hostname and port.
     '''
     def __init__(self, *args,
-                 ssl_context: Union[bool, dict, ssl.SSLContext]=True, **kwargs):
+                 ssl_context: Union[bool, dict, ssl.SSLContext]=True,
+                 tls_session_cache: Optional[TLSSessionCache]=None,
+                 **kwargs):
         super().__init__(*args, **kwargs)
         self._ssl_context = ssl_context
+        self._tls_session_cache = tls_session_cache
+
+        if tls_session_cache and not tls_session_cache.is_supported():
+            self._tls_session_cache = None
 
         if self._ssl_context is True:
             self._ssl_context = tornado.netutil.ssl_options_to_context({})
@@ -451,6 +691,16 @@ class SSLConnection(Connection):
     def is_ssl(self) -> bool:
         return True
 
+    @property
+    def alpn_protocol(self) -> Optional[str]:
+        if not self.writer:
+            return None
+
+        ssl_object = self.writer.get_extra_info('ssl_object')
+
+        if ssl_object and hasattr(ssl_object, 'selected_alpn_protocol'):
+            return ssl_object.selected_alpn_protocol()
+
     def _connection_kwargs(self):
         kwargs = super()._connection_kwargs()
 
@@ -458,8 +708,29 @@ class SSLConnection(Connection):
             kwargs['ssl'] = self._ssl_context
             kwargs['server_hostname'] = self._hostname
 
+            if self._tls_session_cache:
+                session = self._tls_session_cache.get(self._session_key())
+
+                if session:
+                    kwargs['ssl'] = _ResumingSSLContext(
+                        self._ssl_context, session)
+
             return kwargs
 
+    def _session_key(self) -> tuple:
+        return (self._hostname or self._address[0], self._address[1])
+
+    def _save_session(self):
+        '''Store the TLS session of the connection in the cache.'''
+        if not self._tls_session_cache or not self.writer:
+            return
+
+        ssl_object = self.writer.get_extra_info('ssl_object')
+
+        if ssl_object and ssl_object.session:
+            self._tls_session_cache.put(
+                self._session_key(), ssl_object.session)
+
     @asyncio.coroutine
     def connect(self):
         result = yield from super().connect()
@@ -471,8 +742,18 @@ class SSLConnection(Connection):
                                        'server unexpectedly closed') from error
 
         self._verify_cert(sock)
+
+        if self._tls_session_cache:
+            self._tls_session_cache.count_handshake(sock.session_reused)
+            self._save_session()
+
         return result
 
+    def close(self):
+        # TLS 1.3 session tickets arrive after the handshake
+        self._save_session()
+        super().close()
+
     def _verify_cert(self, sock: ssl.SSLSocket):
         '''Check if certificate matches hostname.'''
         # Based on tornado.iostream.SSLIOStream
@@ -4,10 +4,13 @@ import asyncio
 import socket
 import ssl
 import sys
+import unittest
 
 import wpull.testing.async
 from wpull.errors import NetworkError, NetworkTimedOut, SSLVerificationError
-from wpull.network.connection import Connection
+from wpull.network.connection import Connection, TimerWheel, \
+    SSLConnection, TLSSessionCache, get_timer_wheel
+from wpull.testing.async import AsyncTestCase
 from wpull.testing.badapp import BadAppTestCase, SSLBadAppTestCase
 
 
@@ -154,6 +157,47 @@ class TestConnection(BadAppTestCase):
         self.assertEqual(b'HTTP', data[:4])
 
 
+class TestTimerWheel(AsyncTestCase):
+    @wpull.testing.async.async_test()
+    def test_timer_wheel(self):
+        timer_wheel = TimerWheel(resolution=0.05, slot_count=4)
+        expired = []
+
+        timer_wheel.schedule(0.1, lambda: expired.append('short'))
+        timer_wheel.schedule(0.5, lambda: expired.append('long'))
+        deadline = timer_wheel.schedule(0.1, lambda: expired.append('cancel'))
+
+        self.assertEqual(3, timer_wheel.active_count)
+
+        deadline.cancel()
+        deadline.cancel()
+
+        self.assertEqual(2, timer_wheel.active_count)
+
+        yield from asyncio.sleep(0.3)
+
+        self.assertEqual(['short'], expired)
+        self.assertEqual(1, timer_wheel.active_count)
+
+        yield from asyncio.sleep(0.4)
+
+        self.assertEqual(['short', 'long'], expired)
+        self.assertEqual(0, timer_wheel.active_count)
+        self.assertEqual(3, timer_wheel.peak_count)
+
+    @wpull.testing.async.async_test()
+    def test_wait_for(self):
+        timer_wheel = get_timer_wheel()
+
+        with self.assertRaises(asyncio.TimeoutError):
+            yield from Connection._wait_for(asyncio.Future(), 0.1)
+
+        data = yield from Connection._wait_for(asyncio.sleep(0, 'a'), 10)
+
+        self.assertEqual('a', data)
+        self.assertEqual(0, timer_wheel.active_count)
+
+
 class TestConnectionSSL(SSLBadAppTestCase):
     @wpull.testing.async.async_test()
     def test_start_tls(self):
@@ -173,5 +217,27 @@ class TestConnectionSSL(SSLBadAppTestCase):
         data = yield from ssl_connection.readline()
         self.assertEqual(b'HTTP', data[:4])
 
+    @unittest.skipIf(not TLSSessionCache.is_supported(),
+                     'SSL sessions not supported')
+    @wpull.testing.async.async_test()
+    def test_tls_session_resumption(self):
+        ssl_context = ssl.SSLContext(ssl.PROTOCOL_SSLv23)
+        ssl_context.options |= getattr(ssl, 'OP_NO_TLSv1_3', 0)
+        tls_session_cache = TLSSessionCache()
+
+        for dummy in range(3):
+            connection = SSLConnection(
+                ('127.0.0.1', self.get_http_port()), 'localhost',
+                ssl_context=ssl_context, tls_session_cache=tls_session_cache
+            )
+
+            yield from connection.connect()
+            yield from connection.write(b'GET / HTTP/1.1\r\n\r\n')
+
+            data = yield from connection.readline()
+            self.assertEqual(b'HTTP', data[:4])
 
+            connection.close()
 
+        self.assertEqual(1, tls_session_cache.full_handshakes)
+        self.assertEqual(2, tls_session_cache.resumed)
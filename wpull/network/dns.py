@@ -1,5 +1,6 @@
 # encoding=utf-8
 '''DNS resolution.'''
+import collections
 import datetime
 import enum
 import itertools
@@ -7,18 +8,19 @@ import logging
 import random
 import socket
 import functools
+import time
 import asyncio
 
 import dns.resolver
 import dns.exception
 import dns.rdatatype
 import dns.rrset
-from typing import List, Sequence, Optional, Iterable, NamedTuple
+from typing import List, Sequence, Optional, Iterable, NamedTuple, Tuple, \
+    Union
 
 from wpull.application.plugin import PluginFunctions, hook_interface, \
     event_interface
 from wpull.backport.logging import BraceMessage as __
-from wpull.cache import FIFOCache
 from wpull.errors import DNSNotFound, NetworkError
 from wpull.application.hook import HookableMixin, HookDisconnected
 import wpull.util
@@ -98,6 +100,135 @@ class ResolveResult(object):
         self._address_infos.append(item)
 
 
+class ResolverCache(object):
+    '''Cache of DNS resolutions.
+
+    Entries expire with the TTL of the resource records. Hostnames that
+    do not exist are cached too. The least recently used entries are
+    discarded when the cache is full.
+
+    Args:
+        max_items: Maximum number of entries.
+        min_ttl: Lower bound in seconds for the record TTLs.
+        max_ttl: Upper bound in seconds for the record TTLs. It is also
+            used for results without records, such as the hosts file.
+        negative_ttl: Time in seconds to keep failed resolutions.
+    '''
+    def __init__(self, max_items: int=10000, min_ttl: float=60,
+                 max_ttl: float=3600, negative_ttl: float=300):
+        self._entries = collections.OrderedDict()
+        self.max_items = max_items
+        self._min_ttl = min_ttl
+        self._max_ttl = max_ttl
+        self._negative_ttl = negative_ttl
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key) -> Optional[Union[ResolveResult, DNSNotFound]]:
+        '''Return the result, the error for a negative entry, or None.'''
+        entry = self._entries.get(key)
+
+        if not entry:
+            return None
+
+        expire_time, value = entry
+
+        if expire_time <= time.time():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+
+        return value
+
+    def put(self, key, result: ResolveResult, ttl: Optional[float]=None):
+        '''Add a result that expires after the TTL.'''
+        if ttl is None:
+            ttl = self._max_ttl
+        else:
+            ttl = max(self._min_ttl, min(ttl, self._max_ttl))
+
+        self._set(key, result, ttl)
+
+    def put_negative(self, key, error: DNSNotFound):
+        '''Add a failed resolution.'''
+        self._set(key, error, self._negative_ttl)
+
+    def _set(self, key, value, ttl: float):
+        self._entries.pop(key, None)
+        self._entries[key] = (time.time() + ttl, value)
+
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        '''Remove all entries.'''
+        self._entries.clear()
+
+    def dump(self) -> List[dict]:
+        '''Return the entries that have not expired as JSON-able values.
+
+        DNS resource records are not included.
+        '''
+        now = time.time()
+        entries = []
+
+        for (host, family), (expire_time, value) in self._entries.items():
+            if expire_time <= now:
+                continue
+
+            entry = {
+                'host': host,
+                'family': family.name,
+                'expire_time': expire_time,
+            }
+
+            if isinstance(value, DNSNotFound):
+                entry['error'] = str(value)
+            else:
+                entry['addresses'] = [list(info) for info in value.addresses]
+
+            entries.append(entry)
+
+        return entries
+
+    def load(self, entries: List[dict]):
+        '''Add the entries returned by :meth:`dump`.
+
+        Entries that have expired since are skipped.
+
+        Raises:
+            ValueError: An entry is not valid.
+        '''
+        now = time.time()
+
+        try:
+            for entry in entries:
+                if entry['expire_time'] <= now:
+                    continue
+
+                key = (entry['host'], IPFamilyPreference[entry['family']])
+
+                if 'error' in entry:
+                    value = DNSNotFound(entry['error'])
+                else:
+                    value = ResolveResult([
+                        AddressInfo(*info) for info in entry['addresses']
+                    ], [])
+
+                self._entries.pop(key, None)
+                self._entries[key] = (entry['expire_time'], value)
+        except (KeyError, TypeError) as error:
+            raise ValueError('Invalid cache entry.') from error
+
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+
+
 @enum.unique
 class IPFamilyPreference(enum.Enum):
     '''IPv4 and IPV6 preferences.'''
@@ -118,6 +249,8 @@ class Resolver(HookableMixin):
         cache: Cache to store results of any query.
         rotate: If result is cached rotates the results, otherwise, shuffle
             the results.
+
+    Concurrent resolutions of the same hostname share one query.
     '''
 
     def __init__(
@@ -125,7 +258,7 @@ class Resolver(HookableMixin):
             family: IPFamilyPreference=IPFamilyPreference.any,
             timeout: Optional[float]=None,
             bind_address: Optional[str]=None,
-            cache: Optional[FIFOCache]=None,
+            cache: Optional[ResolverCache]=None,
             rotate: bool=False):
         super().__init__()
         assert family in IPFamilyPreference, \
@@ -136,6 +269,7 @@ class Resolver(HookableMixin):
         self._bind_address = bind_address
         self._cache = cache
         self._rotate = rotate
+        self._pending = {}
 
         self._dns_resolver = dns.resolver.Resolver()
 
@@ -147,10 +281,15 @@ class Resolver(HookableMixin):
         self.hook_dispatcher.register(PluginFunctions.resolve_dns)
         self.event_dispatcher.register(PluginFunctions.resolve_dns_result)
 
+    @property
+    def cache(self) -> Optional[ResolverCache]:
+        '''The cache of results.'''
+        return self._cache
+
     @classmethod
-    def new_cache(cls) -> FIFOCache:
+    def new_cache(cls) -> ResolverCache:
         '''Return a default cache'''
-        return FIFOCache(max_items=100, time_to_live=3600)
+        return ResolverCache()
 
     @asyncio.coroutine
     def resolve(self, host: str) -> ResolveResult:
@@ -179,17 +318,100 @@ class Resolver(HookableMixin):
 
         cache_key = (host, self._family)
 
-        if self._cache and cache_key in self._cache:
-            resolve_result = self._cache[cache_key]
-            _logger.debug(__('Return by cache {0}.', resolve_result))
+        if self._cache is not None:
+            resolve_result = self._cache.get(cache_key)
+
+            if isinstance(resolve_result, DNSNotFound):
+                _logger.debug(__('Return by negative cache {0}.', host))
+                raise DNSNotFound(*resolve_result.args)
+            elif resolve_result:
+                _logger.debug(__('Return by cache {0}.', resolve_result))
+
+                if self._rotate:
+                    resolve_result.rotate()
+
+                return resolve_result
+
+        resolve_task = self._pending.get(cache_key)
+
+        if not resolve_task:
+            resolve_task = asyncio.async(self._resolve_and_cache(
+                host, cache_key))
+            self._pending[cache_key] = resolve_task
+            resolve_task.add_done_callback(
+                lambda task: self._pending.pop(cache_key, None))
+        else:
+            _logger.debug(__('Join pending lookup {0}.', host))
+
+        # Shielded so a caller timing out does not cancel other callers
+        return (yield from asyncio.shield(resolve_task))
+
+    @asyncio.coroutine
+    def prefetch(self, hosts: Iterable[str], concurrency: int=2):
+        '''Resolve hostnames into the cache ahead of use.
+
+        Errors are ignored. Nothing is done if there is no cache.
+
+        Args:
+            hosts: The hostnames.
+            concurrency: The number of lookups at a time. Lookups run on
+                the event loop's default executor, so keep this small to
+                leave threads for the lookups of the crawl.
+
+        Coroutine.
+        '''
+        if self._cache is None:
+            return
+
+        hosts = iter(hosts)
+
+        @asyncio.coroutine
+        def prefetch_worker():
+            for host in hosts:
+                try:
+                    yield from self.resolve(host)
+                except NetworkError:
+                    pass
+
+        yield from asyncio.gather(
+            *[prefetch_worker() for dummy in range(concurrency)])
+
+    @asyncio.coroutine
+    def _resolve_and_cache(self, host: str, cache_key: tuple) \
+            -> ResolveResult:
+        '''Resolve the hostname and store the result in the cache.
+
+        Coroutine.
+        '''
+        try:
+            resolve_result, ttl = yield from self._resolve(host)
+        except DNSNotFound as error:
+            if self._cache is not None:
+                self._cache.put_negative(cache_key, error)
+            raise
+
+        if self._cache is not None:
+            self._cache.put(cache_key, resolve_result, ttl)
+
+        self.event_dispatcher.notify(PluginFunctions.resolve_dns_result, host, resolve_result)
+
+        if self._rotate:
+            resolve_result.shuffle()
+
+        return resolve_result
 
-            if self._rotate:
-                resolve_result.rotate()
+    @asyncio.coroutine
+    def _resolve(self, host: str) -> Tuple[ResolveResult, Optional[float]]:
+        '''Resolve the hostname without the cache.
 
-            return resolve_result
+        Returns:
+            The result and the lowest record TTL, if any.
 
+        Coroutine.
+        '''
         address_infos = []
         dns_infos = []
+        ttls = []
 
         if not self.dns_python_enabled:
             families = ()
@@ -209,6 +431,7 @@ class Resolver(HookableMixin):
             else:
                 dns_infos.append(DNSInfo(datetime_now, answer.response.answer))
                 address_infos.extend(self._convert_dns_answer(answer))
+                ttls.extend(rrset.ttl for rrset in answer.response.answer)
 
         if not address_infos:
             # Maybe the address is defined in hosts file or mDNS
@@ -227,15 +450,7 @@ class Resolver(HookableMixin):
 
         resolve_result = ResolveResult(address_infos, dns_infos)
 
-        if self._cache:
-            self._cache[cache_key] = resolve_result
-
-        self.event_dispatcher.notify(PluginFunctions.resolve_dns_result, host, resolve_result)
-
-        if self._rotate:
-            resolve_result.shuffle()
-
-        return resolve_result
+        return resolve_result, min(ttls) if ttls else None
 
     @asyncio.coroutine
     def _query_dns(self, host: str, family: int=socket.AF_INET) \
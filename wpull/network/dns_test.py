@@ -1,10 +1,12 @@
 # encoding=utf-8
+import asyncio
 import socket
 import unittest
 
 import wpull.testing.async
 from wpull.errors import NetworkError, DNSNotFound
-from wpull.network.dns import Resolver, IPFamilyPreference
+from wpull.network.dns import Resolver, IPFamilyPreference, ResolverCache, \
+    ResolveResult, AddressInfo
 
 
 DEFAULT_TIMEOUT = 30
@@ -117,3 +119,124 @@ class TestNoPythonDNS(TestDNS):
         resolver = self.get_resolver()
         with self.assertRaises(DNSNotFound):
             yield from resolver.resolve('-kol.deviantart.com')
+
+
+class TestResolverCache(wpull.testing.async.AsyncTestCase):
+    def get_resolver(self, resolve_func):
+        resolver = Resolver(cache=ResolverCache(max_items=2))
+        resolver.resolve_count = 0
+
+        @asyncio.coroutine
+        def mock_resolve(host):
+            resolver.resolve_count += 1
+            yield from asyncio.sleep(0.01)
+            return resolve_func(host)
+
+        resolver._resolve = mock_resolve
+
+        return resolver
+
+    @wpull.testing.async.async_test()
+    def test_coalesce(self):
+        def resolve_func(host):
+            return ResolveResult([
+                AddressInfo('127.0.0.1', socket.AF_INET, None, None)
+            ]), 300
+
+        resolver = self.get_resolver(resolve_func)
+
+        results = yield from asyncio.gather(
+            *[resolver.resolve('example.com') for dummy in range(5)])
+
+        self.assertEqual(1, resolver.resolve_count)
+        self.assertEqual(1, len(set(id(result) for result in results)))
+
+        yield from resolver.resolve('example.com')
+
+        self.assertEqual(1, resolver.resolve_count)
+
+    @wpull.testing.async.async_test()
+    def test_negative_cache(self):
+        def resolve_func(host):
+            raise DNSNotFound('Not found.')
+
+        resolver = self.get_resolver(resolve_func)
+
+        for dummy in range(3):
+            with self.assertRaises(DNSNotFound):
+                yield from resolver.resolve('example.invalid')
+
+        self.assertEqual(1, resolver.resolve_count)
+
+    @wpull.testing.async.async_test()
+    def test_prefetch(self):
+        def resolve_func(host):
+            return ResolveResult([
+                AddressInfo('127.0.0.1', socket.AF_INET, None, None)
+            ]), 300
+
+        resolver = Resolver(cache=ResolverCache())
+        in_flight = [0, 0]
+
+        @asyncio.coroutine
+        def mock_resolve(host):
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+            yield from asyncio.sleep(0.01)
+            in_flight[0] -= 1
+            return resolve_func(host)
+
+        resolver._resolve = mock_resolve
+
+        hosts = ['{}.example.com'.format(index) for index in range(6)]
+
+        yield from resolver.prefetch(hosts, concurrency=2)
+
+        self.assertEqual(2, in_flight[1])
+
+        for host in hosts:
+            self.assertIn((host, IPFamilyPreference.any), resolver.cache)
+
+    def test_ttl_and_eviction(self):
+        cache = ResolverCache(max_items=2, min_ttl=0)
+        result = ResolveResult([])
+
+        cache.put('a', result, ttl=-1)
+        self.assertIsNone(cache.get('a'))
+
+        cache.put('a', result)
+        cache.put('b', result)
+        cache.get('a')
+        cache.put('c', result)
+
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+
+    def test_dump_load(self):
+        cache = ResolverCache(min_ttl=0)
+        result = ResolveResult([
+            AddressInfo('::1', socket.AF_INET6, 0, 0),
+            AddressInfo('127.0.0.1', socket.AF_INET, None, None),
+        ])
+
+        cache.put(('example.com', IPFamilyPreference.any), result)
+        cache.put_negative(('example.invalid', IPFamilyPreference.any),
+                           DNSNotFound('Not found.'))
+        cache.put(('expired.example', IPFamilyPreference.any), result, -1)
+
+        new_cache = ResolverCache()
+        new_cache.load(cache.dump())
+
+        self.assertEqual(2, len(new_cache))
+        self.assertEqual(
+            result.addresses,
+            new_cache.get(('example.com', IPFamilyPreference.any)).addresses
+        )
+        self.assertIsInstance(
+            new_cache.get(('example.invalid', IPFamilyPreference.any)),
+            DNSNotFound
+        )
+
+        with self.assertRaises(ValueError):
+            new_cache.load([{'host': 'example.com'}])
@@ -1,13 +1,16 @@
 import asyncio
+import collections
 import contextlib
 import functools
 import logging
+import time
 
 from typing import Callable, Optional, Mapping, Any, Union, Tuple
 
 from wpull.cache import FIFOCache
-from wpull.errors import NetworkError
-from wpull.network.connection import Connection, SSLConnection
+from wpull.errors import NetworkError, SSLVerificationError
+from wpull.network.connection import Connection, SSLConnection, \
+    TLSSessionCache
 from wpull.network.dns import Resolver, ResolveResult
 
 _logger = logging.getLogger(__name__)
@@ -19,6 +22,10 @@ class HostPool(object):
     Attributes:
         ready (Queue): Connections not in use.
         busy (set): Connections in use.
+        pipelined (dict): Busy connections that can be shared for
+            pipelining mapped to the number of users.
+        connecting (set): Pipelined connections that are being connected
+            by their first user.
     '''
     def __init__(self, connection_factory: Callable[[], Connection],
                  max_connections: int=6):
@@ -29,6 +36,8 @@ class HostPool(object):
         self.max_connections = max_connections
         self.ready = set()
         self.busy = set()
+        self.pipelined = {}
+        self.connecting = set()
         self._lock = asyncio.Lock()
         self._condition = asyncio.Condition(lock=self._lock)
         self._closed = False
@@ -38,19 +47,32 @@ class HostPool(object):
         return not self.ready and not self.busy
 
     @asyncio.coroutine
-    def clean(self, force: bool=False):
+    def clean(self, force: bool=False) -> list:
         '''Clean closed connections.
 
         Args:
             force: Clean connected and idle connections too.
 
+        Returns:
+            The connections that were removed.
+
         Coroutine.
         '''
+        removed = []
+
         with (yield from self._lock):
             for connection in tuple(self.ready):
                 if force or connection.closed():
                     connection.close()
                     self.ready.remove(connection)
+                    removed.append(connection)
+
+        return removed
+
+    def evict(self, connection: Connection):
+        '''Close and remove an idle connection.'''
+        self.ready.remove(connection)
+        connection.close()
 
     def close(self):
         '''Forcibly close all connections.
@@ -70,12 +92,18 @@ class HostPool(object):
         return len(self.ready) + len(self.busy)
 
     @asyncio.coroutine
-    def acquire(self) -> Connection:
+    def acquire(self, pipeline_depth: int=1) -> Connection:
         '''Register and return a connection.
 
+        Args:
+            pipeline_depth: If greater than 1, a connected connection
+                acquired with pipelining may be returned to up to this many
+                users at the same time.
+
         Coroutine.
         '''
         assert not self._closed
+        assert pipeline_depth > 0
 
         yield from self._condition.acquire()
 
@@ -83,17 +111,71 @@ class HostPool(object):
             if self.ready:
                 connection = self.ready.pop()
                 break
-            elif len(self.busy) < self.max_connections:
+
+            if pipeline_depth > 1:
+                connection = self._get_pipelined(pipeline_depth)
+
+                if connection:
+                    self.pipelined[connection] += 1
+                    self._condition.release()
+                    return connection
+
+                if self._has_connecting(pipeline_depth):
+                    # Share it once connected instead of opening another
+                    yield from self._condition.wait()
+                    continue
+
+            if len(self.busy) < self.max_connections:
                 connection = self._connection_factory()
                 break
             else:
                 yield from self._condition.wait()
 
         self.busy.add(connection)
+
+        if pipeline_depth > 1:
+            self.pipelined[connection] = 1
+
+            if connection.closed():
+                self.connecting.add(connection)
+
         self._condition.release()
 
         return connection
 
+    @asyncio.coroutine
+    def notify_pipelined(self, connection: Connection):
+        '''Wake up users waiting for a pipelined connection to connect.
+
+        Coroutine.
+        '''
+        with (yield from self._condition):
+            self.connecting.discard(connection)
+            self._condition.notify_all()
+
+    def set_exclusive(self, connection: Connection):
+        '''Stop sharing a pipelined connection that has a single user.
+
+        Call :meth:`notify_pipelined` afterwards so users waiting for it to
+        connect open their own connection.
+        '''
+        if self.pipelined.get(connection) == 1:
+            del self.pipelined[connection]
+
+    def _get_pipelined(self, pipeline_depth: int) -> Optional[Connection]:
+        '''Return a connected pipelined connection that has room.'''
+        for connection, count in self.pipelined.items():
+            if count < pipeline_depth and not connection.closed() \
+                    and connection not in self.connecting:
+                return connection
+
+    def _has_connecting(self, pipeline_depth: int) -> bool:
+        '''Return whether a pipelined connection with room is connecting.'''
+        return any(
+            self.pipelined.get(connection, pipeline_depth) < pipeline_depth
+            for connection in self.connecting
+        )
+
     @asyncio.coroutine
     def release(self, connection: Connection, reuse: bool=True):
         '''Unregister a connection.
@@ -105,6 +187,22 @@ class HostPool(object):
         Coroutine.
         '''
         yield from self._condition.acquire()
+
+        if connection in self.connecting:
+            # Its first user gave up so a waiting user may connect instead
+            self.connecting.remove(connection)
+            self._condition.notify_all()
+
+        if connection in self.pipelined:
+            self.pipelined[connection] -= 1
+
+            if self.pipelined[connection]:
+                self._condition.notify()
+                self._condition.release()
+                return
+
+            del self.pipelined[connection]
+
         self.busy.remove(connection)
 
         if reuse:
@@ -114,6 +212,47 @@ class HostPool(object):
         self._condition.release()
 
 
+class PoolStatistics(object):
+    '''Connection reuse counters of a connection pool.
+
+    Attributes:
+        hits (int): Number of acquisitions served by an idle connection.
+        misses (int): Number of acquisitions that created a connection.
+        shared (int): Number of acquisitions that shared a busy connection.
+        evictions (int): Number of idle connections closed to stay under
+            the connection limit.
+        prewarmed (int): Number of connections opened by :meth:`prewarm`.
+            They are included in `misses`.
+    '''
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.evictions = 0
+        self.prewarmed = 0
+
+    @property
+    def hit_rate(self) -> float:
+        '''Return the fraction of acquisitions served by idle connections.'''
+        total = self.hits + self.misses + self.shared
+
+        if total:
+            return self.hits / total
+        else:
+            return 0.0
+
+    @property
+    def reuse_rate(self) -> float:
+        '''Return the fraction of acquisitions that did not create a
+        connection.'''
+        total = self.hits + self.misses + self.shared
+
+        if total:
+            return (self.hits + self.shared) / total
+        else:
+            return 0.0
+
+
 class ConnectionPool(object):
     '''Connection pool.
 
@@ -124,7 +263,14 @@ class ConnectionPool(object):
             ``hostname`` arguments and returns a :class:`Connection` instance.
         ssl_connection_factory: A function that returns a
             :class:`SSLConnection` instance. See `connection_factory`.
-        max_count: Limit on number of connections
+        max_count: Limit on number of connections. When it is exceeded,
+            the least recently used idle connections of any host are
+            closed.
+        tls_session_cache: If provided, it is passed to
+            `ssl_connection_factory` so TLS sessions are resumed.
+
+    Attributes:
+        statistics (PoolStatistics): Connection reuse counters.
     '''
     def __init__(self, max_host_count: int=6,
                  resolver: Optional[Resolver]=None,
@@ -132,14 +278,19 @@ class ConnectionPool(object):
                  Optional[Callable[[tuple, str], Connection]]=None,
                  ssl_connection_factory:
                  Optional[Callable[[tuple, str], SSLConnection]]=None,
-                 max_count: int=100):
+                 max_count: int=100,
+                 tls_session_cache: Optional[TLSSessionCache]=None):
         self._max_host_count = max_host_count
         self._resolver = resolver or Resolver()
         self._connection_factory = connection_factory or Connection
         self._ssl_connection_factory = ssl_connection_factory or SSLConnection
         self._max_count = max_count
+        self._tls_session_cache = tls_session_cache
         self._host_pools = {}
         self._host_pool_waiters = {}
+        self._connections = set()
+        self._idle = collections.OrderedDict()
+        self.statistics = PoolStatistics()
         self._host_pools_lock = asyncio.Lock()
         self._release_tasks = set()
         self._closed = False
@@ -149,9 +300,14 @@ class ConnectionPool(object):
     def host_pools(self) -> Mapping[tuple, HostPool]:
         return self._host_pools
 
+    @property
+    def happy_eyeballs_table(self) -> 'HappyEyeballsTable':
+        '''The preferred addresses of dual stack hosts.'''
+        return self._happy_eyeballs_table
+
     @asyncio.coroutine
     def acquire(self, host: str, port: int, use_ssl: bool=False,
-                host_key: Optional[Any]=None) \
+                host_key: Optional[Any]=None, pipeline_depth: int=1) \
             -> Union[Connection, SSLConnection]:
         '''Return an available connection.
 
@@ -161,6 +317,9 @@ class ConnectionPool(object):
             use_ssl: Whether to return a SSL connection.
             host_key: If provided, it overrides the key used for per-host
                 connection pooling. This is useful for proxies for example.
+            pipeline_depth: If greater than 1, the connection may be shared
+                by up to this many users for HTTP pipelining or HTTP/2
+                streams.
 
         Coroutine.
         '''
@@ -169,7 +328,11 @@ class ConnectionPool(object):
 
         yield from self._process_no_wait_releases()
 
-        if use_ssl:
+        if use_ssl and self._tls_session_cache:
+            connection_factory = functools.partial(
+                self._ssl_connection_factory, hostname=host,
+                tls_session_cache=self._tls_session_cache)
+        elif use_ssl:
             connection_factory = functools.partial(
                 self._ssl_connection_factory, hostname=host)
         else:
@@ -197,9 +360,23 @@ class ConnectionPool(object):
 
         _logger.debug('Check out %s', key)
 
-        connection = yield from host_pool.acquire()
+        connection = yield from host_pool.acquire(pipeline_depth)
         connection.key = key
 
+        if connection in self._idle:
+            del self._idle[connection]
+
+            if connection.closed():
+                self.statistics.misses += 1
+            else:
+                self.statistics.hits += 1
+        elif connection in self._connections:
+            self.statistics.shared += 1
+        else:
+            self._connections.add(connection)
+            self.statistics.misses += 1
+            self._evict_idle()
+
         # TODO: Verify this assert is always true
         # assert host_pool.count() <= host_pool.max_connections
         # assert key in self._host_pools
@@ -225,8 +402,87 @@ class ConnectionPool(object):
 
         yield from host_pool.release(connection)
 
-        force = self.count() > self._max_count
-        yield from self.clean(force=force)
+        if connection in host_pool.ready:
+            self._idle[connection] = host_pool
+
+            if connection.closed():
+                # Closed connections are the cheapest to give up
+                self._idle.move_to_end(connection, last=False)
+
+            self._evict_idle()
+
+        self._remove_host_pool_if_unused(key)
+
+    def _evict_idle(self):
+        '''Close least recently used idle connections over the limit.'''
+        while len(self._connections) > self._max_count and self._idle:
+            connection, host_pool = self._idle.popitem(last=False)
+
+            _logger.debug('Evict %s', connection.key)
+
+            if not connection.closed():
+                self.statistics.evictions += 1
+
+            host_pool.evict(connection)
+            self._connections.discard(connection)
+            self._remove_host_pool_if_unused(connection.key)
+
+    def _remove_host_pool_if_unused(self, key):
+        '''Remove the host pool if it has no connections and no waiters.'''
+        host_pool = self._host_pools.get(key)
+
+        if host_pool and not self._host_pool_waiters[key] \
+                and host_pool.empty():
+            del self._host_pools[key]
+            del self._host_pool_waiters[key]
+
+    @asyncio.coroutine
+    def prewarm(self, host: str, port: int, use_ssl: bool=False) -> bool:
+        '''Open a connection to the host and keep it as idle.
+
+        Nothing is done if the host already has connections.
+
+        Returns:
+            Whether a connection was opened.
+
+        Coroutine.
+        '''
+        host_pool = self._host_pools.get((host, port, use_ssl))
+
+        if host_pool and host_pool.count():
+            return False
+
+        connection = yield from self.acquire(host, port, use_ssl)
+
+        try:
+            if connection.closed():
+                yield from connection.connect()
+        except (NetworkError, SSLVerificationError) as error:
+            _logger.debug('Prewarm %s:%s failed: %s', host, port, error)
+            return False
+        else:
+            self.statistics.prewarmed += 1
+            return True
+        finally:
+            yield from self.release(connection)
+
+    @asyncio.coroutine
+    def notify_pipelined(self, connection: Connection):
+        '''Let waiting users share the newly connected connection.
+
+        Coroutine.
+        '''
+        host_pool = self._host_pools.get(connection.key)
+
+        if host_pool:
+            yield from host_pool.notify_pipelined(connection)
+
+    def set_exclusive(self, connection: Connection):
+        '''Stop sharing the connection with other users.'''
+        host_pool = self._host_pools.get(connection.key)
+
+        if host_pool:
+            host_pool.set_exclusive(connection)
 
     def no_wait_release(self, connection: Connection):
         '''Synchronous version of :meth:`release`.'''
@@ -284,11 +540,11 @@ class ConnectionPool(object):
 
         with (yield from self._host_pools_lock):
             for key, pool in tuple(self._host_pools.items()):
-                yield from pool.clean(force=force)
+                for connection in (yield from pool.clean(force=force)):
+                    self._connections.discard(connection)
+                    self._idle.pop(connection, None)
 
-                if not self._host_pool_waiters[key] and pool.empty():
-                    del self._host_pools[key]
-                    del self._host_pool_waiters[key]
+                self._remove_host_pool_if_unused(key)
 
     def close(self):
         '''Close all the connections and clean up.
@@ -301,36 +557,118 @@ class ConnectionPool(object):
             del self._host_pools[key]
             del self._host_pool_waiters[key]
 
+        self._connections.clear()
+        self._idle.clear()
         self._closed = True
 
     def count(self) -> int:
         '''Return number of connections.'''
-        counter = 0
+        return len(self._connections)
+
+
+class ConnectionPrewarmer(object):
+    '''Opens connections in the background ahead of the first request.
+
+    Args:
+        connection_pool: The pool that keeps the opened connections.
+        max_pending: The number of hosts connected at the same time. Other
+            hosts wait in a queue.
+        max_queued: The number of hosts waiting in the queue. The oldest
+            host is dropped when the queue is full.
+    '''
+    def __init__(self, connection_pool: ConnectionPool, max_pending: int=4,
+                 max_queued: int=100):
+        self._connection_pool = connection_pool
+        self._max_pending = max_pending
+        self._tasks = set()
+        self._queue = collections.deque(maxlen=max_queued)
+
+    def prewarm(self, host: str, port: int, use_ssl: bool=False):
+        '''Start opening a connection to the host.'''
+        if len(self._tasks) >= self._max_pending:
+            self._queue.append((host, port, use_ssl))
+            return
+
+        task = asyncio.async(
+            self._connection_pool.prewarm(host, port, use_ssl))
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+
+        if not task.cancelled() and task.exception():
+            _logger.debug('Prewarm error: %s', task.exception())
+
+        if self._queue and not task.cancelled():
+            self.prewarm(*self._queue.popleft())
 
-        for pool in self._host_pools.values():
-            counter += pool.count()
+    def close(self):
+        '''Cancel the connections in progress.'''
+        self._queue.clear()
 
-        return counter
+        for task in self._tasks:
+            task.cancel()
 
 
 class HappyEyeballsTable(object):
     def __init__(self, max_items=100, time_to_live=600):
         '''Happy eyeballs connection cache table.'''
         self._cache = FIFOCache(max_items=max_items, time_to_live=time_to_live)
+        self._time_to_live = time_to_live
 
-    def set_preferred(self, preferred_addr, addr_1, addr_2):
+    def set_preferred(self, preferred_addr, addr_1, addr_2,
+                      expire_time=None):
         '''Set the preferred address.'''
         if addr_1 > addr_2:
             addr_1, addr_2 = addr_2, addr_1
 
-        self._cache[(addr_1, addr_2)] = preferred_addr
+        if expire_time is None:
+            expire_time = time.time() + self._time_to_live
+
+        self._cache[(addr_1, addr_2)] = (preferred_addr, expire_time)
 
     def get_preferred(self, addr_1, addr_2):
         '''Return the preferred address.'''
         if addr_1 > addr_2:
             addr_1, addr_2 = addr_2, addr_1
 
-        return self._cache.get((addr_1, addr_2))
+        entry = self._cache.get((addr_1, addr_2))
+
+        if entry and entry[1] > time.time():
+            return entry[0]
+
+    def dump(self) -> list:
+        '''Return the preferences that have not expired as JSON-able
+        values.'''
+        now = time.time()
+        entries = []
+
+        for key in tuple(self._cache):
+            entry = self._cache.get(key)
+
+            if entry and entry[1] > now:
+                entries.append([key[0], key[1], entry[0], entry[1]])
+
+        return entries
+
+    def load(self, entries: list):
+        '''Add the preferences returned by :meth:`dump`.
+
+        Raises:
+            ValueError: An entry is not valid.
+        '''
+        now = time.time()
+
+        for entry in entries:
+            try:
+                addr_1, addr_2, preferred_addr, expire_time = entry
+            except (TypeError, ValueError) as error:
+                raise ValueError('Invalid preference entry.') from error
+
+            if expire_time > now:
+                self.set_preferred(
+                    preferred_addr, addr_1, addr_2, expire_time=expire_time)
 
 
 class HappyEyeballsConnection(object):
@@ -1,11 +1,13 @@
 import asyncio
 
 import functools
+import time
 
 import wpull.testing.async
 from wpull.network.connection import Connection
 from wpull.network.dns import Resolver, IPFamilyPreference
-from wpull.network.pool import ConnectionPool, HostPool, HappyEyeballsTable
+from wpull.network.pool import ConnectionPool, HostPool, HappyEyeballsTable, \
+    ConnectionPrewarmer
 from wpull.testing.badapp import BadAppTestCase
 
 
@@ -135,6 +137,100 @@ class TestConnectionPool(BadAppTestCase):
         # This line should not KeyError crash:
         yield from pool.release(connection_2)
 
+    @wpull.testing.async.async_test()
+    def test_evict_least_recently_used(self):
+        pool = ConnectionPool(max_count=2)
+        port = self.get_http_port()
+
+        conn1 = yield from pool.acquire('localhost', port, host_key='a')
+        yield from conn1.connect()
+        conn2 = yield from pool.acquire('localhost', port, host_key='b')
+        yield from conn2.connect()
+
+        yield from pool.release(conn1)
+        yield from pool.release(conn2)
+
+        conn3 = yield from pool.acquire('localhost', port, host_key='c')
+
+        self.assertTrue(conn1.closed())
+        self.assertFalse(conn2.closed())
+        self.assertEqual(2, pool.count())
+        self.assertNotIn('a', pool.host_pools)
+
+        yield from pool.release(conn3)
+
+        conn4 = yield from pool.acquire('localhost', port, host_key='b')
+
+        self.assertIs(conn2, conn4)
+        self.assertEqual(1, pool.statistics.hits)
+        self.assertEqual(3, pool.statistics.misses)
+        self.assertEqual(1, pool.statistics.evictions)
+        self.assertAlmostEqual(0.25, pool.statistics.reuse_rate)
+
+    @wpull.testing.async.async_test()
+    def test_prewarm(self):
+        pool = ConnectionPool()
+        port = self.get_http_port()
+
+        self.assertTrue((yield from pool.prewarm('localhost', port)))
+        self.assertFalse((yield from pool.prewarm('localhost', port)))
+        self.assertEqual(1, pool.count())
+
+        connection = yield from pool.acquire('localhost', port)
+
+        self.assertFalse(connection.closed())
+        self.assertEqual(1, pool.statistics.hits)
+        self.assertEqual(1, pool.statistics.prewarmed)
+
+    @wpull.testing.async.async_test()
+    def test_prewarmer_queue(self):
+        pool = ConnectionPool()
+        port = self.get_http_port()
+        prewarmer = ConnectionPrewarmer(pool, max_pending=1, max_queued=1)
+
+        prewarmer.prewarm('localhost', port)
+        prewarmer.prewarm('example.invalid', port)
+        prewarmer.prewarm('127.0.0.1', port)
+
+        for dummy in range(50):
+            if pool.statistics.prewarmed == 2:
+                break
+
+            yield from asyncio.sleep(0.05)
+
+        self.assertEqual(2, pool.count())
+        self.assertIn(('localhost', port, False), pool.host_pools)
+        self.assertIn(('127.0.0.1', port, False), pool.host_pools)
+
+        prewarmer.close()
+
+    @wpull.testing.async.async_test()
+    def test_pipelined_connecting(self):
+        pool = ConnectionPool()
+        port = self.get_http_port()
+
+        connection = yield from pool.acquire('localhost', port,
+                                             pipeline_depth=3)
+        self.assertTrue(connection.closed())
+
+        waiters = [
+            asyncio.async(pool.acquire('localhost', port, pipeline_depth=3))
+            for dummy in range(3)
+        ]
+        yield from asyncio.sleep(0.05)
+
+        self.assertFalse(any(waiter.done() for waiter in waiters))
+
+        yield from connection.connect()
+        yield from pool.notify_pipelined(connection)
+        yield from asyncio.sleep(0.05)
+
+        connections = [waiter.result() for waiter in waiters]
+
+        self.assertEqual([connection, connection], connections[:2])
+        self.assertNotEqual(connection, connections[2])
+        self.assertEqual(2, pool.count())
+
     @wpull.testing.async.async_test()
     def test_happy_eyeballs(self):
         connection_factory = functools.partial(Connection, connect_timeout=10)
@@ -179,3 +275,15 @@ class TestConnectionPool(BadAppTestCase):
 
         self.assertEqual('127.0.0.1', table.get_preferred('127.0.0.1', '::1'))
         self.assertEqual('127.0.0.1', table.get_preferred('::1', '127.0.0.1'))
+
+    def test_happy_eyeballs_table_dump_load(self):
+        table = HappyEyeballsTable()
+        table.set_preferred('::1', '127.0.0.1', '::1')
+        table.set_preferred('10.0.0.1', '10.0.0.1', '::2',
+                            expire_time=time.time() - 1)
+
+        new_table = HappyEyeballsTable()
+        new_table.load(table.dump())
+
+        self.assertEqual('::1', new_table.get_preferred('127.0.0.1', '::1'))
+        self.assertIsNone(new_table.get_preferred('10.0.0.1', '::2'))
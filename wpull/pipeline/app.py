@@ -20,8 +20,10 @@ class AppSession(object):
         self.file_log_handler = None
         self.resource_monitor_semaphore = asyncio.BoundedSemaphore(1)
         self.ssl_context = None
+        self.tls_session_cache = None
         self.async_servers = []
         self.background_async_tasks = []
+        self.dns_prefetch_task = None
         self.proxy_server_port = None
         self.plugin_manager = None
         self.root_path = args.directory_prefix
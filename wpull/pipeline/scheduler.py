@@ -0,0 +1,224 @@
+'''Host-aware crawl frontier.'''
+import asyncio
+import collections
+import logging
+import time
+
+from typing import Optional
+
+from wpull.backport.logging import BraceMessage as __
+from wpull.database.base import NotFound
+from wpull.database.threaded import AsyncURLTable
+from wpull.observer import Observer
+from wpull.pipeline.item import URLRecord, Status
+
+_logger = logging.getLogger(__name__)
+
+
+class HostQueue(object):
+    '''Ready URL records and politeness state for a single host.'''
+    def __init__(self, hostname: str):
+        self.hostname = hostname
+        self.records = collections.deque()
+        self.active_count = 0
+        self.next_time = 0.0
+
+
+class HostScheduler(object):
+    '''Crawl frontier that spreads checked out URLs across hosts.
+
+    URL records are checked out from the URL table ahead of time in batches
+    and kept in per-hostname ready queues. Hosts are handed out in round-robin order
+    preferring the hosts with the fewest URLs in progress. The wait time
+    between requests is tracked per host instead of delaying a worker.
+
+    Args:
+        url_table: The URL table coroutine interface.
+        max_ready: The maximum number of URL records held in the ready
+            queues. The queues are refilled once they are half empty.
+        max_host_active: If given, the maximum number of URLs in progress
+            for a single host.
+        clock: A function that returns the current time in seconds.
+
+    Attributes:
+        check_in_observer: Observer called with the URL record after
+            :meth:`check_in`.
+        new_host_observer: Observer called with the first URL record of a
+            host that was not held in the ready queues.
+    '''
+    def __init__(self, url_table: AsyncURLTable, max_ready: int=100,
+                 max_host_active: Optional[int]=None,
+                 clock=time.monotonic):
+        assert max_ready > 0, max_ready
+        self._url_table = url_table
+        self._max_ready = max_ready
+        self._max_host_active = max_host_active
+        self._clock = clock
+        self._host_queues = collections.OrderedDict()
+        self._checked_out = {}
+        self._ready_count = 0
+        self.check_in_observer = Observer()
+        self.new_host_observer = Observer()
+
+    @property
+    def ready_count(self) -> int:
+        '''Return the number of URL records held in the ready queues.'''
+        return self._ready_count
+
+    @property
+    def active_count(self) -> int:
+        '''Return the number of URL records handed out and not checked in.'''
+        return len(self._checked_out)
+
+    @asyncio.coroutine
+    def check_out(self) -> URLRecord:
+        '''Return a URL record for a host that is eligible now.
+
+        Raises:
+            NotFound: No URL record is eligible at this time. Use
+                :meth:`get_wait_time` to find out when to try again.
+
+        Coroutine.
+        '''
+        if self._ready_count <= self._max_ready // 2:
+            yield from self._fill()
+
+        host_queue = self._select_host()
+
+        if not host_queue and self._ready_count < self._max_ready:
+            yield from self._fill()
+            host_queue = self._select_host()
+
+        if not host_queue:
+            raise NotFound()
+
+        url_record, original_status = host_queue.records.popleft()
+        self._ready_count -= 1
+        host_queue.active_count += 1
+        self._host_queues.move_to_end(host_queue.hostname)
+        self._checked_out[url_record.url] = (host_queue, original_status)
+
+        return url_record
+
+    def check_in(self, url_record: URLRecord, wait_time: Optional[float]=None):
+        '''Mark a URL record returned by :meth:`check_out` as finished.
+
+        Args:
+            url_record: The URL record.
+            wait_time: The time in seconds before the host is eligible again.
+        '''
+        try:
+            host_queue = self._checked_out.pop(url_record.url)[0]
+        except KeyError:
+            return
+
+        host_queue.active_count -= 1
+
+        if wait_time:
+            host_queue.next_time = max(
+                host_queue.next_time, self._clock() + wait_time)
+
+        self._remove_if_idle(host_queue)
+        self.check_in_observer.notify(url_record)
+
+    def get_wait_time(self) -> Optional[float]:
+        '''Return the time in seconds until a held host becomes eligible.
+
+        Returns:
+            The time in seconds, or None if no host is waiting on a
+            timer. In the latter case, the frontier is either empty or
+            waiting for URLs in progress to be checked in.
+        '''
+        now = self._clock()
+        wait_times = [
+            max(0.0, host_queue.next_time - now)
+            for host_queue in self._host_queues.values()
+            if host_queue.records and self._is_under_active_limit(host_queue)
+        ]
+
+        if wait_times:
+            return min(wait_times)
+
+    @asyncio.coroutine
+    def release(self):
+        '''Return any held URL records back to the URL table.
+
+        Coroutine.
+        '''
+        for host_queue in self._host_queues.values():
+            for url_record, original_status in host_queue.records:
+                yield from self._url_table.check_in(
+                    url_record.url, original_status,
+                    increment_try_count=False
+                )
+
+            host_queue.records.clear()
+
+        self._ready_count = 0
+        self._host_queues.clear()
+
+    @asyncio.coroutine
+    def _fill(self):
+        '''Check out a batch of URL records into the ready queues.'''
+        count = self._max_ready - self._ready_count
+        url_records = yield from self._url_table.check_out_many(
+            Status.todo, count)
+        original_status = Status.todo
+
+        if not url_records and not self._ready_count:
+            url_records = yield from self._url_table.check_out_many(
+                Status.error, count)
+            original_status = Status.error
+
+        for url_record in url_records:
+            self._add_ready(url_record, original_status)
+
+    def _add_ready(self, url_record: URLRecord, original_status: Status):
+        hostname = url_record.url_info.hostname
+        host_queue = self._host_queues.get(hostname)
+
+        if not host_queue:
+            host_queue = self._host_queues[hostname] = HostQueue(hostname)
+            is_new_host = True
+        else:
+            is_new_host = False
+
+        host_queue.records.append((url_record, original_status))
+        self._ready_count += 1
+
+        if is_new_host:
+            self.new_host_observer.notify(url_record)
+
+    def _select_host(self) -> Optional[HostQueue]:
+        '''Return the least busy eligible host in round-robin order.'''
+        now = self._clock()
+        best_host_queue = None
+
+        for host_queue in tuple(self._host_queues.values()):
+            if not host_queue.records:
+                self._remove_if_idle(host_queue)
+                continue
+
+            if host_queue.next_time > now or \
+                    not self._is_under_active_limit(host_queue):
+                continue
+
+            if not best_host_queue or \
+                    host_queue.active_count < best_host_queue.active_count:
+                best_host_queue = host_queue
+
+                if not host_queue.active_count:
+                    break
+
+        return best_host_queue
+
+    def _is_under_active_limit(self, host_queue: HostQueue) -> bool:
+        return not self._max_host_active or \
+            host_queue.active_count < self._max_host_active
+
+    def _remove_if_idle(self, host_queue: HostQueue):
+        '''Forget the host if there is nothing more to track for it.'''
+        if not host_queue.records and not host_queue.active_count and \
+                host_queue.next_time <= self._clock():
+            _logger.debug(__('Host queue {} idle.', host_queue.hostname))
+            self._host_queues.pop(host_queue.hostname, None)
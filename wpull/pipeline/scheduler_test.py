@@ -0,0 +1,102 @@
+from wpull.database.base import NotFound, AddURLInfo
+from wpull.database.sqltable import SQLiteURLTable
+from wpull.database.threaded import AsyncURLTable
+from wpull.pipeline.item import Status
+from wpull.pipeline.scheduler import HostScheduler
+from wpull.testing.async import AsyncTestCase
+import wpull.testing.async
+
+
+class MockClock(object):
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
+
+
+class TestScheduler(AsyncTestCase):
+    def get_url_table(self):
+        url_table = SQLiteURLTable(':memory:')
+        url_table.add_many([
+            AddURLInfo(url, None, None) for url in (
+                'http://example.com/1',
+                'http://example.com/2',
+                'http://example.com/3',
+                'http://example.net/1',
+                'http://example.org/1',
+            )
+        ])
+        return url_table
+
+    @wpull.testing.async.async_test()
+    def test_round_robin_hosts(self):
+        scheduler = HostScheduler(AsyncURLTable(self.get_url_table()))
+        hostnames = []
+
+        for dummy in range(3):
+            url_record = yield from scheduler.check_out()
+            hostnames.append(url_record.url_info.hostname)
+
+        self.assertEqual(
+            {'example.com', 'example.net', 'example.org'}, set(hostnames))
+        self.assertEqual(2, scheduler.ready_count)
+        self.assertEqual(3, scheduler.active_count)
+
+    @wpull.testing.async.async_test()
+    def test_new_host_observer(self):
+        scheduler = HostScheduler(AsyncURLTable(self.get_url_table()))
+        hostnames = []
+
+        scheduler.new_host_observer.add(
+            lambda url_record: hostnames.append(url_record.url_info.hostname))
+
+        yield from scheduler.check_out()
+
+        self.assertEqual(
+            ['example.com', 'example.net', 'example.org'], sorted(hostnames))
+
+    @wpull.testing.async.async_test()
+    def test_host_wait_time(self):
+        clock = MockClock()
+        scheduler = HostScheduler(
+            AsyncURLTable(self.get_url_table()),
+            max_host_active=1, clock=clock)
+        url_records = []
+
+        for dummy in range(3):
+            url_records.append((yield from scheduler.check_out()))
+
+        with self.assertRaises(NotFound):
+            yield from scheduler.check_out()
+
+        self.assertIsNone(scheduler.get_wait_time())
+
+        for url_record in url_records:
+            scheduler.check_in(url_record, wait_time=5)
+
+        self.assertAlmostEqual(5, scheduler.get_wait_time())
+
+        with self.assertRaises(NotFound):
+            yield from scheduler.check_out()
+
+        clock.time = 5
+        url_record = yield from scheduler.check_out()
+
+        self.assertEqual('example.com', url_record.url_info.hostname)
+
+    @wpull.testing.async.async_test()
+    def test_release(self):
+        url_table = self.get_url_table()
+        scheduler = HostScheduler(AsyncURLTable(url_table))
+
+        url_record = yield from scheduler.check_out()
+        yield from scheduler.release()
+
+        self.assertEqual(0, scheduler.ready_count)
+        self.assertEqual(
+            Status.in_progress, url_table.get_one(url_record.url).status)
+
+        for other_url_record in url_table.get_all():
+            if other_url_record.url != url_record.url:
+                self.assertEqual(Status.todo, other_url_record.status)
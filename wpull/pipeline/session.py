@@ -26,6 +26,8 @@ class ItemSession(object):
         self._processed = False
         self._try_count_incremented = False
         self._add_url_batch = []
+        self._pending_writes = []
+        self._wait_time = None
 
         self._request = None
         self._response = None
@@ -39,6 +41,16 @@ class ItemSession(object):
         '''Return whether the item has been processed.'''
         return self._processed
 
+    @property
+    def wait_time(self) -> Optional[float]:
+        '''Return the time in seconds to wait before the host is contacted
+        again.'''
+        return self._wait_time
+
+    @wait_time.setter
+    def wait_time(self, wait_time: Optional[float]):
+        self._wait_time = wait_time
+
     @property
     def request(self) -> BaseRequest:
         return self._request
@@ -55,10 +67,25 @@ class ItemSession(object):
     def response(self, response: BaseResponse):
         self._response = response
 
+    def _write(self, name: str, *args, **kwargs):
+        '''Change the URL table without waiting.
+
+        If the asynchronous URL table is available, the operation is waited
+        on and any error is raised by :meth:`finish`.
+        '''
+        async_url_table = self.app_session.factory.get('AsyncURLTable')
+
+        if async_url_table:
+            self._pending_writes.append(
+                getattr(async_url_table, name)(*args, **kwargs))
+        else:
+            getattr(self.app_session.factory['URLTable'], name)(
+                *args, **kwargs)
+
     def skip(self):
         '''Mark the item as processed without download.'''
         _logger.debug(__(_('Skipping ‘{url}’.'), url=self.url_record.url))
-        self.app_session.factory['URLTable'].check_in(self.url_record.url, Status.skipped)
+        self._write('check_in', self.url_record.url, Status.skipped)
 
         self._processed = True
 
@@ -82,7 +109,8 @@ class ItemSession(object):
         url_result = URLResult()
         url_result.filename = filename
 
-        self.app_session.factory['URLTable'].check_in(
+        self._write(
+            'check_in',
             url,
             status,
             increment_try_count=increment_try_count,
@@ -93,10 +121,35 @@ class ItemSession(object):
 
     def add_url(self, url: str, url_properites: Optional[URLProperties]=None,
                 url_data: Optional[URLData]=None):
+        self._add_url(url, url_properites, url_data)
+
+    def _add_url(self, url: str, url_properites: Optional[URLProperties]=None,
+                 url_data: Optional[URLData]=None, check_seen: bool=True):
+        seen_url_filter = self.app_session.factory.get('SeenURLFilter')
+
+        # Hits are not trusted once the filter is over capacity because
+        # false positives would silently drop new URLs
+        if seen_url_filter is not None and seen_url_filter.saturated:
+            seen_url_filter = None
+
+        if check_seen and seen_url_filter is not None and \
+                url in seen_url_filter:
+            return
+
         url_info = parse_url_or_log(url)
         if not url_info:
             return
 
+        if seen_url_filter is not None:
+            seen_url_filter.add(url)
+
+            if seen_url_filter.saturated:
+                _logger.warning(__(
+                    _('Seen URL filter is full after {count} URLs. '
+                      'Links are no longer skipped by the filter.'),
+                    count=seen_url_filter.capacity
+                ))
+
         url_properties = url_properites or URLProperties()
         url_data = url_data or URLData()
         add_url_info = AddURLInfo(url, url_properties, url_data)
@@ -104,7 +157,7 @@ class ItemSession(object):
         self._add_url_batch.append(add_url_info)
 
         if len(self._add_url_batch) >= 1000:
-            self.app_session.factory['URLTable'].add_many(self._add_url_batch)
+            self._write('add_many', tuple(self._add_url_batch))
             self._add_url_batch.clear()
 
     def add_child_url(self, url: str, inline: bool=False,
@@ -143,9 +196,9 @@ class ItemSession(object):
         url_data.post_data = post_data
 
         if replace:
-            self.app_session.factory['URLTable'].remove_many([url])
+            self._write('remove_many', [url])
 
-        self.add_url(url, url_properties, url_data)
+        self._add_url(url, url_properties, url_data, check_seen=not replace)
 
     def child_url_record(self, url: str, inline: bool=False,
                          link_type: Optional[LinkType]=None,
@@ -168,12 +221,32 @@ class ItemSession(object):
 
         return url_record
 
+    @asyncio.coroutine
     def finish(self):
-        self.app_session.factory['URLTable'].add_many(self._add_url_batch)
-        self._add_url_batch.clear()
+        '''Add the remaining child URLs and return the item to the scheduler.
+
+        Any error from a change made to the URL table by this item is
+        raised here.
+
+        Coroutine.
+        '''
+        if self._add_url_batch:
+            self._write('add_many', tuple(self._add_url_batch))
+            self._add_url_batch.clear()
+
+        pending_writes = self._pending_writes
+        self._pending_writes = []
+
+        for future in pending_writes:
+            yield from future
+
+        host_scheduler = self.app_session.factory.get('HostScheduler')
+
+        if host_scheduler:
+            host_scheduler.check_in(self.url_record, self._wait_time)
 
     def update_record_value(self, **kwargs):
-        self.app_session.factory['URLTable'].update_one(self.url_record.url, **kwargs)
+        self._write('update_one', self.url_record.url, **kwargs)
         for key, value in kwargs.items():
             setattr(self.url_record, key, value)
 
@@ -181,16 +254,69 @@ class ItemSession(object):
 class URLItemSource(ItemSource[ItemSession]):
     def __init__(self, app_session: AppSession):
         self._app_session = app_session
+        self._check_in_event = asyncio.Event()
+        self._host_scheduler = None
 
     @asyncio.coroutine
     def get_item(self) -> Optional[ItemSession]:
-        try:
-            url_record = self._app_session.factory['URLTable'].check_out(Status.todo)
-        except NotFound:
+        host_scheduler = self._get_host_scheduler()
+
+        if not host_scheduler:
+            url_record = yield from self._check_out_from_table()
+
+            if not url_record:
+                return None
+
+            return ItemSession(self._app_session, url_record)
+
+        while True:
             try:
-                url_record = self._app_session.factory['URLTable'].check_out(Status.error)
+                url_record = yield from host_scheduler.check_out()
             except NotFound:
+                pass
+            else:
+                return ItemSession(self._app_session, url_record)
+
+            wait_time = host_scheduler.get_wait_time()
+
+            if wait_time is None:
+                # Either the frontier is empty or hosts are waiting on
+                # items in progress. The producer will retry when a worker
+                # has finished.
                 return None
 
-        item_session = ItemSession(self._app_session, url_record)
-        return item_session
+            _logger.debug(__('Waiting {} seconds for eligible host.', wait_time))
+            self._check_in_event.clear()
+
+            try:
+                yield from asyncio.wait_for(
+                    self._check_in_event.wait(), wait_time)
+            except asyncio.TimeoutError:
+                pass
+
+    def _get_host_scheduler(self):
+        if not self._host_scheduler:
+            self._host_scheduler = self._app_session.factory.get('HostScheduler')
+
+            if self._host_scheduler:
+                self._host_scheduler.check_in_observer.add(
+                    self._check_in_callback)
+
+        return self._host_scheduler
+
+    def _check_in_callback(self, url_record: URLRecord):
+        self._check_in_event.set()
+
+    @asyncio.coroutine
+    def _check_out_from_table(self) -> Optional[URLRecord]:
+        async_url_table = self._app_session.factory.get('AsyncURLTable')
+
+        for status in (Status.todo, Status.error):
+            try:
+                if async_url_table:
+                    return (yield from async_url_table.check_out(status))
+                else:
+                    return self._app_session.factory['URLTable'].check_out(
+                        status)
+            except NotFound:
+                pass
@@ -1,3 +1,5 @@
+import asyncio
+import functools
 import gettext
 import logging
 from http.cookiejar import CookieJar
@@ -7,7 +9,6 @@ from typing import Optional, cast
 import wpull.string
 from wpull.application.hook import Actions
 from wpull.backport.logging import BraceMessage as __
-from wpull.database.base import BaseURLTable
 from wpull.pipeline.app import AppSession
 from wpull.pipeline.item import URLRecord, Status
 from wpull.pipeline.session import ItemSession
@@ -31,6 +32,25 @@ class ProxyItemSession(ItemSession):
         self._processed = True
         self.set_status(Status.skipped)
 
+    def _write(self, name: str, *args, **kwargs):
+        '''Change the URL table without waiting.
+
+        Proxy items are never finished, so errors are logged instead.
+        '''
+        super()._write(name, *args, **kwargs)
+
+        for future in self._pending_writes:
+            future.add_done_callback(
+                functools.partial(self._write_done_callback, name))
+
+        self._pending_writes.clear()
+
+    @classmethod
+    def _write_done_callback(cls, name: str, future: asyncio.Future):
+        if not future.cancelled() and future.exception():
+            _logger.error('Database operation %s failed.', name,
+                          exc_info=future.exception())
+
 
 class ProxyCoprocessor(object):
     '''Proxy coprocessor.'''
@@ -102,10 +122,11 @@ class ProxyCoprocessorSession(object):
         return url_record
 
     def _new_item_session(self, request: Request) -> ProxyItemSession:
-        url_table = cast(BaseURLTable, self._app_session.factory['URLTable'])
-        url_table.add_one(request.url_info.url)
+        item_session = ProxyItemSession(
+            self._app_session, self._new_url_record(request))
+        item_session._write('add_one', request.url_info.url)
 
-        return ProxyItemSession(self._app_session, self._new_url_record(request))
+        return item_session
 
     def _client_request_callback(self, request: Request):
         '''Request callback handler.'''
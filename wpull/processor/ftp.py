@@ -148,11 +148,7 @@ class FTPProcessorSession(BaseProcessorSession):
 
             self._file_writer_session.process_request(request)
 
-        wait_time = yield from self._fetch(request, is_file)
-
-        if wait_time:
-            _logger.debug('Sleeping {0}.', wait_time)
-            yield from asyncio.sleep(wait_time)
+        self._item_session.wait_time = yield from self._fetch(request, is_file)
 
     def _add_request_password(self, request: Request):
         if self._fetch_rule.ftp_login:
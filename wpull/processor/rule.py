@@ -9,9 +9,11 @@ import wpull.url
 from wpull.application.plugin import PluginFunctions, hook_interface, \
     event_interface
 from wpull.scraper.base import DemuxDocumentScraper, BaseScraper, ScrapeResult
+from wpull.scraper.executor import ScrapeExecutor
 from wpull.stats import Statistics
 from wpull.url import URLInfo
 from wpull.backport.logging import StyleAdapter
+from wpull.collections import BloomFilter
 from wpull.errors import DNSNotFound, ServerError, ConnectionRefused, \
     SSLVerificationError, ProtocolError
 from wpull.application.hook import HookableMixin, HookDisconnected, Actions, HookStop
@@ -477,17 +479,25 @@ class ProcessingRule(HookableMixin):
         fetch_rule: The FetchRule instance.
         document_scraper: The document
             scraper.
+        seen_url_filter: If given, a filter of URLs already added to the
+            URL table. Scraped links found in the filter are skipped.
+        scrape_executor: If given, used by :meth:`scrape_document_in_executor`
+            to scrape documents in worker processes.
     '''
     def __init__(self, fetch_rule: FetchRule,
                  document_scraper: DemuxDocumentScraper=None,
                  sitemaps: bool=False,
-                 url_rewriter: URLRewriter=None):
+                 url_rewriter: URLRewriter=None,
+                 seen_url_filter: Optional[BloomFilter]=None,
+                 scrape_executor: Optional[ScrapeExecutor]=None):
         super().__init__()
 
         self._fetch_rule = fetch_rule
         self._document_scraper = document_scraper
         self._sitemaps = sitemaps
         self._url_rewriter = url_rewriter
+        self._seen_url_filter = seen_url_filter
+        self._scrape_executor = scrape_executor
 
         self.event_dispatcher.register(PluginFunctions.get_urls)
 
@@ -527,6 +537,38 @@ class ProcessingRule(HookableMixin):
             item_session.url_record.link_type
         )
 
+        self._process_demux_info(demux_info, item_session)
+
+    @asyncio.coroutine
+    def scrape_document_in_executor(self, item_session: ItemSession):
+        '''Process document for links using the scrape executor.
+
+        The event loop is not blocked while the document is scraped by
+        a worker process.
+
+        Coroutine.
+        '''
+        if not self._scrape_executor:
+            self.scrape_document(item_session)
+            return
+
+        self.event_dispatcher.notify(
+            PluginFunctions.get_urls, item_session
+        )
+
+        if not self._document_scraper:
+            return
+
+        demux_info = yield from self._scrape_executor.scrape_info(
+            item_session.request, item_session.response,
+            item_session.url_record.link_type
+        )
+
+        self._process_demux_info(demux_info, item_session)
+
+    def _process_demux_info(self, demux_info: dict,
+                            item_session: ItemSession):
+        '''Collect the URLs from the results of every scraper.'''
         num_inline_urls = 0
         num_linked_urls = 0
 
@@ -568,6 +610,11 @@ class ProcessingRule(HookableMixin):
 
             url_info = self.rewrite_url(url_info)
 
+            if self._seen_url_filter is not None and \
+                    not self._seen_url_filter.saturated and \
+                    url_info.url in self._seen_url_filter:
+                continue
+
             child_url_record = item_session.child_url_record(
                 url_info.url, inline=link_context.inline
             )
@@ -207,14 +207,10 @@ class WebProcessorSession(BaseProcessorSession):
             )
             self._result_rule.handle_error(self._item_session, error)
 
-            wait_time = self._result_rule.get_wait_time(
+            self._item_session.wait_time = self._result_rule.get_wait_time(
                 self._item_session, error=error
             )
 
-            if wait_time:
-                _logger.debug('Sleeping {0}.', wait_time)
-                yield from asyncio.sleep(wait_time)
-
             return False
         else:
             _logger.debug('Robots filter verdict {} reason {}', verdict, reason)
@@ -244,13 +240,15 @@ class WebProcessorSession(BaseProcessorSession):
 
             exit_early, wait_time = yield from self._fetch_one(cast(Request, self._item_session.request))
 
+            if exit_early or self._web_client_session.done():
+                # The wait before the next item is handled by the scheduler
+                self._item_session.wait_time = wait_time
+                break
+
             if wait_time:
                 _logger.debug('Sleeping {}', wait_time)
                 yield from asyncio.sleep(wait_time)
 
-            if exit_early:
-                break
-
     @asyncio.coroutine
     def _fetch_one(self, request: Request) -> Tuple[bool, float]:
         '''Process one of the loop iteration.
@@ -306,7 +304,7 @@ class WebProcessorSession(BaseProcessorSession):
             return True, wait_time
         else:
             self._log_response(request, response)
-            action = self._handle_response(request, response)
+            action = yield from self._handle_response(request, response)
             wait_time = self._result_rule.get_wait_time(self._item_session)
 
             yield from self._run_coprocessors(request, response)
@@ -402,9 +400,12 @@ class WebProcessorSession(BaseProcessorSession):
                 response.fields.get('Content-Type', _('unspecified'))),
         )
 
+    @asyncio.coroutine
     def _handle_response(self, request: Request, response: Response) -> Actions:
         '''Process the response.
 
+        Coroutine.
+
         Returns:
             A value from :class:`.hook.Actions`.
         '''
@@ -421,7 +422,8 @@ class WebProcessorSession(BaseProcessorSession):
               or self._processor.fetch_params.content_on_error):
             filename = self._file_writer_session.save_document(response)
 
-            self._processing_rule.scrape_document(self._item_session)
+            yield from self._processing_rule.scrape_document_in_executor(
+                self._item_session)
 
             return self._result_rule.handle_document(
                 self._item_session, filename
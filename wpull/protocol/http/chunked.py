@@ -19,13 +19,23 @@ class ChunkedTransferReader(object):
 
     Args:
         connection (:class:`.connection.Connection`): Established connection.
+        read_size (int): The maximum size of a chunk body fragment.
+
+    Attributes:
+        read_size (int): The maximum size of a chunk body fragment. It can be
+            changed between reads.
     '''
     def __init__(self, connection, read_size=4096):
         self._connection = connection
-        self._read_size = read_size
+        self.read_size = read_size
         self._chunk_size = None
         self._bytes_left = None
 
+    @property
+    def bytes_left(self) -> int:
+        '''Return the number of bytes left to read in the current chunk.'''
+        return self._bytes_left or 0
+
     @asyncio.coroutine
     def read_chunk_header(self):
         '''Read a single chunk's header.
@@ -79,7 +89,7 @@ class ChunkedTransferReader(object):
         #                 chunk_size, bytes_left))
 
         if bytes_left > 0:
-            size = min(bytes_left, self._read_size)
+            size = min(bytes_left, self.read_size)
             data = yield from self._connection.read(size)
 
             self._bytes_left -= len(data)
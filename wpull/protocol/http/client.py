@@ -14,14 +14,22 @@ from wpull.application.hook import HookableMixin
 from wpull.protocol.abstract.client import BaseClient, BaseSession, DurationTimeout
 from wpull.backport.logging import BraceMessage as __
 from wpull.body import Body
+from wpull.errors import NetworkError, ProtocolError
+from wpull.protocol.http.pipeline import PipelineTable, PipelineClosed
 from wpull.protocol.http.request import Request, Response
 from wpull.protocol.http.stream import Stream
+from wpull.protocol.http2.connection import HTTP2ConnectionTable, \
+    HTTP2Stream, is_http2_connection
 
 
 _ = gettext.gettext
 _logger = logging.getLogger(__name__)
 
 
+HTTP2_MAX_STREAMS = 100
+'''Maximum number of sessions sharing a HTTP/2 connection.'''
+
+
 class SessionState(enum.Enum):
     ready = 'ready'
     request_sent = 'request_sent'
@@ -30,7 +38,16 @@ class SessionState(enum.Enum):
 
 
 class Session(BaseSession):
-    '''HTTP request and response session.'''
+    '''HTTP request and response session.
+
+    Args:
+        stream_factory: A function that returns a :class:`.stream.Stream`.
+        pipeline_depth: If greater than 1, idempotent requests may be
+            pipelined with other sessions on a keep-alive connection.
+        pipeline_table: Pipelines shared with other sessions.
+        http2_table: If provided, HTTP/2 connections shared with other
+            sessions are used when negotiated.
+    '''
 
     class Event(enum.Enum):
         begin_request = 'begin_request'
@@ -40,11 +57,19 @@ class Session(BaseSession):
         response_data = 'response_data'
         end_response = 'end_response'
 
-    def __init__(self, stream_factory: Callable[..., Stream]=None, **kwargs):
+    def __init__(self, stream_factory: Callable[..., Stream]=None,
+                 pipeline_depth: int=1,
+                 pipeline_table: Optional[PipelineTable]=None,
+                 http2_table: Optional[HTTP2ConnectionTable]=None, **kwargs):
         super().__init__(**kwargs)
 
         assert stream_factory
         self._stream_factory = stream_factory
+        self._pipeline_depth = pipeline_depth
+        self._pipeline_table = pipeline_table
+        self._pipeline = None
+        self._pipeline_ticket = None
+        self._http2_table = http2_table
         self._stream = None
         self._request = None
         self._response = None
@@ -79,12 +104,25 @@ class Session(BaseSession):
         self._request = request
         _logger.debug(__('Client fetch request {0}.', request))
 
-        connection = yield from self._acquire_request_connection(request)
-        full_url = connection.proxied and not connection.tunneled
+        if self._can_pipeline(request):
+            response = yield from self._start_pipelined(request)
 
-        self._stream = stream = self._stream_factory(connection)
+            if response:
+                return response
+
+        if self._can_multiplex(request):
+            connection = yield from self._connection_pool.acquire(
+                *self._host_key(request), pipeline_depth=HTTP2_MAX_STREAMS)
+            self._connections.add(connection)
+            shared = True
+        else:
+            connection = yield from self._acquire_request_connection(request)
+            shared = False
+
+        full_url = connection.proxied and not connection.tunneled
 
-        yield from self._stream.reconnect()
+        self._stream = stream = \
+            yield from self._new_stream(request, connection, shared)
 
         request.address = connection.address
 
@@ -114,6 +152,174 @@ class Session(BaseSession):
 
         return response
 
+    @asyncio.coroutine
+    def _new_stream(self, request: Request, connection, shared: bool) \
+            -> Stream:
+        '''Connect if needed and return a stream for the connection.
+
+        Coroutine.
+        '''
+        if self._http2_table:
+            http2_connection = self._http2_table.get(connection)
+
+            if http2_connection:
+                return http2_connection.new_stream()
+
+        stream = self._stream_factory(connection)
+
+        yield from stream.reconnect()
+
+        if self._http2_table and is_http2_connection(connection):
+            http2_connection = yield from self._http2_table.new(connection)
+
+            if shared:
+                yield from self._connection_pool.notify_pipelined(connection)
+
+            return http2_connection.new_stream()
+
+        if shared:
+            _logger.debug(__(
+                'HTTP/2 not negotiated for {0}.', self._host_key(request)))
+            self._connection_pool.set_exclusive(connection)
+            self._http2_table.disable(self._host_key(request))
+            yield from self._connection_pool.notify_pipelined(connection)
+
+        return stream
+
+    def _can_multiplex(self, request: Request) -> bool:
+        '''Return whether the request can share a HTTP/2 connection.'''
+        return (
+            self._http2_table and
+            request.url_info.scheme == 'https' and
+            not hasattr(self._connection_pool, 'acquire_proxy') and
+            self._http2_table.enabled(self._host_key(request))
+        )
+
+    def _can_pipeline(self, request: Request) -> bool:
+        '''Return whether the request can be pipelined.'''
+        return (
+            self._pipeline_depth > 1 and
+            self._pipeline_table and
+            request.method.upper() in ('GET', 'HEAD') and
+            not request.body and
+            not hasattr(self._connection_pool, 'acquire_proxy') and
+            not self._can_multiplex(request) and
+            self._pipeline_table.enabled(self._host_key(request))
+        )
+
+    @classmethod
+    def _host_key(cls, request: Request) -> tuple:
+        return (
+            request.url_info.hostname,
+            request.url_info.port,
+            request.url_info.scheme == 'https'
+        )
+
+    @asyncio.coroutine
+    def _start_pipelined(self, request: Request) -> Optional[Response]:
+        '''Send the request on a shared connection and read the header.
+
+        The events are held back until the response header is read so the
+        request can be sent again without pipelining if the pipeline
+        closes. In that case, None is returned. A server that closes the
+        connection while requests are queued may discard the response
+        to the first request too, so it is sent again as well.
+
+        Coroutine.
+        '''
+        key = self._host_key(request)
+        connection = yield from self._connection_pool.acquire(
+            key[0], key[1], key[2], pipeline_depth=self._pipeline_depth)
+        self._connections.add(connection)
+
+        pipeline = self._pipeline_table.get(connection)
+
+        if pipeline.busy() and connection.closed():
+            # Only the first request in line may reconnect.
+            self._leave_pipeline(connection)
+            return
+
+        self._stream = stream = self._stream_factory(connection)
+        stream.pipelined = True
+
+        yield from stream.reconnect()
+
+        request.address = connection.address
+
+        self._pipeline = pipeline
+        self._pipeline_ticket = ticket = pipeline.new_ticket()
+        first_in_line = ticket.done()
+
+        request_data = []
+        response_data = []
+        write_callback = functools.partial(list.append, request_data)
+        read_callback = functools.partial(list.append, response_data)
+
+        stream.data_event_dispatcher.add_write_listener(write_callback)
+        yield from stream.write_request(request)
+        stream.data_event_dispatcher.remove_write_listener(write_callback)
+
+        stream.data_event_dispatcher.add_read_listener(read_callback)
+
+        if first_in_line:
+            yield from self._connection_pool.notify_pipelined(connection)
+
+        try:
+            yield from ticket
+            self._response = response = yield from stream.read_response()
+        except (NetworkError, ProtocolError) as error:
+            stream.data_event_dispatcher.remove_read_listener(read_callback)
+
+            if first_in_line and not pipeline.shared():
+                self._notify_request(request, request_data, response_data)
+                raise
+
+            _logger.debug(__('Pipelined request failed: {0}', error))
+
+            pipeline.close(misbehaved=not isinstance(error, PipelineClosed))
+
+            if pipeline.misbehaved:
+                _logger.debug(__('Disable pipelining for {0}.', key))
+                self._pipeline_table.disable(key)
+
+            self._leave_pipeline(connection)
+
+            return
+
+        stream.data_event_dispatcher.remove_read_listener(read_callback)
+        self._notify_request(request, request_data, response_data)
+
+        read_callback = functools.partial(self.event_dispatcher.notify, self.Event.response_data)
+        stream.data_event_dispatcher.add_read_listener(read_callback)
+
+        response.request = request
+
+        self.event_dispatcher.notify(self.Event.begin_response, response)
+
+        self._session_state = SessionState.request_sent
+
+        return response
+
+    def _leave_pipeline(self, connection):
+        '''Give back the connection to send the request serially.'''
+        self._pipeline = self._pipeline_ticket = None
+        self._stream = None
+        self._connections.remove(connection)
+        self._connection_pool.no_wait_release(connection)
+
+    def _notify_request(self, request: Request, request_data: list,
+                        response_data: list):
+        '''Send the held back events of a pipelined request.'''
+        self.event_dispatcher.notify(self.Event.begin_request, request)
+
+        for data in request_data:
+            self.event_dispatcher.notify(self.Event.request_data, data)
+
+        self.event_dispatcher.notify(self.Event.end_request, request)
+
+        for data in response_data:
+            self.event_dispatcher.notify(self.Event.response_data, data)
+
     @asyncio.coroutine
     def download(
             self,
@@ -175,13 +381,32 @@ class Session(BaseSession):
         return self._session_state == SessionState.response_received
 
     def abort(self):
-        super().abort()
+        if self._pipeline:
+            self._pipeline.close()
+            self._pipeline = self._pipeline_ticket = None
+
+        self._abort_connections()
 
         self._session_state = SessionState.aborted
 
+    def _abort_connections(self):
+        '''Close the connections or only the stream if it is shared.'''
+        if isinstance(self._stream, HTTP2Stream):
+            self._stream.close()
+        else:
+            super().abort()
+
     def recycle(self):
+        if self._pipeline:
+            if self.done() and not self._stream.closed():
+                self._pipeline.finish(self._pipeline_ticket)
+            else:
+                self._pipeline.close()
+
+            self._pipeline = self._pipeline_ticket = None
+
         if not self.done():
-            super().abort()
+            self._abort_connections()
             warnings.warn(_('HTTP session did not complete.'))
 
         super().recycle()
@@ -191,13 +416,32 @@ class Client(BaseClient):
     '''Stateless HTTP/1.1 client.
 
     The session object is :class:`Session`.
+
+    Args:
+        stream_factory: A function that returns a :class:`.stream.Stream`.
+        pipeline_depth: If greater than 1, up to this many idempotent
+            requests to the same host are sent on a keep-alive connection
+            without waiting for the responses. Pipelining is turned off for
+            hosts that do not handle it.
+        http2: If True, HTTP/2 is used on connections that negotiated it
+            and HTTPS requests to the same host share a connection. The SSL
+            context must offer HTTP/2 with ALPN.
     '''
-    def __init__(self, *args, stream_factory=Stream, **kwargs):
+    def __init__(self, *args, stream_factory=Stream, pipeline_depth: int=1,
+                 http2: bool=False, **kwargs):
         super().__init__(*args, **kwargs)
         self._stream_factory = stream_factory
+        self._pipeline_depth = pipeline_depth
+        self._pipeline_table = PipelineTable()
+        self._http2_table = HTTP2ConnectionTable() if http2 else None
 
     def _session_class(self) -> Callable[[], Session]:
-        return functools.partial(Session, stream_factory=self._stream_factory)
+        return functools.partial(
+            Session, stream_factory=self._stream_factory,
+            pipeline_depth=self._pipeline_depth,
+            pipeline_table=self._pipeline_table,
+            http2_table=self._http2_table
+        )
 
     def session(self) -> Session:
         return super().session()
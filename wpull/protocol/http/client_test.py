@@ -1,4 +1,5 @@
 # encoding=utf-8
+import asyncio
 import functools
 import io
 import warnings
@@ -108,3 +109,41 @@ class TestClient(BadAppTestCase):
                 request = Request(self.get_url('/'))
                 yield from session.start(request)
                 raise MyException('Oops')
+
+    @wpull.testing.async.async_test()
+    def test_pipelining(self):
+        connection_pool = ConnectionPool()
+        client = Client(connection_pool=connection_pool, pipeline_depth=3)
+
+        contents = yield from asyncio.gather(*[
+            self._fetch_content(client, '/content_length')
+            for dummy in range(3)
+        ])
+
+        self.assertEqual([b'a' * 100] * 3, contents)
+        self.assertEqual(1, connection_pool.count())
+
+    @wpull.testing.async.async_test()
+    def test_pipelining_fallback(self):
+        connection_pool = ConnectionPool(max_host_count=1)
+        client = Client(connection_pool=connection_pool, pipeline_depth=3)
+
+        contents = yield from asyncio.gather(*[
+            self._fetch_content(client, '/content_length_with_close')
+            for dummy in range(3)
+        ])
+
+        self.assertEqual([b'a' * 100] * 3, contents)
+
+    @asyncio.coroutine
+    def _fetch_content(self, client, path):
+        with client.session() as session:
+            request = Request(self.get_url(path))
+            response = yield from session.start(request)
+
+            self.assertEqual(200, response.status_code)
+
+            file_obj = io.BytesIO()
+            yield from session.download(file_obj)
+
+            return file_obj.getvalue()
@@ -0,0 +1,103 @@
+# encoding=utf-8
+'''HTTP/1.1 request pipelining.'''
+import collections
+import weakref
+
+import asyncio
+
+from wpull.errors import NetworkError
+
+
+class PipelineClosed(NetworkError):
+    '''The pipeline closed before the response could be read.'''
+
+
+class RequestPipeline(object):
+    '''Order of responses for requests pipelined on a connection.
+
+    Each request takes a ticket after it is sent. A ticket completes when
+    the responses of the requests sent before it are read.
+
+    Args:
+        connection: The shared connection.
+
+    Attributes:
+        misbehaved (bool): Whether the server did not handle pipelined
+            requests correctly.
+    '''
+    def __init__(self, connection):
+        self._connection = connection
+        self._tickets = collections.deque()
+        self._closed = False
+        self.misbehaved = False
+
+    def closed(self) -> bool:
+        '''Return whether the pipeline was closed.'''
+        return self._closed
+
+    def busy(self) -> bool:
+        '''Return whether responses are waiting to be read.'''
+        return bool(self._tickets)
+
+    def shared(self) -> bool:
+        '''Return whether more than one request is waiting for a response.'''
+        return len(self._tickets) > 1
+
+    def new_ticket(self) -> asyncio.Future:
+        '''Return a ticket for a request that was just sent.'''
+        assert not self._closed
+
+        ticket = asyncio.Future()
+
+        if not self._tickets:
+            ticket.set_result(None)
+
+        self._tickets.append(ticket)
+
+        return ticket
+
+    def finish(self, ticket: asyncio.Future):
+        '''Hand the connection to the next request.'''
+        assert self._tickets[0] is ticket
+
+        self._tickets.popleft()
+
+        if self._tickets and not self._tickets[0].done():
+            self._tickets[0].set_result(None)
+
+    def close(self, misbehaved: bool=False):
+        '''Close the connection and fail the waiting requests.'''
+        self._closed = True
+        self.misbehaved = self.misbehaved or misbehaved
+        self._connection.close()
+
+        for ticket in self._tickets:
+            if not ticket.done():
+                ticket.set_exception(PipelineClosed('Pipeline closed.'))
+
+        self._tickets.clear()
+
+
+class PipelineTable(object):
+    '''Request pipelines shared by the sessions of a client.'''
+    def __init__(self):
+        self._pipelines = weakref.WeakKeyDictionary()
+        self._serial_keys = set()
+
+    def get(self, connection) -> RequestPipeline:
+        '''Return the pipeline of the connection.'''
+        pipeline = self._pipelines.get(connection)
+
+        if not pipeline or pipeline.closed():
+            pipeline = self._pipelines[connection] = \
+                RequestPipeline(connection)
+
+        return pipeline
+
+    def enabled(self, key) -> bool:
+        '''Return whether pipelining is allowed for the host key.'''
+        return key not in self._serial_keys
+
+    def disable(self, key):
+        '''Use serial requests for the host key from now on.'''
+        self._serial_keys.add(key)
@@ -40,17 +40,28 @@ class Stream(object):
         keep_alive (bool): If True, use HTTP keep-alive.
         ignore_length (bool): If True, Content-Length headers will be ignored.
             When using this option, `keep_alive` should be False.
+        read_size (int): The initial and minimum size of a read.
+        max_read_size (int): The size that reads grow to while the
+            connection keeps filling them.
 
     Attributes:
         connection: The underlying connection.
+        pipelined (bool): If True, responses with a length are read up to
+            their end only so the responses of pipelined requests are left
+            on the connection.
     '''
-    def __init__(self, connection, keep_alive=True, ignore_length=False):
+    def __init__(self, connection, keep_alive=True, ignore_length=False,
+                 read_size=4096, max_read_size=262144):
+        assert 0 < read_size <= max_read_size
         self._connection = connection
         self._keep_alive = keep_alive
         self._ignore_length = ignore_length
         self._data_event_dispatcher = DataEventDispatcher()
-        self._read_size = 4096
+        self._read_size = read_size
+        self._min_read_size = read_size
+        self._max_read_size = max_read_size
         self._decompressor = None
+        self.pipelined = False
 
     @property
     def connection(self):
@@ -221,11 +232,13 @@ class Stream(object):
         file_is_async = hasattr(file, 'drain')
 
         while True:
-            data = yield from self._connection.read(self._read_size)
+            read_size = self._read_size
+            data = yield from self._connection.read(read_size)
 
             if not data:
                 break
 
+            self._adjust_read_size(read_size, len(data))
             self._data_event_dispatcher.notify_read(data)
 
             content_data = self._decompress_data(data)
@@ -271,11 +284,18 @@ class Stream(object):
         bytes_left = body_size
 
         while bytes_left > 0:
-            data = yield from self._connection.read(self._read_size)
+            read_size = self._read_size
+
+            if self.pipelined:
+                # Leave the responses that follow on the connection
+                read_size = min(read_size, bytes_left)
+
+            data = yield from self._connection.read(read_size)
 
             if not data:
                 break
 
+            self._adjust_read_size(read_size, len(data))
             bytes_left -= len(data)
 
             if bytes_left < 0:
@@ -311,7 +331,8 @@ class Stream(object):
 
         Coroutine.
         '''
-        reader = ChunkedTransferReader(self._connection)
+        reader = ChunkedTransferReader(
+            self._connection, read_size=self._read_size)
 
         file_is_async = hasattr(file, 'drain')
 
@@ -326,11 +347,15 @@ class Stream(object):
                 break
 
             while True:
+                read_size = min(reader.read_size, reader.bytes_left)
                 content, data = yield from reader.read_chunk_body()
 
                 self._data_event_dispatcher.notify_read(data)
 
-                if not content:
+                if content:
+                    self._adjust_read_size(read_size, len(content))
+                    reader.read_size = self._read_size
+                else:
                     if raw:
                         file.write(data)
 
@@ -364,6 +389,22 @@ class Stream(object):
 
         response.fields.parse(trailer_data)
 
+    def _adjust_read_size(self, requested_size, data_size):
+        '''Grow or shrink the read size from the last read.
+
+        A read that is completely filled means more data was already
+        waiting so the size is doubled. A read that is less than a quarter
+        filled halves it. Reads cut short by the remaining chunk length are
+        ignored.
+        '''
+        if requested_size < self._read_size:
+            return
+
+        if data_size >= requested_size:
+            self._read_size = min(self._read_size * 2, self._max_read_size)
+        elif data_size < requested_size // 4:
+            self._read_size = max(self._read_size // 2, self._min_read_size)
+
     @classmethod
     def get_read_strategy(cls, response):
         '''Return the appropriate algorithm of reading response.
@@ -529,3 +529,26 @@ class TestSSLStream(SSLBadAppTestCase, StreamTestsMixin):
         request = Request(self.get_url('/'))
 
         yield from self.fetch(stream, request)
+
+
+class TestStreamReadSize(unittest.TestCase):
+    def test_adjust_read_size(self):
+        stream = Stream(None, read_size=1024, max_read_size=4096)
+
+        stream._adjust_read_size(1024, 1024)
+        self.assertEqual(2048, stream._read_size)
+
+        stream._adjust_read_size(2048, 2048)
+        stream._adjust_read_size(4096, 4096)
+        self.assertEqual(4096, stream._read_size)
+
+        stream._adjust_read_size(100, 10)
+        self.assertEqual(4096, stream._read_size)
+
+        stream._adjust_read_size(4096, 2000)
+        self.assertEqual(4096, stream._read_size)
+
+        stream._adjust_read_size(4096, 10)
+        stream._adjust_read_size(2048, 10)
+        stream._adjust_read_size(1024, 10)
+        self.assertEqual(1024, stream._read_size)
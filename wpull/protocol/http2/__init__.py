@@ -0,0 +1,2 @@
+# encoding=utf-8
+'''HTTP/2 Protocol.'''
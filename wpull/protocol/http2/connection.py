@@ -0,0 +1,583 @@
+# encoding=utf-8
+'''HTTP/2 connections and streams.'''
+import gettext
+import http.client
+import logging
+
+import asyncio
+
+from wpull.backport.logging import BraceMessage as __
+from wpull.errors import NetworkError, ProtocolError
+from wpull.protocol.http.request import Request, Response
+from wpull.protocol.http.stream import Stream, is_no_body
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.errors
+    import h2.events
+    import h2.exceptions
+except ImportError:
+    h2 = None
+
+
+_ = gettext.gettext
+_logger = logging.getLogger(__name__)
+
+
+ALPN_PROTOCOL = 'h2'
+'''The ALPN protocol identifier of HTTP/2 over TLS.'''
+
+CONNECTION_SPECIFIC_FIELDS = frozenset([
+    'connection', 'host', 'keep-alive', 'proxy-connection', 'te',
+    'transfer-encoding', 'upgrade'
+])
+'''Request header fields that are not allowed in HTTP/2.'''
+
+
+def is_http2_connection(connection) -> bool:
+    '''Return whether HTTP/2 was negotiated on the connection.'''
+    return getattr(connection, 'alpn_protocol', None) == ALPN_PROTOCOL
+
+
+class HTTP2Connection(object):
+    '''HTTP/2 connection that multiplexes streams.
+
+    A background task reads frames and hands their events to the streams.
+
+    Args:
+        connection (:class:`.connection.Connection`): An established
+            connection that negotiated HTTP/2.
+        read_size: The size of each read from the connection.
+    '''
+    def __init__(self, connection, read_size: int=65536):
+        assert h2, 'h2 library required'
+
+        self._connection = connection
+        self._read_size = read_size
+        self._h2 = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(
+                client_side=True, header_encoding=None))
+        self._streams = {}
+        self._state_event = asyncio.Event()
+        self._stream_event = asyncio.Event()
+        self._reader_task = None
+        self._closed = False
+        self._error = None
+
+    @property
+    def connection(self):
+        return self._connection
+
+    def closed(self) -> bool:
+        '''Return whether new streams cannot be opened.'''
+        return self._closed or self._connection.closed()
+
+    def busy(self) -> bool:
+        '''Return whether any streams are open.'''
+        return bool(self._streams)
+
+    @asyncio.coroutine
+    def start(self):
+        '''Send the connection preface and start reading.
+
+        Coroutine.
+        '''
+        self._h2.initiate_connection()
+        yield from self.flush()
+
+        self._reader_task = asyncio.get_event_loop().create_task(
+            self._read_loop())
+
+    def new_stream(self) -> 'HTTP2Stream':
+        '''Return a new stream for a request.'''
+        return HTTP2Stream(self)
+
+    @asyncio.coroutine
+    def flush(self):
+        '''Write pending frames.
+
+        Coroutine.
+        '''
+        data = self._h2.data_to_send()
+
+        if data:
+            yield from self._connection.write(data)
+
+    def _send(self):
+        '''Write pending frames without waiting.'''
+        data = self._h2.data_to_send()
+
+        if data and not self._connection.closed():
+            self._connection.writer.write(data)
+
+    @asyncio.coroutine
+    def open_stream(self, stream: 'HTTP2Stream', headers: list,
+                    end_stream: bool) -> int:
+        '''Send the headers on a new stream and return its ID.
+
+        Waits until the server allows another concurrent stream.
+
+        Coroutine.
+        '''
+        while True:
+            self._raise_if_closed()
+
+            open_count = self._h2.open_outbound_streams
+            max_count = self._h2.remote_settings.max_concurrent_streams
+
+            if open_count < max_count:
+                break
+
+            self._state_event.clear()
+            yield from self._state_event.wait()
+
+        stream_id = self._h2.get_next_available_stream_id()
+        self._h2.send_headers(stream_id, headers, end_stream=end_stream)
+        self._streams[stream_id] = stream
+        self._stream_event.set()
+
+        yield from self.flush()
+
+        return stream_id
+
+    @asyncio.coroutine
+    def send_data(self, stream_id: int, data: bytes):
+        '''Send request body data within the flow control window.
+
+        Coroutine.
+        '''
+        while data:
+            self._raise_if_closed()
+
+            size = min(
+                self._h2.local_flow_control_window(stream_id),
+                self._h2.max_outbound_frame_size,
+                len(data)
+            )
+
+            if size <= 0:
+                self._state_event.clear()
+                yield from self._state_event.wait()
+                continue
+
+            self._h2.send_data(stream_id, data[:size])
+            data = data[size:]
+
+            yield from self.flush()
+
+    @asyncio.coroutine
+    def end_stream(self, stream_id: int):
+        '''Finish sending the request.
+
+        Coroutine.
+        '''
+        self._raise_if_closed()
+        self._h2.end_stream(stream_id)
+        yield from self.flush()
+
+    def acknowledge_data(self, stream_id: int, length: int):
+        '''Open the flow control window for consumed data.'''
+        if self.closed():
+            return
+
+        try:
+            self._h2.acknowledge_received_data(length, stream_id)
+        except h2.exceptions.StreamClosedError:
+            pass
+
+        self._send()
+
+    def reset_stream(self, stream_id: int):
+        '''Cancel the stream.'''
+        if stream_id not in self._streams:
+            return
+
+        del self._streams[stream_id]
+        self._state_event.set()
+
+        if self.closed():
+            return
+
+        try:
+            self._h2.reset_stream(
+                stream_id, error_code=h2.errors.ErrorCodes.CANCEL)
+        except h2.exceptions.StreamClosedError:
+            pass
+
+        self._send()
+
+    def close(self):
+        '''Close the connection and fail the open streams.'''
+        self._close(NetworkError('Connection closed.'))
+
+        if self._reader_task and not self._reader_task.done():
+            self._reader_task.cancel()
+
+    def _close(self, error: Exception):
+        if self._closed:
+            return
+
+        _logger.debug(__('HTTP/2 connection closed: {0}', error))
+
+        self._closed = True
+        self._error = error
+        self._connection.close()
+
+        for stream in self._streams.values():
+            stream.feed_event(error)
+
+        self._streams.clear()
+        self._state_event.set()
+
+    def _raise_if_closed(self):
+        if self._error:
+            raise self._error
+        elif self.closed():
+            raise NetworkError('Connection closed.')
+
+    @asyncio.coroutine
+    def _read_loop(self):
+        '''Read frames until the connection closes.
+
+        Coroutine.
+        '''
+        try:
+            while True:
+                data = yield from self._read()
+
+                if not data:
+                    raise NetworkError('Connection closed.')
+
+                try:
+                    events = self._h2.receive_data(data)
+                except h2.exceptions.ProtocolError as error:
+                    raise ProtocolError(
+                        'HTTP/2 protocol error: {0}'.format(error)
+                    ) from error
+
+                for event in events:
+                    self._dispatch_event(event)
+
+                yield from self.flush()
+        except (NetworkError, ProtocolError) as error:
+            self._close(error)
+
+    @asyncio.coroutine
+    def _read(self) -> bytes:
+        '''Read data from the connection.
+
+        The read timeout only applies while streams are open so an idle
+        connection is kept until the server closes it.
+
+        Coroutine.
+        '''
+        while not self._streams:
+            self._stream_event.clear()
+
+            read_task = asyncio.async(
+                self._connection.run_network_operation(
+                    self._connection.reader.read(self._read_size),
+                    name='Read'
+                ))
+            stream_task = asyncio.async(self._stream_event.wait())
+
+            yield from asyncio.wait(
+                [read_task, stream_task],
+                return_when=asyncio.FIRST_COMPLETED)
+
+            stream_task.cancel()
+            read_task.cancel()
+            yield from asyncio.wait([read_task])
+
+            if not read_task.cancelled():
+                return read_task.result()
+
+        return (yield from self._connection.read(self._read_size))
+
+    def _dispatch_event(self, event):
+        '''Hand the event to its stream.'''
+        if isinstance(event, h2.events.ConnectionTerminated):
+            self._close(NetworkError(
+                'HTTP/2 connection terminated: {0}.'.format(event.error_code)
+            ))
+        elif isinstance(event, (h2.events.WindowUpdated,
+                                h2.events.RemoteSettingsChanged)):
+            self._state_event.set()
+
+        stream_id = getattr(event, 'stream_id', None)
+        stream = self._streams.get(stream_id)
+
+        if not stream:
+            return
+
+        stream.feed_event(event)
+
+        if isinstance(event, (h2.events.StreamEnded, h2.events.StreamReset)):
+            del self._streams[stream_id]
+            self._state_event.set()
+
+
+class HTTP2Stream(Stream):
+    '''A single request and response on a :class:`HTTP2Connection`.
+
+    The data events contain the request and response header as
+    HTTP/1.1 text so recorders see the same data as with HTTP/1.1.
+    '''
+    def __init__(self, http2_connection: HTTP2Connection):
+        super().__init__(http2_connection.connection)
+        self._http2_connection = http2_connection
+        self._stream_id = None
+        self._events = asyncio.Queue()
+        self._ended = False
+
+    def feed_event(self, event):
+        '''Queue an event from the connection.'''
+        self._events.put_nowait(event)
+
+    @asyncio.coroutine
+    def _next_event(self):
+        event = yield from self._events.get()
+
+        if isinstance(event, Exception):
+            self._ended = True
+            raise event
+
+        if isinstance(event, h2.events.StreamReset):
+            self._ended = True
+            raise ProtocolError(
+                'HTTP/2 stream reset: {0}.'.format(event.error_code))
+
+        return event
+
+    @asyncio.coroutine
+    def write_request(self, request: Request, full_url: bool=False):
+        '''Send the request's header fields.
+
+        Coroutine.
+        '''
+        _logger.debug('Sending HTTP/2 headers.')
+
+        request.prepare_for_send()
+
+        self._data_event_dispatcher.notify_write(request.to_bytes())
+
+        self._stream_id = yield from self._http2_connection.open_stream(
+            self, self._request_headers(request),
+            end_stream=not request.body
+        )
+
+    @classmethod
+    def _request_headers(cls, request: Request) -> list:
+        '''Return the HTTP/2 header list.'''
+        encoding = request.encoding
+        headers = [
+            (b':method', request.method.encode(encoding)),
+            (b':scheme', request.url_info.scheme.encode(encoding)),
+            (b':authority', request.fields['Host'].encode(encoding)),
+            (b':path', request.resource_path.encode(encoding)),
+        ]
+
+        for name, value in request.fields.get_all():
+            name = name.lower()
+
+            if name not in CONNECTION_SPECIFIC_FIELDS:
+                headers.append((
+                    name.encode(encoding),
+                    value.encode(encoding, 'replace')
+                ))
+
+        return headers
+
+    @asyncio.coroutine
+    def write_body(self, file, length=None):
+        '''Send the request's content body.
+
+        Coroutine.
+        '''
+        _logger.debug('Sending HTTP/2 body.')
+
+        file_is_async = (asyncio.iscoroutine(file.read) or
+                         asyncio.iscoroutinefunction(file.read))
+
+        bytes_left = length
+
+        while bytes_left is None or bytes_left > 0:
+            if bytes_left is not None:
+                read_size = min(bytes_left, self._read_size)
+            else:
+                read_size = self._read_size
+
+            if file_is_async:
+                data = yield from file.read(read_size)
+            else:
+                data = file.read(read_size)
+
+            if not data:
+                break
+
+            self._data_event_dispatcher.notify_write(data)
+
+            yield from self._http2_connection.send_data(self._stream_id, data)
+
+            if bytes_left is not None:
+                bytes_left -= len(data)
+
+        yield from self._http2_connection.end_stream(self._stream_id)
+
+    @asyncio.coroutine
+    def read_response(self, response: Response=None) -> Response:
+        '''Read the response's header fields.
+
+        Coroutine.
+        '''
+        _logger.debug('Reading HTTP/2 header.')
+
+        if response is None:
+            response = Response()
+
+        while True:
+            event = yield from self._next_event()
+
+            if isinstance(event, h2.events.ResponseReceived):
+                break
+            elif isinstance(event, h2.events.StreamEnded):
+                self._ended = True
+                raise ProtocolError('No header received.')
+
+        for name, value in event.headers:
+            name = name.decode('latin-1')
+            value = value.decode('latin-1')
+
+            if name == ':status':
+                response.status_code = int(value)
+            elif not name.startswith(':'):
+                response.fields.add(name, value)
+
+        if response.status_code is None:
+            raise ProtocolError('No status code received.')
+
+        response.version = 'HTTP/1.1'
+        response.reason = http.client.responses.get(response.status_code, '')
+
+        if event.stream_ended:
+            self._ended = True
+
+        self._data_event_dispatcher.notify_read(response.to_bytes())
+
+        return response
+
+    @asyncio.coroutine
+    def read_body(self, request: Request, response: Response, file=None,
+                  raw: bool=False):
+        '''Read the response's content body.
+
+        The `raw` argument has no effect since HTTP/2 does not use chunked
+        transfer encoding.
+
+        Coroutine.
+        '''
+        if not raw and not is_no_body(request, response):
+            self._setup_decompressor(response)
+        else:
+            self._decompressor = None
+
+        file_is_async = hasattr(file, 'drain')
+
+        while not self._ended:
+            event = yield from self._next_event()
+
+            if isinstance(event, h2.events.DataReceived):
+                self._http2_connection.acknowledge_data(
+                    self._stream_id, event.flow_controlled_length)
+
+                self._data_event_dispatcher.notify_read(event.data)
+
+                content_data = self._decompress_data(event.data)
+
+                if file:
+                    file.write(content_data)
+
+                    if file_is_async:
+                        yield from file.drain()
+
+            elif isinstance(event, h2.events.TrailersReceived):
+                for name, value in event.headers:
+                    response.fields.add(
+                        name.decode('latin-1'), value.decode('latin-1'))
+
+            if isinstance(event, h2.events.StreamEnded) or \
+                    getattr(event, 'stream_ended', None):
+                self._ended = True
+
+        content_data = self._flush_decompressor()
+
+        if file and content_data:
+            file.write(content_data)
+
+            if file_is_async:
+                yield from file.drain()
+
+    def closed(self) -> bool:
+        '''Return whether the HTTP/2 connection is closed.'''
+        return self._http2_connection.closed()
+
+    def close(self):
+        '''Cancel the stream if it did not finish.
+
+        The connection is left open for the other streams.
+        '''
+        if self._stream_id is not None and not self._ended:
+            self._http2_connection.reset_stream(self._stream_id)
+
+        self._ended = True
+
+    @asyncio.coroutine
+    def reconnect(self):
+        '''Do nothing since the connection is managed by
+        :class:`HTTP2Connection`.
+
+        Coroutine.
+        '''
+
+
+class HTTP2ConnectionTable(object):
+    '''HTTP/2 connections shared by the sessions of a client.'''
+    def __init__(self):
+        self._connections = {}
+        self._disabled_keys = set()
+
+    def get(self, connection) -> HTTP2Connection:
+        '''Return the open HTTP/2 connection for the connection.'''
+        http2_connection = self._connections.get(connection)
+
+        if http2_connection and not http2_connection.closed():
+            return http2_connection
+
+    @asyncio.coroutine
+    def new(self, connection) -> HTTP2Connection:
+        '''Start HTTP/2 on the connection.
+
+        Coroutine.
+        '''
+        self._clean()
+
+        http2_connection = self._connections[connection] = \
+            HTTP2Connection(connection)
+
+        yield from http2_connection.start()
+
+        return http2_connection
+
+    def _clean(self):
+        for connection, http2_connection in tuple(self._connections.items()):
+            if http2_connection.closed():
+                del self._connections[connection]
+
+    def enabled(self, key) -> bool:
+        '''Return whether HTTP/2 may be negotiated for the host key.'''
+        return key not in self._disabled_keys
+
+    def disable(self, key):
+        '''Stop sharing connections for the host key.'''
+        self._disabled_keys.add(key)
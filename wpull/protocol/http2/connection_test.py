@@ -0,0 +1,94 @@
+# encoding=utf-8
+import asyncio
+import functools
+import io
+import ssl
+import unittest
+
+import wpull.testing.async
+from wpull.network.connection import SSLConnection
+from wpull.network.pool import ConnectionPool
+from wpull.protocol.http.client import Client
+from wpull.protocol.http.request import Request
+from wpull.protocol.http2.connection import h2, is_http2_connection
+from wpull.testing.h2app import H2AppTestCase
+
+
+@unittest.skipIf(h2 is None, 'h2 library not installed')
+class TestHTTP2Client(H2AppTestCase):
+    def _new_client(self):
+        ssl_context = ssl.SSLContext(ssl.PROTOCOL_SSLv23)
+        ssl_context.set_alpn_protocols(['h2', 'http/1.1'])
+
+        connection_pool = ConnectionPool(
+            ssl_connection_factory=functools.partial(
+                SSLConnection, ssl_context=ssl_context)
+        )
+
+        return Client(connection_pool=connection_pool, http2=True)
+
+    @wpull.testing.async.async_test()
+    def test_basic(self):
+        client = self._new_client()
+
+        with client.session() as session:
+            request = Request(self.get_url('/test'))
+            response = yield from session.start(request)
+
+            self.assertEqual(200, response.status_code)
+            self.assertEqual('OK', response.reason)
+            self.assertTrue(all(
+                is_http2_connection(connection)
+                for connection in session._connections))
+
+            file_obj = io.BytesIO()
+            yield from session.download(file_obj)
+
+            self.assertEqual(b'Path: /test', file_obj.getvalue())
+
+    @wpull.testing.async.async_test()
+    def test_multiplex(self):
+        client = self._new_client()
+
+        contents = yield from asyncio.gather(*[
+            self._fetch_content(client, '/{}'.format(index))
+            for index in range(10)
+        ])
+
+        self.assertEqual(
+            [b'Path: /' + str(index).encode('ascii') for index in range(10)],
+            contents
+        )
+        self.assertEqual(1, self.http_server.connection_count)
+        self.assertEqual(10, self.http_server.request_count)
+
+    @wpull.testing.async.async_test()
+    def test_idle_connection_kept(self):
+        ssl_context = ssl.SSLContext(ssl.PROTOCOL_SSLv23)
+        ssl_context.set_alpn_protocols(['h2', 'http/1.1'])
+
+        connection_pool = ConnectionPool(
+            ssl_connection_factory=functools.partial(
+                SSLConnection, ssl_context=ssl_context, timeout=0.1)
+        )
+        client = Client(connection_pool=connection_pool, http2=True)
+
+        yield from self._fetch_content(client, '/1')
+        yield from asyncio.sleep(1)
+        content = yield from self._fetch_content(client, '/2')
+
+        self.assertEqual(b'Path: /2', content)
+        self.assertEqual(1, self.http_server.connection_count)
+
+    @asyncio.coroutine
+    def _fetch_content(self, client, path):
+        with client.session() as session:
+            request = Request(self.get_url(path))
+            response = yield from session.start(request)
+
+            self.assertEqual(200, response.status_code)
+
+            file_obj = io.BytesIO()
+            yield from session.download(file_obj)
+
+            return file_obj.getvalue()
@@ -162,6 +162,11 @@ class DemuxDocumentScraper(BaseScraper):
     def __init__(self, document_scrapers):
         self._document_scrapers = document_scrapers
 
+    @property
+    def document_scrapers(self):
+        '''The document scrapers in order.'''
+        return self._document_scrapers
+
     def scrape(self, request, response, link_type=None):
         '''Iterate the scrapers, returning the first of the results.'''
         for scraper in self._document_scrapers:
@@ -0,0 +1,237 @@
+# encoding=utf-8
+'''Document scraping in worker processes.'''
+import asyncio
+import concurrent.futures
+import gettext
+import logging
+import multiprocessing
+import os
+import pickle
+import tempfile
+
+from wpull.backport.logging import BraceMessage as __
+from wpull.body import Body
+from wpull.protocol.http.request import Request, Response
+from wpull.scraper.base import DemuxDocumentScraper, LinkContext, \
+    ScrapeResult
+
+_logger = logging.getLogger(__name__)
+_ = gettext.gettext
+
+_worker_scrapers = {}
+'''Document scrapers unpickled by the worker process keyed by path.'''
+
+
+class ScrapeExecutor(object):
+    '''Scrape documents in a pool of worker processes.
+
+    Only the URL, the header fields and the path of the response body are
+    sent to a worker. The document scraper is pickled once to a temporary
+    file that each worker loads on its first document. Workers are started
+    with the ``spawn`` method so they do not inherit the locks held by the
+    threads of this process. Documents are scraped in-process if there are
+    no workers, the body is not a named file, or the pool fails.
+
+    Args:
+        document_scraper: The document scraper.
+        max_workers: The number of worker processes. If 0, documents
+            are always scraped in-process.
+    '''
+    def __init__(self, document_scraper: DemuxDocumentScraper,
+                 max_workers: int=0):
+        self._document_scraper = document_scraper
+        self._max_workers = max_workers
+        self._executor = None
+        self._scraper_path = None
+
+    @property
+    def max_workers(self) -> int:
+        '''The number of worker processes.'''
+        return self._max_workers
+
+    def is_offloadable(self, response: Response) -> bool:
+        '''Return whether the response can be scraped by a worker.'''
+        if not self._max_workers or not response.body:
+            return False
+
+        name = getattr(response.body, 'name', None)
+
+        return isinstance(name, str) and os.path.isfile(name)
+
+    @asyncio.coroutine
+    def scrape_info(self, request: Request, response: Response,
+                    link_type=None) -> dict:
+        '''Scrape the document and return a dict of results.
+
+        The dict is the same as :meth:`.DemuxDocumentScraper.scrape_info`
+        except the ``extra`` field of each link context is not set when the
+        document is scraped by a worker.
+
+        Coroutine.
+        '''
+        if not self.is_offloadable(response) or not self._save_scraper():
+            return self._document_scraper.scrape_info(
+                request, response, link_type)
+
+        response.body.flush()
+
+        try:
+            results = yield from asyncio.get_event_loop().run_in_executor(
+                self._get_executor(), _scrape_in_worker,
+                self._scraper_path, request.url,
+                response.status_code, response.reason,
+                list(response.fields.get_all()),
+                response.body.name, link_type
+            )
+        except (concurrent.futures.process.BrokenProcessPool,
+                pickle.PickleError, OSError, ImportError,
+                AttributeError) as error:
+            # Classes that the worker cannot import fail to unpickle
+            _logger.warning(__(
+                _('Scraping in worker processes failed: {error}. '
+                  'Falling back to in-process scraping.'),
+                error=error
+            ))
+            self.close()
+
+            return self._document_scraper.scrape_info(
+                request, response, link_type)
+
+        info = {}
+
+        for scraper, result in zip(self._document_scraper.document_scrapers,
+                                   results):
+            if result is not None:
+                link_tuples, encoding = result
+                result = ScrapeResult(
+                    {LinkContext(*link_tuple) for link_tuple in link_tuples},
+                    encoding
+                )
+
+            info[scraper] = result
+
+        return info
+
+    def _save_scraper(self) -> bool:
+        '''Pickle the document scraper to a file for the workers.
+
+        Pickling is done on first use so changes made by plugins during
+        startup are sent to the workers.
+        '''
+        if self._scraper_path:
+            return True
+
+        if not self._use_spawn():
+            _logger.warning(__(
+                _('Worker processes cannot be started with the {method} '
+                  'method. Falling back to in-process scraping.'),
+                method=multiprocessing.get_start_method()
+            ))
+            self._max_workers = 0
+
+            return False
+
+        try:
+            with tempfile.NamedTemporaryFile(
+                    prefix='wpull-scraper-', suffix='.pickle',
+                    delete=False) as file:
+                self._scraper_path = file.name
+                pickle.dump(self._document_scraper, file)
+        except (pickle.PickleError, TypeError, AttributeError,
+                OSError) as error:
+            _logger.warning(__(
+                _('Document scraper cannot be sent to worker processes: '
+                  '{error}. Falling back to in-process scraping.'),
+                error=error
+            ))
+            self.close()
+
+            return False
+
+        return True
+
+    @classmethod
+    def _use_spawn(cls) -> bool:
+        '''Make new processes start without forking this process.
+
+        The process pool uses the default start method. A forked worker
+        could inherit a lock held by the database or WARC writer thread and
+        hang.
+        '''
+        method = multiprocessing.get_start_method(allow_none=True)
+
+        if method is None:
+            multiprocessing.set_start_method('spawn')
+            return True
+
+        return method in ('spawn', 'forkserver')
+
+    def _get_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        if not self._executor:
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self._max_workers)
+
+        return self._executor
+
+    def close(self):
+        '''Shut down the worker processes.
+
+        Any further documents are scraped in-process. This function does
+        not wait for the workers to exit.
+        '''
+        self._max_workers = 0
+
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+        if self._scraper_path:
+            try:
+                os.remove(self._scraper_path)
+            except OSError:
+                pass
+
+            self._scraper_path = None
+
+
+def _scrape_in_worker(scraper_path, url, status_code, reason, fields, path,
+                      link_type):
+    '''Scrape the document at the path.
+
+    Returns:
+        list: For each document scraper, either None or a tuple of the
+        link context tuples, without ``extra``, and the encoding.
+    '''
+    document_scraper = _worker_scrapers.get(scraper_path)
+
+    if document_scraper is None:
+        with open(scraper_path, 'rb') as file:
+            document_scraper = _worker_scrapers[scraper_path] = \
+                pickle.load(file)
+
+    request = Request(url)
+    response = Response(status_code, reason, request=request)
+
+    for name, value in fields:
+        response.fields.add(name, value)
+
+    with open(path, 'rb') as file:
+        response.body = Body(file)
+        info = document_scraper.scrape_info(request, response, link_type)
+
+    results = []
+
+    for scraper in document_scraper.document_scrapers:
+        scrape_result = info[scraper]
+
+        if scrape_result is None:
+            results.append(None)
+        else:
+            results.append((
+                [(link_context.link, link_context.inline,
+                  link_context.linked, link_context.link_type)
+                 for link_context in scrape_result.link_contexts],
+                scrape_result.encoding
+            ))
+
+    return results
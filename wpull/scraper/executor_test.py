@@ -0,0 +1,80 @@
+import io
+import multiprocessing
+import os.path
+import shutil
+
+import wpull.util
+import wpull.testing.async
+from wpull.body import Body
+from wpull.protocol.http.request import Request, Response
+from wpull.scraper.base import DemuxDocumentScraper
+from wpull.scraper.css import CSSScraper
+from wpull.scraper.executor import ScrapeExecutor
+
+ROOT_PATH = os.path.join(os.path.dirname(__file__), '..')
+
+
+class TestScrapeExecutor(wpull.testing.async.AsyncTestCase):
+    def _new_request_response(self, body=None):
+        request = Request('http://example.com/styles.css')
+        response = Response(200, 'OK')
+        response.body = body or Body()
+
+        with wpull.util.reset_file_offset(response.body):
+            css_file_path = os.path.join(ROOT_PATH,
+                                         'testing', 'samples', 'styles.css')
+            with open(css_file_path, 'rb') as in_file:
+                shutil.copyfileobj(in_file, response.body)
+
+        return request, response
+
+    @wpull.testing.async.async_test()
+    def test_scrape_in_worker(self):
+        scraper = CSSScraper()
+        executor = ScrapeExecutor(DemuxDocumentScraper([scraper]),
+                                  max_workers=1)
+        request, response = self._new_request_response()
+
+        self.assertTrue(executor.is_offloadable(response))
+
+        try:
+            demux_info = yield from executor.scrape_info(request, response)
+        finally:
+            executor.close()
+
+        scrape_result = demux_info[scraper]
+
+        self.assertIn(multiprocessing.get_start_method(),
+                      ('spawn', 'forkserver'))
+
+        self.assertEqual({
+            'http://example.com/mobile.css',
+            'http://example.com/images/star.gif',
+        },
+            scrape_result.inline_links
+        )
+        self.assertFalse(scrape_result.linked_links)
+        self.assertEqual(
+            scraper.scrape(request, response).inline_links,
+            scrape_result.inline_links
+        )
+
+    @wpull.testing.async.async_test()
+    def test_scrape_in_process(self):
+        scraper = CSSScraper()
+        executor = ScrapeExecutor(DemuxDocumentScraper([scraper]),
+                                  max_workers=1)
+        request, response = self._new_request_response(
+            body=Body(io.BytesIO()))
+
+        self.assertFalse(executor.is_offloadable(response))
+
+        demux_info = yield from executor.scrape_info(request, response)
+        executor.close()
+
+        self.assertEqual({
+            'http://example.com/mobile.css',
+            'http://example.com/images/star.gif',
+        },
+            demux_info[scraper].inline_links
+        )
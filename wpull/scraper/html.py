@@ -19,6 +19,11 @@ from wpull.url import percent_decode
 _ = gettext.gettext
 _logger = StyleAdapter(logging.getLogger(__name__))
 
+_LINK_ATTRIB = 'link'
+_SCRIPT_ATTRIB = 'script'
+_DATA_ATTRIB = 'data'
+_SRCSET_ATTRIB = 'srcset'
+
 
 _BaseLinkInfo = collections.namedtuple(
     'LinkInfoType',
@@ -70,6 +75,8 @@ class HTMLScraper(HTMLReader, BaseHTMLScraper):
         robots: If True, discard any links if they cannot be followed
         only_relative: If True, discard any links that are not absolute paths
     '''
+    MAX_CACHED_TAGS = 10000
+    '''Maximum number of tag names remembered by the tag filter.'''
 
     def __init__(self, html_parser, element_walker,
                  followed_tags=None, ignored_tags=None,
@@ -93,6 +100,8 @@ class HTMLScraper(HTMLReader, BaseHTMLScraper):
         else:
             self._ignored_tags = None
 
+        self._accepted_tags = {}
+
     def scrape(self, request, response, link_type=None):
         if not self.is_supported(request=request, response=response):
             return
@@ -107,7 +116,10 @@ class HTMLScraper(HTMLReader, BaseHTMLScraper):
 
         try:
             with wpull.util.reset_file_offset(content_file):
-                elements = self.iter_elements(content_file, encoding=encoding)
+                elements = self.iter_link_elements(
+                    content_file, encoding=encoding,
+                    text_tags=self._element_walker.text_tags
+                )
 
                 result_meta_info = self._process_elements(
                     elements, response, base_url, link_contexts
@@ -135,20 +147,23 @@ class HTMLScraper(HTMLReader, BaseHTMLScraper):
         inject_refresh = True
         doc_base_url = None
 
-        for element in elements:
-            if not isinstance(element, Element):
-                continue
-
-            if robots_check_needed and ElementWalker.robots_cannot_follow(element):
-                robots_check_needed = False
-                robots_no_follow = True
-
-            if not doc_base_url and element.tag == 'base':
-                doc_base_url = urljoin_safe(
-                    base_url, clean_link_soup(element.attrib.get('href', ''))
-                )
+        for element in itertools.chain(elements, [None]):
+            if element is None:
+                # End of document
+                link_infos = ()
+            else:
+                if robots_check_needed and \
+                        ElementWalker.robots_cannot_follow(element):
+                    robots_check_needed = False
+                    robots_no_follow = True
+
+                if not doc_base_url and element.tag == 'base':
+                    doc_base_url = urljoin_safe(
+                        base_url,
+                        clean_link_soup(element.attrib.get('href', ''))
+                    )
 
-            link_infos = self._element_walker.iter_links_element(element)
+                link_infos = self._element_walker.iter_links_element(element)
 
             if inject_refresh and 'Refresh' in response.fields:
                 link = parse_refresh(response.fields['Refresh'])
@@ -212,7 +227,9 @@ class HTMLScraper(HTMLReader, BaseHTMLScraper):
 
         See :meth:`scrape` for the return value.
         '''
-        elements = self.iter_elements(file, encoding=encoding)
+        elements = self.iter_link_elements(
+            file, encoding=encoding, text_tags=self._element_walker.text_tags
+        )
 
         link_contexts = set()
 
@@ -253,16 +270,28 @@ class HTMLScraper(HTMLReader, BaseHTMLScraper):
 
     def _is_accepted(self, element_tag):
         '''Return if the link is accepted by the filters.'''
-        element_tag = element_tag.lower()
+        if self._ignored_tags is None and self._followed_tags is None:
+            return True
 
-        if self._ignored_tags is not None \
-           and element_tag in self._ignored_tags:
-            return False
+        try:
+            return self._accepted_tags[element_tag]
+        except KeyError:
+            pass
 
-        if self._followed_tags is not None:
-            return element_tag in self._followed_tags
+        lower_tag = element_tag.lower()
+
+        if self._ignored_tags is not None \
+           and lower_tag in self._ignored_tags:
+            accepted = False
+        elif self._followed_tags is not None:
+            accepted = lower_tag in self._followed_tags
         else:
-            return True
+            accepted = True
+
+        if len(self._accepted_tags) < self.MAX_CACHED_TAGS:
+            self._accepted_tags[element_tag] = accepted
+
+        return accepted
 
 
 class ElementWalker(object):
@@ -310,6 +339,23 @@ class ElementWalker(object):
     OPEN_GRAPH_LINK_NAMES = (
         'og:url', 'twitter:player'
     )
+    TAG_HANDLERS = {
+        'link': 'iter_links_link_element',
+        'meta': 'iter_links_meta_element',
+        'object': 'iter_links_object_element',
+        'applet': 'iter_links_object_element',
+        'param': 'iter_links_param_element',
+        'style': 'iter_links_style_element',
+        'script': 'iter_links_script_element',
+    }
+    '''Mapping of element tag names to the names of their link iterators.
+
+    Other elements use :meth:`iter_links_plain_element`.
+    '''
+    TEXT_LINK_TAGS = frozenset(['link', 'url', 'icon'])
+    '''Tags where the element text is a link. (RSS/Atom)'''
+    MAX_CACHED_ATTRIBUTES = 10000
+    '''Maximum number of attribute names remembered by the dispatch table.'''
 
     '''Iterate elements looking for links.
 
@@ -322,6 +368,65 @@ class ElementWalker(object):
         self.css_scraper = css_scraper
         self.javascript_scraper = javascript_scraper
 
+        self._tag_handlers = dict(
+            (tag, getattr(self, name))
+            for tag, name in self.TAG_HANDLERS.items()
+        )
+        self._plain_handler = self.iter_links_plain_element
+        self._attrib_kinds = dict(
+            (name, _LINK_ATTRIB) for name in self.LINK_ATTRIBUTES
+        )
+        self._link_flags = self._build_link_flags()
+
+    @classmethod
+    def _build_link_flags(cls):
+        '''Return the inline and linked flags of the link attributes.
+
+        Returns:
+            dict: Tag name to a dict mapping attribute name to a tuple of
+            :meth:`is_link_inline` and :meth:`is_html_link`. The ``None`` tag
+            contains the flags for any other tag.
+        '''
+        return dict(
+            (tag, dict(
+                (name, (cls.is_link_inline(tag, name),
+                        cls.is_html_link(tag, name)))
+                for name in cls.LINK_ATTRIBUTES
+            ))
+            for tag in itertools.chain(cls.TAG_ATTRIBUTES, [None])
+        )
+
+    @classmethod
+    def classify_attrib(cls, attrib_name):
+        '''Return how the attribute may contain links.
+
+        Returns:
+            str, None: ``link`` for a link attribute, ``script`` for
+            JavaScript, ``data`` for a data attribute, ``srcset`` for
+            a list of images, or None.
+        '''
+        if attrib_name in cls.LINK_ATTRIBUTES:
+            return _LINK_ATTRIB
+        elif attrib_name[:5] in cls.DYNAMIC_ATTRIBUTES:
+            return _SCRIPT_ATTRIB
+        elif attrib_name.startswith('data-'):
+            return _DATA_ATTRIB
+        elif attrib_name == 'srcset':
+            return _SRCSET_ATTRIB
+
+    @property
+    def text_tags(self):
+        '''Return the tags where the element text may contain links.'''
+        tags = set(self.TEXT_LINK_TAGS)
+
+        if self.css_scraper:
+            tags.add('style')
+
+        if self.javascript_scraper:
+            tags.add('script')
+
+        return frozenset(tags)
+
     def iter_links(self, elements):
         '''Iterate the document root for links.
 
@@ -341,23 +446,9 @@ class ElementWalker(object):
         attrib = element.attrib
         tag = element.tag
 
-        if tag == 'link':
-            iterable = self.iter_links_link_element(element)
-        elif tag == 'meta':
-            iterable = self.iter_links_meta_element(element)
-        elif tag in ('object', 'applet'):
-            iterable = self.iter_links_object_element(element)
-        elif tag == 'param':
-            iterable = self.iter_links_param_element(element)
-        elif tag == 'style':
-            iterable = self.iter_links_style_element(element)
-        elif tag == 'script':
-            iterable = self.iter_links_script_element(element)
-        else:
-            iterable = self.iter_links_plain_element(element)
+        iterable = self._tag_handlers.get(tag, self._plain_handler)(element)
 
-        # RSS/Atom
-        if tag in ('link', 'url', 'icon'):
+        if tag in self.TEXT_LINK_TAGS:
             iterable = itertools.chain(
                 iterable, self.iter_links_element_text(element)
             )
@@ -576,10 +667,11 @@ class ElementWalker(object):
 
     def iter_links_plain_element(self, element):
         '''Iterate any element for links using generic rules.'''
+        link_flags = self._link_flags.get(element.tag) or self._link_flags[None]
+
         for attrib_name, link in self.iter_links_by_attrib(element):
-            if attrib_name in self.LINK_ATTRIBUTES:
-                inline = self.is_link_inline(element.tag, attrib_name)
-                linked = self.is_html_link(element.tag, attrib_name)
+            if attrib_name in link_flags:
+                inline, linked = link_flags[attrib_name]
             else:
                 inline = is_likely_inline(link)
                 linked = not inline
@@ -597,10 +689,18 @@ class ElementWalker(object):
 
     def iter_links_by_attrib(self, element):
         '''Iterate an element by looking at its attributes for links.'''
-        for attrib_name in element.attrib.keys():
-            attrib_value = element.attrib.get(attrib_name)
+        attrib_kinds = self._attrib_kinds
+
+        for attrib_name, attrib_value in element.attrib.items():
+            try:
+                kind = attrib_kinds[attrib_name]
+            except KeyError:
+                kind = self.classify_attrib(attrib_name)
 
-            if attrib_name in self.LINK_ATTRIBUTES:
+                if len(attrib_kinds) < self.MAX_CACHED_ATTRIBUTES:
+                    attrib_kinds[attrib_name] = kind
+
+            if kind == _LINK_ATTRIB:
                 if self.javascript_scraper and \
                         attrib_value.lstrip().startswith('javascript:'):
                     for link in self.iter_links_by_js_attrib(
@@ -609,18 +709,18 @@ class ElementWalker(object):
                 else:
                     yield attrib_name, attrib_value
 
-            elif self.javascript_scraper and \
-                    attrib_name[:5] in self.DYNAMIC_ATTRIBUTES:
-                for link in self.iter_links_by_js_attrib(attrib_name,
-                                                         attrib_value):
-                    yield link
+            elif kind == _SCRIPT_ATTRIB:
+                if self.javascript_scraper:
+                    for link in self.iter_links_by_js_attrib(attrib_name,
+                                                             attrib_value):
+                        yield link
 
-            elif attrib_name.startswith('data-'):
+            elif kind == _DATA_ATTRIB:
                 if is_likely_link(attrib_value) \
                         and not is_unlikely_link(attrib_value):
                     yield attrib_name, attrib_value
 
-            elif attrib_name == 'srcset':
+            elif kind == _SRCSET_ATTRIB:
                 items = self.iter_links_by_srcset_attrib(
                     attrib_name, attrib_value)
 
@@ -160,6 +160,37 @@ class Mixin(object):
                                        link_type=LinkType.css)
         self.assertFalse(scrape_result)
 
+    def test_html_scraper_followed_tags(self):
+        element_walker = ElementWalker(
+            css_scraper=CSSScraper(), javascript_scraper=JavaScriptScraper())
+        scraper = HTMLScraper(self.get_html_parser(), element_walker,
+                              followed_tags=['A', 'img'],
+                              ignored_tags=['img'])
+        request = Request('http://example.com/')
+        response = Response(200, 'OK')
+        response.body = Body()
+
+        with wpull.util.reset_file_offset(response.body):
+            response.body.write(
+                b'<a href="a.html">A</a><A HREF="b.html">B</A>'
+                b'<img src="c.png"><link href="d.css" rel="stylesheet">'
+            )
+
+        scrape_result = scraper.scrape(request, response)
+
+        self.assertEqual(
+            {'http://example.com/a.html', 'http://example.com/b.html'},
+            scrape_result.linked_links
+        )
+        self.assertFalse(scrape_result.inline_links)
+
+    def test_html_classify_attrib(self):
+        self.assertEqual('link', ElementWalker.classify_attrib('href'))
+        self.assertEqual('script', ElementWalker.classify_attrib('onclick'))
+        self.assertEqual('data', ElementWalker.classify_attrib('data-src'))
+        self.assertEqual('srcset', ElementWalker.classify_attrib('srcset'))
+        self.assertIsNone(ElementWalker.classify_attrib('title'))
+
     def test_html_soup(self):
         element_walker = ElementWalker(
             css_scraper=CSSScraper(), javascript_scraper=JavaScriptScraper())
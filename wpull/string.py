@@ -57,9 +57,17 @@ def normalize_codec_name(name):
         pass
 
 
-def detect_encoding(data, encoding=None, fallback='latin1', is_html=False):
+def detect_encoding(data, encoding=None, fallback='latin1', is_html=False,
+                    preferred=None):
     '''Detect the character encoding of the data.
 
+    Args:
+        preferred (str): If given, a codec tried after the declared
+            `encoding` and before statistical detection, such as the
+            encoding of another document from the same site. It is not used
+            if the data has a byte order mark, declares its encoding or is
+            likely UTF-8.
+
     Returns:
         str: The name of the codec
 
@@ -70,11 +78,22 @@ def detect_encoding(data, encoding=None, fallback='latin1', is_html=False):
     if encoding:
         encoding = normalize_codec_name(encoding)
 
-    bs4_detector = EncodingDetector(
-        data,
-        override_encodings=(encoding,) if encoding else (),
-        is_html=is_html
-    )
+    failed_candidates = set()
+
+    if encoding and (encoding != 'ascii' or fallback == 'ascii'):
+        if try_decoding(data, encoding):
+            return encoding
+
+        failed_candidates.add(encoding)
+
+    bs4_detector = EncodingDetector(data, is_html=is_html)
+
+    if preferred and preferred not in failed_candidates \
+            and not _has_document_encoding(bs4_detector):
+        if not try_decoding(data, preferred):
+            failed_candidates.add(preferred)
+        elif preferred == 'utf-8' or not _is_likely_utf8(data):
+            return preferred
     candidates = itertools.chain(bs4_detector.encodings, (fallback,))
 
     for candidate in candidates:
@@ -83,7 +102,7 @@ def detect_encoding(data, encoding=None, fallback='latin1', is_html=False):
 
         candidate = normalize_codec_name(candidate)
 
-        if not candidate:
+        if not candidate or candidate in failed_candidates:
             continue
 
         if candidate == 'ascii' and fallback != 'ascii':
@@ -98,27 +117,70 @@ def detect_encoding(data, encoding=None, fallback='latin1', is_html=False):
     raise ValueError('Unable to detect encoding.')
 
 
+def _has_document_encoding(detector):
+    '''Return whether the data has a byte order mark or an encoding
+    declaration.'''
+    if detector.sniffed_encoding:
+        return True
+
+    detector.declared_encoding = detector.find_declared_encoding(
+        detector.markup, detector.is_html)
+
+    return bool(detector.declared_encoding)
+
+
 def try_decoding(data, encoding):
-    '''Return whether the Python codec could decode the data.'''
+    '''Return whether the Python codec could decode the data.
+
+    Decoding stops at the first invalid byte sequence. Up to 3 bytes at
+    the end may be invalid since the data is likely truncated.
+    '''
+    if normalize_codec_name(encoding) == 'utf-8':
+        return is_utf8(data)
+
+    try:
+        decoder = codecs.getincrementaldecoder(encoding)('strict')
+    except LookupError:
+        return False
+
     try:
-        data.decode(encoding, 'strict')
+        decoder.decode(data, final=_is_final(data))
+    except UnicodeDecodeError as error:
+        return _is_truncated(data, error.start)
     except UnicodeError:
-        # Data under 16 bytes is very unlikely to be truncated
-        if len(data) > 16:
-            for trim in (1, 2, 3):
-                trimmed_data = data[:-trim]
-                if trimmed_data:
-                    try:
-                        trimmed_data.decode(encoding, 'strict')
-                    except UnicodeError:
-                        continue
-                    else:
-                        return True
         return False
     else:
         return True
 
 
+def is_utf8(data):
+    '''Return whether the data is valid UTF-8.
+
+    Like :func:`try_decoding`, up to 3 bytes at the end may be invalid.
+    '''
+    try:
+        codecs.utf_8_decode(data, 'strict', _is_final(data))
+    except UnicodeDecodeError as error:
+        return _is_truncated(data, error.start)
+    else:
+        return True
+
+
+def _is_likely_utf8(data):
+    '''Return whether the data has non-ASCII bytes and is valid UTF-8.'''
+    return bool(data.translate(None, ASCII_BYTES)) and is_utf8(data)
+
+
+def _is_final(data):
+    # Data under 16 bytes is very unlikely to be truncated
+    return len(data) <= 16
+
+
+def _is_truncated(data, error_position):
+    '''Return whether the decode error is likely from truncated data.'''
+    return not _is_final(data) and error_position >= len(data) - 3
+
+
 def format_size(num, format_str='{num:.1f} {unit}'):
     '''Format the file size into a human readable text.
 
@@ -137,6 +199,7 @@ ALL_BYTES = bytes(bytearray(range(256)))
 CONTROL_BYTES = bytes(bytearray(
     itertools.chain(range(0, 32), range(127, 256))
 ))
+ASCII_BYTES = bytes(bytearray(range(128)))
 
 
 def printable_bytes(data):
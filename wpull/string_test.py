@@ -5,7 +5,7 @@ import itertools
 import unittest
 
 from wpull.string import to_bytes, to_str, detect_encoding, printable_bytes, \
-    normalize_codec_name, format_size, printable_str
+    normalize_codec_name, format_size, printable_str, try_decoding, is_utf8
 
 
 class TestString(unittest.TestCase):
@@ -96,6 +96,50 @@ class TestString(unittest.TestCase):
             for data in iterable:
                 detect_encoding(b''.join(data))
 
+    def test_detect_encoding_preferred(self):
+        mojibake = b'\x95\xb6\x8e\x9a\x89\xbb\x82\xaf'
+
+        self.assertEqual(
+            'shift_jis',
+            detect_encoding(mojibake * 10, 'utf-8', preferred='shift_jis')
+        )
+        self.assertEqual(
+            'utf-8',
+            detect_encoding('ünicode'.encode('utf-8') * 10,
+                            preferred='windows-1252')
+        )
+        self.assertEqual(
+            'koi8-r',
+            detect_encoding(b'hello world', 'koi8-r', preferred='shift_jis')
+        )
+        self.assertEqual(
+            'shift_jis',
+            detect_encoding(
+                b'<meta charset="shift_jis">' + mojibake * 10,
+                is_html=True, preferred='windows-1252')
+        )
+        self.assertEqual(
+            'utf-8',
+            detect_encoding(b'\xef\xbb\xbf' + 'ünicode'.encode('utf-8'),
+                            preferred='windows-1252')
+        )
+
+    def test_try_decoding(self):
+        data = 'ünicode'.encode('utf-8') * 10
+
+        self.assertTrue(is_utf8(data))
+        self.assertTrue(is_utf8(data[:-1]))
+        self.assertTrue(is_utf8(data + b'\xff'))
+        self.assertFalse(is_utf8(b'\xff' + data))
+        self.assertFalse(is_utf8(b'\xc3'))
+
+        data = 'いろはにほへと'.encode('shift_jis') * 10
+
+        self.assertTrue(try_decoding(data, 'shift_jis'))
+        self.assertTrue(try_decoding(data[:-1], 'shift_jis'))
+        self.assertFalse(try_decoding(b'\xff\xff' + data, 'shift_jis'))
+        self.assertFalse(try_decoding(data, 'utf-8'))
+
     def test_printable_bytes(self):
         self.assertEqual(
             b' 1234abc XYZ~',
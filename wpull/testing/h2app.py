@@ -0,0 +1,105 @@
+# encoding=utf-8
+'''HTTP/2 test server.'''
+import logging
+import os.path
+import ssl
+
+import asyncio
+
+from wpull.testing.async import AsyncTestCase
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+except ImportError:
+    h2 = None
+
+
+_logger = logging.getLogger(__name__)
+
+
+class H2ServerProtocol(asyncio.Protocol):
+    '''Serves the request path back as the response body.'''
+    def __init__(self, server):
+        self._server = server
+        self._transport = None
+        self._conn = None
+        self._headers = {}
+
+    def connection_made(self, transport):
+        self._server.connection_count += 1
+        self._transport = transport
+        self._conn = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False)
+        )
+        self._conn.initiate_connection()
+        self._transport.write(self._conn.data_to_send())
+
+    def data_received(self, data):
+        for event in self._conn.receive_data(data):
+            if isinstance(event, h2.events.RequestReceived):
+                self._headers[event.stream_id] = dict(event.headers)
+            elif isinstance(event, h2.events.DataReceived):
+                self._conn.acknowledge_received_data(
+                    event.flow_controlled_length, event.stream_id)
+            elif isinstance(event, h2.events.StreamEnded):
+                self._respond(event.stream_id)
+
+        self._transport.write(self._conn.data_to_send())
+
+    def _respond(self, stream_id):
+        headers = self._headers.pop(stream_id)
+        path = headers.get(b':path', headers.get(':path'))
+
+        if isinstance(path, str):
+            path = path.encode('ascii')
+
+        body = b'Path: ' + path
+
+        self._server.request_count += 1
+        self._conn.send_headers(stream_id, [
+            (':status', '200'),
+            ('content-type', 'text/plain'),
+            ('content-length', str(len(body))),
+        ])
+        self._conn.send_data(stream_id, body, end_stream=True)
+
+
+class H2Server(object):
+    def __init__(self):
+        self.connection_count = 0
+        self.request_count = 0
+        self._server = None
+
+    @asyncio.coroutine
+    def start(self):
+        ssl_context = ssl.SSLContext(ssl.PROTOCOL_SSLv23)
+        ssl_context.load_cert_chain(
+            os.path.join(os.path.dirname(__file__), 'test.pem'))
+        ssl_context.set_alpn_protocols(['h2'])
+
+        self._server = yield from asyncio.get_event_loop().create_server(
+            lambda: H2ServerProtocol(self), '127.0.0.1', 0, ssl=ssl_context
+        )
+
+    def stop(self):
+        self._server.close()
+
+    @property
+    def port(self):
+        return self._server.sockets[0].getsockname()[1]
+
+
+class H2AppTestCase(AsyncTestCase):
+    def setUp(self):
+        super().setUp()
+        self.http_server = H2Server()
+        self.event_loop.run_until_complete(self.http_server.start())
+
+    def get_url(self, path):
+        return 'https://localhost:{0}{1}'.format(self.http_server.port, path)
+
+    def tearDown(self):
+        self.http_server.stop()
+        super().tearDown()
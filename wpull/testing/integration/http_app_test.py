@@ -59,6 +59,33 @@ class TestHTTPGoodApp(HTTPGoodAppTestCase):
         self.assertEqual('hi', cookies[0].name)
         self.assertEqual('hello', cookies[0].value)
 
+    @wpull.testing.async.async_test()
+    def test_sidecar_save_error(self):
+        # Saving fails because the temporary files are directories
+        os.mkdir('test.db.dns.tmp')
+        os.mkdir('test.db.seen.tmp')
+
+        arg_parser = AppArgumentParser()
+        args = arg_parser.parse_args([
+            self.get_url('/'),
+            '--database', 'test.db',
+            '--seen-url-filter', '1000',
+            '--warc-file', 'test',
+            '--no-warc-compression',
+        ])
+        builder = Builder(args, unit_test=True)
+
+        app = builder.build()
+        exit_code = yield from app.run()
+
+        self.assertEqual(0, exit_code)
+        self.assertFalse(os.path.exists('test.db.dns'))
+        self.assertFalse(os.path.exists('test.db.seen'))
+        self.assertFalse(os.path.exists('test.warc-wpullinc'))
+
+        with open('test.warc', 'rb') as in_file:
+            self.assertIn(b'WARC-Type: response', in_file.read())
+
     @wpull.testing.async.async_test()
     def test_big_payload(self):
         hash_obj = hashlib.sha1(b'foxfoxfox')
@@ -14,7 +14,7 @@ import hashlib
 import re
 import uuid
 
-from typing import Optional
+from typing import Optional, Tuple
 
 from wpull.protocol.http.request import Response
 from wpull.namevalue import NameValueRecord
@@ -91,15 +91,29 @@ class WARCRecord(object):
             wpull.util.seek_file_end(self.block_file)
             self.fields['Content-Length'] = str(self.block_file.tell())
 
-    def compute_checksum(self, payload_offset: Optional[int]=None):
+    def compute_checksum(self, payload_offset: Optional[int]=None,
+                         digester: Optional['RecordDigester']=None):
         '''Compute and add the checksum data to the record fields.
 
         This function also sets the content length.
+
+        Args:
+            payload_offset: The length of the header before the payload.
+            digester: If given and it was fed the entire block, its digests
+                are used instead of reading the block file.
         '''
         if not self.block_file:
             self.fields['Content-Length'] = '0'
             return
 
+        digests = digester.get_digests(payload_offset) if digester else None
+
+        if digests:
+            content_length, content_hash, payload_hash = digests
+            self._set_checksum_fields(
+                content_length, content_hash, payload_hash)
+            return
+
         block_hasher = hashlib.sha1()
         payload_hasher = hashlib.sha1()
 
@@ -117,14 +131,18 @@ class WARCRecord(object):
 
             content_length = self.block_file.tell()
 
-        content_hash = block_hasher.digest()
+        self._set_checksum_fields(
+            content_length, block_hasher.digest(),
+            payload_hasher.digest() if payload_offset is not None else None
+        )
 
+    def _set_checksum_fields(self, content_length: int, content_hash: bytes,
+                             payload_hash: Optional[bytes]=None):
         self.fields['WARC-Block-Digest'] = 'sha1:{0}'.format(
             base64.b32encode(content_hash).decode()
         )
 
-        if payload_offset is not None:
-            payload_hash = payload_hasher.digest()
+        if payload_hash is not None:
             self.fields['WARC-Payload-Digest'] = 'sha1:{0}'.format(
                 base64.b32encode(payload_hash).decode()
             )
@@ -185,6 +203,92 @@ class WARCRecord(object):
         return response
 
 
+class RecordDigester(object):
+    '''Incremental SHA-1 digests of a record block.
+
+    The digester is fed the block data as it is written to the block file
+    so the digests are ready without reading the file again.
+
+    If the payload offset is set too late, after data past the offset has
+    been fed, the digester can no longer provide digests.
+    '''
+    def __init__(self):
+        self._block_hasher = hashlib.sha1()
+        self._header_hasher = None
+        self._payload_hasher = None
+        self._payload_offset = None
+        self._length = 0
+        self._broken = False
+
+    @property
+    def payload_offset(self) -> Optional[int]:
+        '''Return the length of the header before the payload.'''
+        return self._payload_offset
+
+    def set_payload_offset(self, payload_offset: int):
+        '''Set the length of the header before the payload.'''
+        if payload_offset == self._payload_offset:
+            return
+
+        if payload_offset < self._length or self._payload_hasher:
+            self._broken = True
+            return
+
+        self._payload_offset = payload_offset
+        self.update(b'')
+
+    def update(self, data: bytes):
+        '''Feed data appended to the block.'''
+        if self._payload_offset is not None and not self._payload_hasher \
+                and self._length + len(data) >= self._payload_offset:
+            split_index = self._payload_offset - self._length
+            data = memoryview(data)
+
+            self._block_hasher.update(data[:split_index])
+            self._length += split_index
+            self._header_hasher = self._block_hasher.copy()
+            self._payload_hasher = hashlib.sha1()
+
+            data = data[split_index:]
+
+        self._block_hasher.update(data)
+        self._length += len(data)
+
+        if self._payload_hasher:
+            self._payload_hasher.update(data)
+
+    def truncate(self):
+        '''Discard the payload from the block.'''
+        if self._header_hasher:
+            self._block_hasher = self._header_hasher.copy()
+            self._length = self._payload_offset
+            self._payload_hasher = None
+            self._payload_offset = None
+        else:
+            self._broken = True
+
+    def get_digests(self, payload_offset: Optional[int]=None) \
+            -> Optional[Tuple[int, bytes, Optional[bytes]]]:
+        '''Return the content length, block digest and payload digest.
+
+        Returns:
+            None if the digests for the given payload offset are not
+            available.
+        '''
+        if self._broken:
+            return
+
+        if payload_offset is None:
+            return self._length, self._block_hasher.digest(), None
+
+        if payload_offset != self._payload_offset or \
+                not self._payload_hasher:
+            return
+
+        return (self._length, self._block_hasher.digest(),
+                self._payload_hasher.digest())
+
+
 def read_cdx(file, encoding='utf8'):
     '''Iterate CDX file.
 
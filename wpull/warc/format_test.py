@@ -3,7 +3,7 @@
 import io
 import unittest
 
-from wpull.warc.format import read_cdx
+from wpull.warc.format import read_cdx, WARCRecord, RecordDigester
 
 
 class TestWARC(unittest.TestCase):
@@ -13,3 +13,44 @@ class TestWARC(unittest.TestCase):
             self.assertEqual(record['a'], 'hi')
             self.assertEqual(record['A'], 'hello')
             self.assertEqual(record['b'], 'foxes?')
+
+    def test_record_digester(self):
+        header = b'HTTP/1.1 200 OK\r\n\r\n'
+        chunks = [b'HTTP/1.1 200', b' OK\r\n\r\nhello', b' world']
+        payload_offset = len(header)
+
+        expected_record = WARCRecord()
+        expected_record.block_file = io.BytesIO(b''.join(chunks))
+        expected_record.compute_checksum(payload_offset)
+
+        digester = RecordDigester()
+        digester.set_payload_offset(payload_offset)
+
+        for chunk in chunks:
+            digester.update(chunk)
+
+        record = WARCRecord()
+        record.block_file = io.BytesIO()
+        record.compute_checksum(payload_offset, digester=digester)
+
+        for name in ('WARC-Block-Digest', 'WARC-Payload-Digest',
+                     'Content-Length'):
+            self.assertEqual(expected_record.fields[name], record.fields[name])
+
+        expected_record.block_file = io.BytesIO(header)
+        expected_record.compute_checksum()
+        digester.truncate()
+        record.compute_checksum(digester=digester)
+
+        self.assertEqual(expected_record.fields['WARC-Block-Digest'],
+                         record.fields['WARC-Block-Digest'])
+        self.assertEqual(expected_record.fields['Content-Length'],
+                         record.fields['Content-Length'])
+
+    def test_record_digester_late_payload_offset(self):
+        digester = RecordDigester()
+        digester.update(b'HTTP/1.1 200 OK\r\n\r\nhello')
+        digester.set_payload_offset(19)
+
+        self.assertIsNone(digester.get_digests(19))
+        self.assertIsNone(digester.get_digests())
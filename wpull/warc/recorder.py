@@ -1,6 +1,9 @@
 import textwrap
 from tempfile import NamedTemporaryFile
+import asyncio
+import concurrent.futures
 import contextlib
+import functools
 import gettext
 import glob
 import gzip
@@ -9,12 +12,13 @@ import logging
 import os.path
 import re
 import shutil
+import threading
 
 import namedlist
 
 from wpull.backport.logging import StyleAdapter
 from wpull.namevalue import NameValueRecord
-from wpull.warc.format import WARCRecord
+from wpull.warc.format import WARCRecord, RecordDigester
 from wpull.protocol.ftp.client import Client as FTPClient
 from wpull.protocol.ftp.client import Session as FTPSession
 from wpull.protocol.ftp.request import Request as FTPRequest
@@ -44,7 +48,8 @@ WARCRecorderParams = namedlist.namedtuple(
         ('max_size', None),
         ('move_to', None),
         ('url_table', None),
-        ('software_string', None)
+        ('software_string', None),
+        ('writer_queue_size', None),
     ]
 )
 ''':class:`WARCRecorder` parameters.
@@ -66,6 +71,10 @@ Args:
         records will be written.
     software_string (str): The value for the ``software`` field in the
         Warcinfo record.
+    writer_queue_size (int): If provided, records are compressed and
+        written by a dedicated writer thread. New downloads are held back
+        by :meth:`WARCRecorder.wait_for_queue` while more than half this
+        many writes are queued.
 '''
 
 
@@ -91,7 +100,17 @@ class WARCRecorder(object):
         self._log_temp_file = None
         self._log_handler = None
         self._warc_filename = None
+        self._warc_file = None
+        self._warc_offset = 0
+        self._journal_offset = None
         self._cdx_filename = None
+        self._cdx_file = None
+        self._cdx_lines = []
+        self._executor = None
+        self._queue_lock = threading.Lock()
+        self._queue_count = 0
+        self._queue_waiters = []
+        self._write_error = None
 
         self._check_journals_and_maybe_raise()
 
@@ -103,6 +122,10 @@ class WARCRecorder(object):
         if self._params.cdx:
             self._start_new_cdx_file()
 
+        if self._params.writer_queue_size:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1)
+
     def _check_journals_and_maybe_raise(self):
         '''Check if any journal files exist and raise an error.'''
         files = list(glob.glob(self._prefix_filename + '*-wpullinc'))
@@ -112,6 +135,8 @@ class WARCRecorder(object):
 
     def _start_new_warc_file(self, meta=False):
         '''Create and set as current WARC file.'''
+        self._close_warc_file()
+
         if self._params.max_size and not meta and self._params.appending:
             while True:
                 self._warc_filename = self._generate_warc_filename()
@@ -129,9 +154,20 @@ class WARCRecorder(object):
         if not self._params.appending:
             wpull.util.truncate_file(self._warc_filename)
 
+        self._warc_file = open(self._warc_filename, mode='ab')
+        self._warc_offset = self._warc_file.tell()
+
         self._warcinfo_record = WARCRecord()
         self._populate_warcinfo(self._params.extra_fields)
-        self.write_record(self._warcinfo_record)
+        self._write_record(self._warcinfo_record)
+        self._checkpoint()
+
+    def _close_warc_file(self):
+        '''Write out pending data and close the current WARC file.'''
+        if self._warc_file:
+            self._checkpoint()
+            self._warc_file.close()
+            self._warc_file = None
 
     def _generate_warc_filename(self, meta=False):
         '''Return a suitable WARC filename.'''
@@ -157,8 +193,13 @@ class WARCRecorder(object):
 
         if not self._params.appending:
             wpull.util.truncate_file(self._cdx_filename)
-            self._write_cdx_header()
-        elif not os.path.exists(self._cdx_filename):
+            write_header = True
+        else:
+            write_header = not os.path.exists(self._cdx_filename)
+
+        self._cdx_file = open(self._cdx_filename, mode='a', encoding='utf-8')
+
+        if write_header:
             self._write_cdx_header()
 
     def _populate_warcinfo(self, extra_fields=None):
@@ -278,12 +319,34 @@ class WARCRecorder(object):
             url_table=self._params.url_table
         )
 
-    def flush_session(self):
+    def flush_session(self, block_files=()):
+        '''Finish a recorder session.
+
+        The written records are checkpointed and a new WARC file is started
+        if the size limit is exceeded.
+
+        Args:
+            block_files: Block files of the session's records that are
+                closed once the records are written.
+        '''
+        self._submit(self._finish_session, tuple(block_files))
+
+    def _finish_session(self, block_files):
+        try:
+            self._flush_session()
+        finally:
+            for block_file in block_files:
+                block_file.close()
+
+    def _flush_session(self):
+        self._checkpoint()
+
         if self._params.max_size is not None \
-           and os.path.getsize(self._warc_filename) > self._params.max_size:
+           and self._warc_offset > self._params.max_size:
             self._sequence_num += 1
 
             if self._params.move_to is not None:
+                self._close_warc_file()
                 self._move_file_to_dest_dir(self._warc_filename)
 
             _logger.debug('Starting new warc file due to max size.')
@@ -301,15 +364,141 @@ class WARCRecorder(object):
             _logger.error('{} is not a directory; not moving {}.',
                           self._params.move_to, filename)
 
-    def set_length_and_maybe_checksums(self, record, payload_offset=None):
-        '''Set the content length and possibly the checksums.'''
+    def new_digester(self):
+        '''Return a new incremental digester if digests are enabled.
+
+        Returns:
+            RecordDigester, None
+        '''
         if self._params.digests:
-            record.compute_checksum(payload_offset)
+            return RecordDigester()
+
+    def set_length_and_maybe_checksums(self, record, payload_offset=None,
+                                       digester=None):
+        '''Set the content length and possibly the checksums.
+
+        Args:
+            record: The WARC record.
+            payload_offset: The length of the header before the payload.
+            digester: A :class:`.format.RecordDigester` fed with the block
+                data. If not given, the block file is read instead.
+        '''
+        if self._params.digests:
+            record.compute_checksum(payload_offset, digester=digester)
         else:
             record.set_content_length()
 
     def write_record(self, record):
-        '''Append the record to the WARC file.'''
+        '''Append the record to the WARC file.
+
+        The record may be buffered until the next checkpoint at the end of
+        a recorder session. If a writer thread is used, this function
+        blocks until the record is written.
+        '''
+        self._raise_write_error()
+
+        if self._executor:
+            self._executor.submit(self._write_record, record).result()
+        else:
+            self._write_record(record)
+
+    def queue_record(self, record, payload_offset=None, digester=None,
+                     prepare=None):
+        '''Append the record to the WARC file in the background.
+
+        The content length and checksums are set by
+        :meth:`set_length_and_maybe_checksums` on the writer thread.
+        Unlike :meth:`write_record`, the record's block file must be left
+        open until it is passed to :meth:`flush_session`. Without a writer
+        thread, the record is written immediately.
+
+        Args:
+            record: The WARC record.
+            payload_offset: The length of the header before the payload.
+            digester: A :class:`.format.RecordDigester` fed with the block
+                data.
+            prepare: A function called with the record after the checksums
+                are set and before it is written.
+        '''
+        self._submit(self._prepare_and_write_record, record, payload_offset,
+                     digester, prepare)
+
+    def _prepare_and_write_record(self, record, payload_offset, digester,
+                                  prepare):
+        record.block_file.seek(0)
+        self.set_length_and_maybe_checksums(
+            record, payload_offset=payload_offset, digester=digester)
+
+        if prepare:
+            prepare(record)
+
+        self._write_record(record)
+
+    @asyncio.coroutine
+    def wait_for_queue(self):
+        '''Wait until the writer thread queue is at most half full.
+
+        Coroutine.
+        '''
+        if not self._executor:
+            return
+
+        while True:
+            with self._queue_lock:
+                if self._queue_count <= self._params.writer_queue_size // 2:
+                    return
+
+                loop = asyncio.get_event_loop()
+                waiter = asyncio.Future(loop=loop)
+                self._queue_waiters.append((loop, waiter))
+
+            yield from waiter
+
+    def _submit(self, function, *args):
+        '''Run the function on the writer thread or immediately.
+
+        This function does not block. Coroutines apply backpressure by
+        calling :meth:`wait_for_queue` before starting more work.
+        '''
+        self._raise_write_error()
+
+        if not self._executor:
+            function(*args)
+            return
+
+        with self._queue_lock:
+            self._queue_count += 1
+
+        future = self._executor.submit(function, *args)
+        future.add_done_callback(self._queue_done_callback)
+
+    def _queue_done_callback(self, future: concurrent.futures.Future):
+        with self._queue_lock:
+            self._queue_count -= 1
+            waiters = self._queue_waiters
+            self._queue_waiters = []
+
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(self._wake_waiter, waiter)
+
+        error = future.exception()
+
+        if error and not self._write_error:
+            _logger.error('WARC write failed.', exc_info=error)
+            self._write_error = error
+
+    @classmethod
+    def _wake_waiter(cls, waiter: asyncio.Future):
+        if not waiter.done():
+            waiter.set_result(None)
+
+    def _raise_write_error(self):
+        if self._write_error:
+            error = self._write_error
+            self._write_error = None
+            raise error
+
+    def _write_record(self, record):
         # FIXME: probably not a good idea to modifiy arguments passed to us
         # TODO: add extra gzip headers that wget uses
         record.fields['WARC-Warcinfo-ID'] = self._warcinfo_record.fields[
@@ -318,52 +507,102 @@ class WARCRecorder(object):
         _logger.debug('Writing WARC record {0}.',
                       record.fields['WARC-Type'])
 
-        if self._params.compress:
-            open_func = gzip.GzipFile
-        else:
-            open_func = open
-
-        # Use getsize to get actual file size. Avoid tell() because it may
-        # not be the raw file position.
-        if os.path.exists(self._warc_filename):
-            before_offset = os.path.getsize(self._warc_filename)
-        else:
-            before_offset = 0
+        before_offset = self._warc_offset
 
-        journal_filename = self._warc_filename + '-wpullinc'
-
-        with open(journal_filename, 'w') as file:
-            file.write('wpull-journal-version:1\n')
-            file.write('offset:{}\n'.format(before_offset))
+        if self._journal_offset is None:
+            self._write_journal(before_offset)
 
         try:
-            with open_func(self._warc_filename, mode='ab') as out_file:
+            if self._params.compress:
+                # Each record is a separate gzip member
+                with gzip.GzipFile(filename=self._warc_filename, mode='ab',
+                                   fileobj=self._warc_file) as out_file:
+                    for data in record:
+                        out_file.write(data)
+            else:
                 for data in record:
-                    out_file.write(data)
+                    self._warc_file.write(data)
         except (OSError, IOError) as error:
-            _logger.info(
-                _('Rolling back file {filename} to length {length}.'),
-                filename=self._warc_filename, length=before_offset
-            )
-            with open(self._warc_filename, mode='wb') as out_file:
-                out_file.truncate(before_offset)
-
+            self._rollback(before_offset)
             raise error
-        finally:
-            os.remove(journal_filename)
 
-        after_offset = os.path.getsize(self._warc_filename)
+        self._warc_offset = self._warc_file.tell()
 
         if self._cdx_filename:
             raw_file_offset = before_offset
-            raw_file_record_size = after_offset - before_offset
+            raw_file_record_size = self._warc_offset - before_offset
 
             self._write_cdx_field(
                 record, raw_file_record_size, raw_file_offset
             )
 
+    def _write_journal(self, offset):
+        '''Mark the WARC file as incomplete until the next checkpoint.'''
+        with open(self._warc_filename + '-wpullinc', 'w') as file:
+            file.write('wpull-journal-version:1\n')
+            file.write('offset:{}\n'.format(offset))
+
+        self._journal_offset = offset
+
+    def _checkpoint(self):
+        '''Flush the written records to disk and remove the journal.'''
+        if self._journal_offset is None:
+            return
+
+        try:
+            self._warc_file.flush()
+        except (OSError, IOError) as error:
+            self._rollback(self._journal_offset)
+            raise error
+
+        self._flush_cdx_lines()
+        os.remove(self._warc_filename + '-wpullinc')
+        self._journal_offset = None
+
+    def _rollback(self, offset):
+        '''Truncate the WARC file to the offset and remove the journal.'''
+        try:
+            self._warc_file.flush()
+        except (OSError, IOError):
+            # Buffered records before the offset may be lost as well
+            offset = self._journal_offset
+            self._cdx_lines.clear()
+
+            try:
+                self._warc_file.close()
+            except (OSError, IOError):
+                pass
+
+            self._warc_file = open(self._warc_filename, mode='ab')
+
+        _logger.info(
+            _('Rolling back file {filename} to length {length}.'),
+            filename=self._warc_filename, length=offset
+        )
+
+        self._warc_file.truncate(offset)
+        self._warc_file.seek(0, os.SEEK_END)
+        self._warc_offset = offset
+
+        self._flush_cdx_lines()
+        os.remove(self._warc_filename + '-wpullinc')
+        self._journal_offset = None
+
     def close(self):
-        '''Close the WARC file and clean up any logging handlers.'''
+        '''Close the WARC file and clean up any logging handlers.
+
+        Queued records are written out before closing.
+        '''
+        if self._executor:
+            future = self._executor.submit(self._close)
+            self._executor.shutdown()
+            self._executor = None
+            self._raise_write_error()
+            future.result()
+        else:
+            self._close()
+
+    def _close(self):
         if self._log_temp_file:
             self._log_handler.flush()
 
@@ -382,12 +621,13 @@ class WARCRecorder(object):
 
             if self._params.max_size is not None:
                 if self._params.move_to is not None:
+                    self._close_warc_file()
                     self._move_file_to_dest_dir(self._warc_filename)
 
                 self._start_new_warc_file(meta=True)
 
             self.set_length_and_maybe_checksums(log_record)
-            self.write_record(log_record)
+            self._write_record(log_record)
 
             log_record.block_file.close()
 
@@ -402,8 +642,15 @@ class WARCRecorder(object):
             self._log_handler = None
 
             if self._params.move_to is not None:
+                self._close_warc_file()
                 self._move_file_to_dest_dir(self._warc_filename)
 
+        self._close_warc_file()
+
+        if self._cdx_file:
+            self._cdx_file.close()
+            self._cdx_file = None
+
         if self._cdx_filename and self._params.move_to is not None:
             self._move_file_to_dest_dir(self._cdx_filename)
 
@@ -422,15 +669,15 @@ class WARCRecorder(object):
         8. g: filename of raw file
         9. u: record ID
         '''
-        with open(self._cdx_filename, mode='a', encoding='utf-8') as out_file:
-            out_file.write(self.CDX_DELIMINATOR)
-            out_file.write(self.CDX_DELIMINATOR.join((
-                'CDX',
-                'a', 'b', 'm', 's',
-                'k', 'S', 'V', 'g',
-                'u'
-            )))
-            out_file.write('\n')
+        self._cdx_file.write(self.CDX_DELIMINATOR)
+        self._cdx_file.write(self.CDX_DELIMINATOR.join((
+            'CDX',
+            'a', 'b', 'm', 's',
+            'k', 'S', 'V', 'g',
+            'u'
+        )))
+        self._cdx_file.write('\n')
+        self._cdx_file.flush()
 
     def _write_cdx_field(self, record, raw_file_record_size, raw_file_offset):
         '''Write the CDX field if needed.'''
@@ -481,9 +728,15 @@ class WARCRecorder(object):
             record_id
         )
 
-        with open(self._cdx_filename, mode='a', encoding='utf-8') as out_file:
-            out_file.write(self.CDX_DELIMINATOR.join(fields_strs))
-            out_file.write('\n')
+        # Written out with the WARC file at the next checkpoint
+        self._cdx_lines.append(self.CDX_DELIMINATOR.join(fields_strs) + '\n')
+
+    def _flush_cdx_lines(self):
+        '''Write the pending CDX lines.'''
+        if self._cdx_lines:
+            self._cdx_file.write(''.join(self._cdx_lines))
+            self._cdx_file.flush()
+            self._cdx_lines.clear()
 
     @classmethod
     def parse_mimetype(cls, value):
@@ -512,7 +765,18 @@ class BaseWARCRecorderSession(object):
         )
 
     def close(self):
-        self._recorder.flush_session()
+        self._recorder.flush_session(self._block_files())
+
+    def _block_files(self):
+        '''Return the block files to close after the records are written.'''
+        return [
+            record.block_file for record in self._records()
+            if record and record.block_file
+        ]
+
+    def _records(self):
+        '''Return the session's records.'''
+        return ()
 
 
 class HTTPWARCRecorderSession(BaseWARCRecorderSession):
@@ -521,20 +785,21 @@ class HTTPWARCRecorderSession(BaseWARCRecorderSession):
         super().__init__(*args, **kwargs)
         self._request = None
         self._request_record = None
+        self._request_digester = None
         self._response_record = None
         self._response_temp_file = self._new_temp_file(hint='warcsesrsp')
+        self._response_digester = self._recorder.new_digester()
 
-    def close(self):
-        super().close()
+    def _block_files(self):
+        block_files = super()._block_files()
 
         if self._response_temp_file:
-            self._response_temp_file.close()
+            block_files.append(self._response_temp_file)
 
-        if self._request_record and self._request_record.block_file:
-            self._request_record.block_file.close()
+        return block_files
 
-        if self._response_record and self._response_record.block_file:
-            self._response_record.block_file.close()
+    def _records(self):
+        return (self._request_record, self._response_record)
 
     def begin_request(self, request: HTTPRequest):
         assert re.match(
@@ -548,18 +813,26 @@ class HTTPWARCRecorderSession(BaseWARCRecorderSession):
         record.fields['WARC-Target-URI'] = request.url_info.url
         record.fields['WARC-IP-Address'] = request.address[0]
         record.block_file = self._new_temp_file(hint='warcsesreq')
+        self._request_digester = self._recorder.new_digester()
 
     def request_data(self, data: bytes):
         self._request_record.block_file.write(data)
 
+        if self._request_digester:
+            if self._request_digester.payload_offset is None:
+                # The header is final once it is sent
+                self._request_digester.set_payload_offset(
+                    len(self._request.to_bytes()))
+
+            self._request_digester.update(data)
+
     def end_request(self, request: HTTPRequest):
         payload_offset = len(request.to_bytes())
 
-        self._request_record.block_file.seek(0)
-        self._recorder.set_length_and_maybe_checksums(
-            self._request_record, payload_offset=payload_offset
+        self._recorder.queue_record(
+            self._request_record, payload_offset=payload_offset,
+            digester=self._request_digester
         )
-        self._recorder.write_record(self._request_record)
 
     def begin_response(self, response: HTTPResponse):
         assert re.match(
@@ -575,26 +848,37 @@ class HTTPWARCRecorderSession(BaseWARCRecorderSession):
             WARCRecord.WARC_RECORD_ID]
         record.block_file = self._response_temp_file
 
+        if self._response_digester:
+            self._response_digester.set_payload_offset(
+                len(response.to_bytes()))
+
     def response_data(self, data: bytes):
         self._response_temp_file.write(data)
 
+        if self._response_digester:
+            self._response_digester.update(data)
+
     def end_response(self, response: HTTPResponse):
         payload_offset = len(response.to_bytes())
 
-        self._response_record.block_file.seek(0)
-        self._recorder.set_length_and_maybe_checksums(
+        if self._url_table is not None:
+            prepare = functools.partial(self._record_revisit, payload_offset)
+        else:
+            prepare = None
+
+        self._recorder.queue_record(
             self._response_record,
-            payload_offset=payload_offset
+            payload_offset=payload_offset,
+            digester=self._response_digester,
+            prepare=prepare
         )
 
-        if self._url_table is not None:
-            self._record_revisit(payload_offset)
-
-        self._recorder.write_record(self._response_record)
+    def _record_revisit(self, payload_offset: int, record: WARCRecord):
+        '''Record the revisit if possible.
 
-    def _record_revisit(self, payload_offset: int):
-        '''Record the revisit if possible.'''
-        fields = self._response_record.fields
+        Called on the writer thread once the checksums are set.
+        '''
+        fields = record.fields
 
         ref_record_id = self._url_table.get_revisit_id(
             fields['WARC-Target-URI'],
@@ -603,18 +887,21 @@ class HTTPWARCRecorderSession(BaseWARCRecorderSession):
 
         if ref_record_id:
             try:
-                self._response_record.block_file.truncate(payload_offset)
+                record.block_file.truncate(payload_offset)
             except TypeError:
-                self._response_record.block_file.seek(0)
+                record.block_file.seek(0)
+
+                data = record.block_file.read(payload_offset)
 
-                data = self._response_record.block_file.read(payload_offset)
+                record.block_file.truncate()
+                record.block_file.seek(0)
+                record.block_file.write(data)
 
-                self._response_record.block_file.truncate()
-                self._response_record.block_file.seek(0)
-                self._response_record.block_file.write(data)
+            if self._response_digester:
+                self._response_digester.truncate()
 
             self._recorder.set_length_and_maybe_checksums(
-                self._response_record
+                record, digester=self._response_digester
             )
 
             fields[WARCRecord.WARC_TYPE] = WARCRecord.REVISIT
@@ -629,16 +916,15 @@ class FTPWARCRecorderSession(BaseWARCRecorderSession):
         super().__init__(*args, **kwargs)
         self._request = None
         self._control_record = None
+        self._control_digester = None
         self._response_record = None
+        self._response_digester = None
 
     def close(self, error=None):
         super().close()
 
-        if self._control_record and self._control_record.block_file:
-            self._control_record.block_file.close()
-
-        if self._response_record and self._response_record.block_file:
-            self._response_record.block_file.close()
+    def _records(self):
+        return (self._control_record, self._response_record)
 
     def begin_control(self, request: FTPRequest, connection_reused: bool=False):
         self._request = request
@@ -649,6 +935,7 @@ class FTPWARCRecorderSession(BaseWARCRecorderSession):
         record.fields['WARC-IP-Address'] = request.address[0]
 
         record.block_file = self._new_temp_file('warcctrl')
+        self._control_digester = self._recorder.new_digester()
 
         hostname, port = self._request_hostname_port()
 
@@ -673,42 +960,47 @@ class FTPWARCRecorderSession(BaseWARCRecorderSession):
             connection_string.format(hostname=hostname, port=port)
         )
 
-        self._control_record.block_file.seek(0)
-        self._recorder.set_length_and_maybe_checksums(self._control_record)
-        self._recorder.write_record(self._control_record)
+        self._recorder.queue_record(
+            self._control_record, digester=self._control_digester)
 
     def control_send_data(self, data):
         text = textwrap.indent(
             data.decode('utf-8', errors='surrogateescape'),
             '> ', predicate=lambda line: True
         )
-        self._control_record.block_file.write(
+        self._write_control_data(
             text.encode('utf-8', errors='surrogateescape')
         )
 
         if not data.endswith(b'\n'):
-            self._control_record.block_file.write(b'\n')
+            self._write_control_data(b'\n')
 
     def control_receive_data(self, data):
         text = textwrap.indent(
             data.decode('utf-8', errors='surrogateescape'),
             '< ', predicate=lambda line: True
         )
-        self._control_record.block_file.write(
+        self._write_control_data(
             text.encode('utf-8', errors='surrogateescape')
         )
 
         if not data.endswith(b'\n'):
-            self._control_record.block_file.write(b'\n')
+            self._write_control_data(b'\n')
 
     def _write_control_event(self, text):
         text = textwrap.indent(text, '* ', predicate=lambda line: True)
-        self._control_record.block_file.write(
+        self._write_control_data(
             text.encode('utf-8', errors='surrogateescape')
         )
 
         if not text.endswith('\n'):
-            self._control_record.block_file.write(b'\n')
+            self._write_control_data(b'\n')
+
+    def _write_control_data(self, data: bytes):
+        self._control_record.block_file.write(data)
+
+        if self._control_digester:
+            self._control_digester.update(data)
 
     def _request_hostname_port(self):
         hostname = self._request.address[0]
@@ -734,10 +1026,14 @@ class FTPWARCRecorderSession(BaseWARCRecorderSession):
         record.fields['WARC-Concurrent-To'] = self._control_record.fields[
             WARCRecord.WARC_RECORD_ID]
         record.block_file = self._new_temp_file('warcresp')
+        self._response_digester = self._recorder.new_digester()
 
     def transfer_receive_data(self, data: bytes):
         self._response_record.block_file.write(data)
 
+        if self._response_digester:
+            self._response_digester.update(data)
+
     def end_transfer(self, response: FTPResponse):
         hostname, port = response.data_address
         self._write_control_event(
@@ -745,6 +1041,5 @@ class FTPWARCRecorderSession(BaseWARCRecorderSession):
             .format(hostname=hostname, port=port)
         )
 
-        self._response_record.block_file.seek(0)
-        self._recorder.set_length_and_maybe_checksums(self._response_record)
-        self._recorder.write_record(self._response_record)
+        self._recorder.queue_record(
+            self._response_record, digester=self._response_digester)
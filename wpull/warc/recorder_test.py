@@ -3,14 +3,17 @@ import os.path
 import subprocess
 import sys
 import re
+import threading
 import unittest
 
 from wpull.body import Body
 from wpull.database.sqltable import URLTable
 from wpull.protocol.http.request import Request as HTTPRequest, Response as HTTPResponse
+from wpull.testing.async import AsyncTestCase
 from wpull.testing.util import TempDirMixin
 from wpull.warc.recorder import WARCRecorder, WARCRecorderParams
 from wpull.warc.format import WARCRecord
+import wpull.testing.async
 import wpull.util
 from wpull.protocol.ftp.request import Request as FTPRequest, Response as FTPResponse, Reply as FTPReply
 
@@ -419,6 +422,47 @@ class TestWARC(unittest.TestCase, TempDirMixin):
 
         session.end_request(request)
 
+        self.assertTrue(os.path.exists(warc_filename + '-wpullinc'))
+
+        session.close()
+
+        self.assertFalse(os.path.exists(warc_filename + '-wpullinc'))
+
+    def test_warc_recorder_writer_thread(self):
+        warc_filename = 'asdf.warc.gz'
+        cdx_filename = 'asdf.cdx'
+
+        warc_recorder = WARCRecorder(
+            'asdf',
+            params=WARCRecorderParams(
+                cdx=True,
+                writer_queue_size=2,
+            )
+        )
+
+        for index in range(5):
+            request = HTTPRequest('http://example.com/{}'.format(index))
+            request.address = ('0.0.0.0', 80)
+            response = HTTPResponse(200, 'OK')
+
+            session = warc_recorder.new_http_recorder_session()
+            session.begin_request(request)
+            session.request_data(request.to_bytes())
+            session.end_request(request)
+            session.begin_response(response)
+            session.response_data(response.to_bytes())
+            session.response_data(b'KITTEH DOGE')
+            session.end_response(response)
+            session.close()
+
+        warc_recorder.close()
+
+        self.validate_warc(warc_filename)
+
+        with open(cdx_filename, 'rb') as in_file:
+            cdx_lines = in_file.read().strip().split(b'\n')
+
+        self.assertEqual(6, len(cdx_lines))
         self.assertFalse(os.path.exists(warc_filename + '-wpullinc'))
 
     def test_warc_recorder_journal_raise_error(self):
@@ -643,3 +687,85 @@ class TestWARC(unittest.TestCase, TempDirMixin):
         self.assertNotEqual(0, os.path.getsize('asdf-00002.warc'))
         self.assertNotEqual(0, os.path.getsize('asdf-00003.warc'))
         self.assertNotEqual(0, os.path.getsize('asdf-meta.warc'))
+
+
+class TestWARCWriterThread(AsyncTestCase, TempDirMixin):
+    def setUp(self):
+        super().setUp()
+        self.set_up_temp_dir()
+
+    def tearDown(self):
+        super().tearDown()
+        self.tear_down_temp_dir()
+
+    @wpull.testing.async.async_test()
+    def test_warc_recorder_wait_for_queue(self):
+        warc_recorder = WARCRecorder(
+            'asdf',
+            params=WARCRecorderParams(
+                compress=False,
+                writer_queue_size=2,
+            )
+        )
+        event = threading.Event()
+
+        class MockRecord(WARCRecord):
+            def __iter__(self):
+                event.wait()
+                return super().__iter__()
+
+        request = HTTPRequest('http://example.com/')
+        request.address = ('0.0.0.0', 80)
+        response = HTTPResponse(200, 'OK')
+
+        session = warc_recorder.new_http_recorder_session()
+        session.begin_request(request)
+        session._request_record.__class__ = MockRecord
+        session.request_data(request.to_bytes())
+        session.end_request(request)
+        session.begin_response(response)
+        session.response_data(response.to_bytes())
+        session.end_response(response)
+
+        self.event_loop.call_later(0.1, event.set)
+        start_time = self.event_loop.time()
+
+        yield from warc_recorder.wait_for_queue()
+
+        self.assertLess(0.05, self.event_loop.time() - start_time)
+        self.assertTrue(event.is_set())
+
+        session.close()
+        warc_recorder.close()
+
+        with open('asdf.warc', 'rb') as in_file:
+            self.assertIn(b'WARC-Type: response', in_file.read())
+
+    def test_warc_recorder_queue_does_not_block(self):
+        warc_recorder = WARCRecorder(
+            'asdf',
+            params=WARCRecorderParams(
+                compress=False,
+                writer_queue_size=2,
+            )
+        )
+        event = threading.Event()
+        warc_recorder._submit(event.wait)
+
+        for index in range(5):
+            request = HTTPRequest('http://example.com/{}'.format(index))
+            request.address = ('0.0.0.0', 80)
+
+            session = warc_recorder.new_http_recorder_session()
+            session.begin_request(request)
+            session.request_data(request.to_bytes())
+            session.end_request(request)
+            session.close()
+
+        self.assertFalse(event.is_set())
+
+        event.set()
+        warc_recorder.close()
+
+        with open('asdf.warc', 'rb') as in_file:
+            self.assertEqual(5, in_file.read().count(b'WARC-Type: request'))